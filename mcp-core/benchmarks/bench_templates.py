@@ -0,0 +1,195 @@
+"""
+报告模板渲染基准测试
+
+用合成项目数据渲染 templates/reports 下的所有模板，逐个模板输出
+变量计算耗时、渲染耗时、峰值内存和输出大小。
+
+用法:
+    python benchmarks/bench_templates.py
+    python benchmarks/bench_templates.py --sizes 10,1000 --template japanese_monthly_report
+    python benchmarks/bench_templates.py --json results.json
+    python benchmarks/bench_templates.py --compare results.json   # 与上次结果对比
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# 基准测试不连接 OpenProject，只需要满足配置校验
+os.environ.setdefault("OPENPROJECT_URL", "http://localhost:8080")
+os.environ.setdefault("OPENPROJECT_API_KEY", "benchmark-api-key")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mcp_core.domain.models import Project, WorkPackage  # noqa: E402
+from mcp_core.infrastructure.templates import (  # noqa: E402
+    JinjaTemplateEngine, VariableContext, template_variables
+)
+
+DEFAULT_SIZES = [10, 1000, 50000]
+STATUSES = ["New", "In progress", "Scheduled", "Resolved", "Closed", "On hold", "Rejected"]
+PRIORITIES = ["Low", "Normal", "High", "Immediate"]
+TYPES = ["Task", "Bug", "Feature", "Milestone"]
+
+# 与基线相比慢于该比例、且绝对差值超过 REGRESSION_MIN_MS 时标记为回退
+REGRESSION_THRESHOLD = 0.2
+REGRESSION_MIN_MS = 1.0
+
+
+def make_project(size: int, seed: int = 42):
+    """生成合成项目及工作包"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    assignees = [f"member_{i}" for i in range(max(3, size // 50))]
+
+    project = Project(
+        id="bench",
+        name=f"Benchmark {size}",
+        identifier=f"bench-{size}",
+        description="合成基准测试项目"
+    )
+
+    work_packages = []
+    for i in range(size):
+        created_at = now - timedelta(days=rng.randint(0, 120))
+        start_date = created_at + timedelta(days=rng.randint(0, 10))
+        work_packages.append(WorkPackage(
+            id=str(i + 1),
+            subject=f"Work package {i + 1}",
+            status=rng.choice(STATUSES),
+            type=rng.choice(TYPES),
+            priority=rng.choice(PRIORITIES),
+            assigned_to=rng.choice(assignees) if rng.random() > 0.1 else None,
+            created_at=created_at,
+            updated_at=created_at + timedelta(days=rng.randint(0, 30)),
+            start_date=start_date,
+            due_date=start_date + timedelta(days=rng.randint(1, 60)),
+            progress=rng.choice([None, 0, 10, 50, 80, 100]),
+            project_id=project.id
+        ))
+    return project, work_packages
+
+
+async def measure(engine: JinjaTemplateEngine, template_id: str, project: Project,
+                  work_packages: List[WorkPackage], repeat: int) -> Dict[str, Any]:
+    """测量单个模板在给定数据集上的开销"""
+    names = engine.get_referenced_variables(template_id)
+
+    variable_times = []
+    render_times = []
+    content = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = template_variables.resolve(names, VariableContext(project, work_packages))
+        variable_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        content = await engine.render_template(template_id, data)
+        render_times.append(time.perf_counter() - start)
+
+    # 峰值内存单独测量一次，避免 tracemalloc 影响耗时
+    tracemalloc.start()
+    data = template_variables.resolve(names, VariableContext(project, work_packages))
+    await engine.render_template(template_id, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "template": template_id,
+        "work_packages": len(work_packages),
+        "variables_ms": round(statistics.median(variable_times) * 1000, 3),
+        "render_ms": round(statistics.median(render_times) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+        "output_bytes": len(content.encode("utf-8"))
+    }
+
+
+def relative_change(result: Dict[str, Any], baseline: Dict[tuple, Dict[str, Any]]) -> Optional[float]:
+    """总耗时（变量 + 渲染）相对基线的变化比例，无基线时返回 None"""
+    base = baseline.get((result["template"], result["work_packages"]))
+    if not base:
+        return None
+    before = base["variables_ms"] + base["render_ms"]
+    after = result["variables_ms"] + result["render_ms"]
+    return (after - before) / before if before else 0.0
+
+
+def is_regression(result: Dict[str, Any], baseline: Dict[tuple, Dict[str, Any]]) -> bool:
+    """是否明显慢于基线（忽略亚毫秒级的抖动）"""
+    change = relative_change(result, baseline)
+    if change is None or change <= REGRESSION_THRESHOLD:
+        return False
+    base = baseline[(result["template"], result["work_packages"])]
+    delta = (result["variables_ms"] + result["render_ms"]) - (base["variables_ms"] + base["render_ms"])
+    return delta > REGRESSION_MIN_MS
+
+
+def print_table(results: List[Dict[str, Any]], baseline: Dict[tuple, Dict[str, Any]]) -> None:
+    """输出结果表格（有基线时附带渲染耗时变化）"""
+    header = f"{'template':<28} {'WPs':>7} {'vars ms':>10} {'render ms':>10} {'peak KB':>10} {'output B':>10}"
+    if baseline:
+        header += f" {'vs base':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for r in results:
+        line = (f"{r['template']:<28} {r['work_packages']:>7} {r['variables_ms']:>10.3f} "
+                f"{r['render_ms']:>10.3f} {r['peak_kb']:>10.1f} {r['output_bytes']:>10}")
+        change = relative_change(r, baseline)
+        if change is not None:
+            flag = "  REGRESSION" if is_regression(r, baseline) else ""
+            line += f" {change * 100:>+8.1f}%{flag}"
+        print(line)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="报告模板渲染基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="工作包数量（逗号分隔）")
+    parser.add_argument("--template", action="append", help="只测试指定模板（可重复）")
+    parser.add_argument("--repeat", type=int, default=5, help="每个组合的重复次数（取中位数）")
+    parser.add_argument("--templates-dir", help="模板目录（默认为 mcp-core/templates/reports）")
+    parser.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前 --json 输出的结果对比")
+    args = parser.parse_args()
+
+    engine = JinjaTemplateEngine(args.templates_dir)
+    template_ids = args.template or [t["id"] for t in await engine.list_templates()]
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = {(r["template"], r["work_packages"]): r for r in json.load(f)["results"]}
+
+    results = []
+    for size in sizes:
+        project, work_packages = make_project(size)
+        for template_id in template_ids:
+            results.append(await measure(engine, template_id, project, work_packages, args.repeat))
+
+    print_table(results, baseline)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "python": sys.version.split()[0],
+                "results": results
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.json_path}")
+
+    # 有回退时以非零状态退出，便于在 CI 中使用
+    return 1 if any(is_regression(r, baseline) for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
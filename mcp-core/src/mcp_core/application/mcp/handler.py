@@ -1,7 +1,7 @@
 """
 MCP 协议处理器
 """
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, AsyncIterator, Optional, Union
 from datetime import datetime
 
 from mcp_core.domain.interfaces import IOpenProjectClient
@@ -79,6 +79,61 @@ class MCPHandler:
                 request_id=request_id
             )
     
+    async def stream_request(self, request_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """流式处理 MCP 请求
+
+        支持流式输出的工具调用会先产出若干 notifications/report/chunk 通知（携带文本分块），
+        最后产出带有相同请求 ID 的响应；其他请求只产出一个普通响应。
+        """
+        request_id = request_data.get("id")
+        params = request_data.get("params") or {}
+
+        # params 不是对象时交给普通处理流程，由其返回 JSON-RPC 错误
+        if (request_data.get("method") != "tools/call" or not isinstance(params, dict)
+                or not self.tool_manager.supports_streaming(params.get("name"))):
+            yield await self.handle_request(request_data)
+            return
+
+        start_time = datetime.now()
+        method = request_data.get("method")
+        chunks = 0
+        try:
+            is_valid, error_msg = validate_json_rpc_request(request_data)
+            if not is_valid:
+                raise InvalidRequest(error_msg)
+
+            self.logger.log_mcp_request(method, str(request_id), params)
+
+            async for chunk in self.tool_manager.stream_tool(params):
+                chunks += 1
+                yield {
+                    "jsonrpc": "2.0",
+                    "method": "notifications/report/chunk",
+                    "params": {"requestId": request_id, "index": chunks - 1, "text": chunk}
+                }
+
+            duration = (datetime.now() - start_time).total_seconds()
+            self.logger.log_mcp_response(str(request_id), True, duration)
+            yield create_json_rpc_response(request_id, {
+                "content": [],
+                "streamed": True,
+                "chunks": chunks
+            })
+
+        except MCPError as e:
+            duration = (datetime.now() - start_time).total_seconds()
+            self.logger.log_mcp_response(str(request_id), False, duration)
+            self.logger.error(f"MCP Error in {method}", e)
+            yield create_json_rpc_error(code=e.code, message=e.message, data=e.data,
+                                        request_id=request_id)
+
+        except Exception as e:
+            duration = (datetime.now() - start_time).total_seconds()
+            self.logger.log_mcp_response(str(request_id), False, duration)
+            self.logger.error(f"Unexpected error in {method}", e)
+            yield create_json_rpc_error(code=-32603, message="Internal error", data=str(e),
+                                        request_id=request_id)
+
     async def _route_request(self, request_data: Dict[str, Any]) -> Any:
         """路由请求到具体处理方法"""
         method = request_data["method"]
@@ -1,20 +1,81 @@
 """
 MCP 工具管理器
 """
-from typing import Dict, Any, List
+import asyncio
+import time
+from typing import Dict, Any, List, AsyncIterator, Optional, Tuple
 from datetime import datetime, timedelta
 
 from mcp_core.domain.interfaces import IOpenProjectClient
-from mcp_core.shared.exceptions import InvalidParams, NotFoundError
+from mcp_core.domain.models import Report, get_status_classifier
+from mcp_core.domain.services import PortfolioReportService, ProjectDashboardService, ProjectSnapshot
+from mcp_core.infrastructure.analytics import (
+    IncrementalMetricsStore, MetricsHistoryStore, WorkPackageStore, burndown, forecast, velocity
+)
+from mcp_core.infrastructure.analytics.forecast import (
+    DEFAULT_HISTORY_DAYS, DEFAULT_SIMULATIONS, MAX_HISTORY_DAYS, MAX_SIMULATIONS, forecast_summary
+)
+from mcp_core.infrastructure.analytics.metrics_history import from_day_number
+from mcp_core.infrastructure.templates import (
+    JinjaTemplateEngine, VariableContext, template_variables
+)
+from mcp_core.shared.config import get_global_config
+from mcp_core.shared.exceptions import (
+    InvalidParams, NotFoundError, TemplateConflictError, TemplateError
+)
 from mcp_core.shared.logger import get_logger
 
+# 状态同步失败后重试的最小间隔（秒）
+STATUS_SYNC_RETRY_INTERVAL = 60
+
 
 class MCPToolManager:
     """MCP 工具管理器"""
+
+    # 支持流式输出的工具
+    STREAMING_TOOLS = ("generate_report_from_template", "get_portfolio_report",
+                       "generate_weekly_report", "generate_monthly_report")
     
     def __init__(self, openproject_client: IOpenProjectClient):
         self.client = openproject_client
         self.logger = get_logger("mcp.tools")
+        self.template_engine = JinjaTemplateEngine()
+        # 增量维护的项目指标（ANALYTICS_INCREMENTAL_ENABLED 时使用）
+        self.metrics_store = IncrementalMetricsStore()
+        self._metrics_history: Optional[MetricsHistoryStore] = None
+        self._statuses_synced = False
+        self._status_sync_retry_at = 0.0
+
+    @property
+    def metrics_history(self) -> MetricsHistoryStore:
+        """项目指标历史（首次访问时打开，需要 NumPy）"""
+        if self._metrics_history is None:
+            self._metrics_history = MetricsHistoryStore(get_global_config().metrics_history_dir)
+        return self._metrics_history
+
+    async def sync_statuses(self) -> bool:
+        """按 OpenProject 的状态列表校正状态分类（STATUS_SYNC_ENABLED 时）
+
+        成功后不再执行；失败时继续使用配置中的分类，间隔一段时间后重试。
+        返回分类是否已就绪（未启用同步时为 True）。
+        """
+        if self._statuses_synced or not get_global_config().status_sync_enabled:
+            return True
+        if not hasattr(self.client, "get_statuses"):
+            self._statuses_synced = True
+            return True
+        if time.monotonic() < self._status_sync_retry_at:
+            return False
+        try:
+            statuses = await self.client.get_statuses()
+        except Exception as e:
+            self._status_sync_retry_at = time.monotonic() + STATUS_SYNC_RETRY_INTERVAL
+            self.logger.warning(f"Failed to sync statuses: {e}")
+            return False
+        changed = get_status_classifier().register_statuses(statuses)
+        self._statuses_synced = True
+        self.logger.info(f"Status categories synced from OpenProject ({changed} changed)")
+        return True
     
     async def list_tools(self) -> Dict[str, Any]:
         """列出所有可用工具"""
@@ -114,6 +175,105 @@ class MCPToolManager:
                     "required": ["project_id"]
                 }
             },
+            {
+                "name": "get_portfolio_report",
+                "description": "生成项目组合报告（所有项目的健康度、风险和完成度统计）",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "只分析指定项目（ID 或标识符，默认全部项目）"
+                        },
+                        "max_concurrency": {
+                            "type": "integer",
+                            "description": "同时分析的项目数上限（默认 MAX_CONCURRENT_REQUESTS）"
+                        }
+                    },
+                    "required": []
+                }
+            },
+            {
+                "name": "get_project_dashboard",
+                "description": "获取项目仪表盘（健康度、风险和团队工作负载的综合分析）",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {
+                            "type": "string",
+                            "description": "项目 ID"
+                        }
+                    },
+                    "required": ["project_id"]
+                }
+            },
+            {
+                "name": "get_burndown",
+                "description": "获取项目燃尽数据（基于每日指标历史）",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {
+                            "type": "string",
+                            "description": "项目 ID"
+                        },
+                        "days": {
+                            "type": "integer",
+                            "description": "统计最近多少天（默认 30）"
+                        }
+                    },
+                    "required": ["project_id"]
+                }
+            },
+            {
+                "name": "get_velocity",
+                "description": "获取项目团队速度（每周完成的工作包数，基于每日指标历史）",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {
+                            "type": "string",
+                            "description": "项目 ID"
+                        },
+                        "weeks": {
+                            "type": "integer",
+                            "description": "统计最近多少周（默认 8）"
+                        }
+                    },
+                    "required": ["project_id"]
+                }
+            },
+            {
+                "name": "forecast_project_completion",
+                "description": "预测项目完成日期（基于历史关闭速度的 Monte Carlo 模拟）",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {
+                            "type": "string",
+                            "description": "项目 ID"
+                        },
+                        "simulations": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": MAX_SIMULATIONS,
+                            "description": f"模拟次数（默认 {DEFAULT_SIMULATIONS}）"
+                        },
+                        "history_days": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": MAX_HISTORY_DAYS,
+                            "description": f"用于估计速度的历史天数（默认 {DEFAULT_HISTORY_DAYS}）"
+                        },
+                        "target_date": {
+                            "type": "string",
+                            "description": "目标日期 (YYYY-MM-DD)，计算在此之前完成的概率"
+                        }
+                    },
+                    "required": ["project_id"]
+                }
+            },
             {
                 "name": "list_report_templates",
                 "description": "获取所有报告模板列表",
@@ -136,6 +296,10 @@ class MCPToolManager:
                         "template_data": {
                             "type": "object",
                             "description": "模板数据"
+                        },
+                        "expected_revision": {
+                            "type": "string",
+                            "description": "编辑前的模板版本（来自模板列表），模板已被他人修改时拒绝保存"
                         }
                     },
                     "required": ["template_id", "template_data"]
@@ -167,8 +331,48 @@ class MCPToolManager:
         
         return {"tools": tools}
     
+    def supports_streaming(self, tool_name: str) -> bool:
+        """工具是否支持流式输出"""
+        return tool_name in self.STREAMING_TOOLS
+
+    async def stream_tool(self, params: Dict[str, Any]) -> AsyncIterator[str]:
+        """流式调用工具，逐块产出文本内容"""
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        if not self.supports_streaming(tool_name):
+            raise InvalidParams(f"Tool does not support streaming: {tool_name}")
+
+        self.logger.info(f"Streaming tool: {tool_name}")
+        await self.sync_statuses()
+        if tool_name == "get_portfolio_report":
+            # 每个项目分析完成后立即输出一行，最后输出汇总报告
+            service = self._portfolio_service(arguments)
+            results = []
+            async for result in service.iter_project_results(arguments.get("project_ids")):
+                results.append(result)
+                yield service.format_project_result(result)
+            yield "\n"
+            for chunk in service.build_report(results).iter_markdown():
+                yield chunk
+            return
+        if tool_name in ("generate_weekly_report", "generate_monthly_report"):
+            # 报告逐节输出，不拼接完整的 Markdown
+            if tool_name == "generate_weekly_report":
+                report = await self._weekly_report(arguments)
+            else:
+                report = await self._monthly_report(arguments)
+            for chunk in report.iter_markdown():
+                yield chunk
+            return
+
+        template_id, template_vars = await self._prepare_template_report(arguments)
+        async for chunk in self.template_engine.render_template_stream(template_id, template_vars):
+            yield chunk
+
     async def call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """调用指定工具"""
+        if not isinstance(params, dict):
+            raise InvalidParams("Tool call params must be an object")
         tool_name = params.get("name")
         if not tool_name:
             raise InvalidParams("Missing tool name")
@@ -176,6 +380,7 @@ class MCPToolManager:
         arguments = params.get("arguments", {})
         
         self.logger.info(f"Calling tool: {tool_name}")
+        await self.sync_statuses()
         
         try:
             if tool_name == "get_projects":
@@ -190,6 +395,16 @@ class MCPToolManager:
                 return await self._generate_monthly_report(arguments)
             elif tool_name == "assess_project_risks":
                 return await self._assess_project_risks(arguments)
+            elif tool_name == "get_project_dashboard":
+                return await self._get_project_dashboard(arguments)
+            elif tool_name == "get_portfolio_report":
+                return await self._get_portfolio_report(arguments)
+            elif tool_name == "get_burndown":
+                return await self._get_burndown(arguments)
+            elif tool_name == "get_velocity":
+                return await self._get_velocity(arguments)
+            elif tool_name == "forecast_project_completion":
+                return await self._forecast_project_completion(arguments)
             elif tool_name == "list_report_templates":
                 return await self._list_report_templates(arguments)
             elif tool_name == "save_report_template":
@@ -280,8 +495,7 @@ class MCPToolManager:
             ]
         }
     
-    async def _generate_weekly_report(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """生成周报"""
+    async def _weekly_report(self, arguments: Dict[str, Any]) -> Report:
         project_id = arguments.get("project_id")
         start_date = arguments.get("start_date")
         end_date = arguments.get("end_date")
@@ -289,7 +503,21 @@ class MCPToolManager:
         if not all([project_id, start_date, end_date]):
             raise InvalidParams("Missing required parameters: project_id, start_date, end_date")
         
-        report = await self.client.generate_weekly_report(project_id, start_date, end_date)
+        return await self.client.generate_weekly_report(project_id, start_date, end_date)
+    
+    async def _monthly_report(self, arguments: Dict[str, Any]) -> Report:
+        project_id = arguments.get("project_id")
+        year = arguments.get("year")
+        month = arguments.get("month")
+        
+        if not all([project_id, year, month]):
+            raise InvalidParams("Missing required parameters: project_id, year, month")
+        
+        return await self.client.generate_monthly_report(project_id, year, month)
+    
+    async def _generate_weekly_report(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """生成周报"""
+        report = await self._weekly_report(arguments)
         
         return {
             "content": [
@@ -302,14 +530,7 @@ class MCPToolManager:
     
     async def _generate_monthly_report(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """生成月报"""
-        project_id = arguments.get("project_id")
-        year = arguments.get("year")
-        month = arguments.get("month")
-        
-        if not all([project_id, year, month]):
-            raise InvalidParams("Missing required parameters: project_id, year, month")
-        
-        report = await self.client.generate_monthly_report(project_id, year, month)
+        report = await self._monthly_report(arguments)
         
         return {
             "content": [
@@ -337,33 +558,188 @@ class MCPToolManager:
             ]
         }
 
+    async def _get_project_dashboard(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """获取项目仪表盘"""
+        project_id = arguments.get("project_id")
+        if not project_id:
+            raise InvalidParams("Missing project_id")
+
+        config = get_global_config()
+        if config.analytics_incremental_enabled:
+            source = await self.metrics_store.load_snapshot(self.client, project_id)
+        else:
+            source = self.client
+        service = ProjectDashboardService(source, columnar=config.analytics_columnar_enabled)
+        report = await service.get_project_dashboard(project_id)
+
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": report.to_markdown()
+                }
+            ]
+        }
+
+    async def _get_portfolio_report(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """生成项目组合报告"""
+        report = await self._portfolio_service(arguments).generate_portfolio_report(
+            arguments.get("project_ids")
+        )
+
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": report.to_markdown()
+                }
+            ]
+        }
+
+    def _portfolio_service(self, arguments: Dict[str, Any]) -> PortfolioReportService:
+        """按工具参数创建项目组合报告服务"""
+        project_ids = arguments.get("project_ids")
+        if project_ids is not None and not isinstance(project_ids, list):
+            raise InvalidParams("project_ids must be an array")
+
+        config = get_global_config()
+        max_concurrency = arguments.get("max_concurrency") or config.max_concurrent_requests
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise InvalidParams("max_concurrency must be a positive integer")
+
+        return PortfolioReportService(
+            self.client,
+            max_concurrency=max_concurrency,
+            columnar=config.analytics_columnar_enabled,
+            metrics_store=self.metrics_store if config.analytics_incremental_enabled else None
+        )
+
+    async def _get_burndown(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """获取项目燃尽数据"""
+        project = await self._require_project(arguments)
+        days = self._positive_int(arguments, "days", 30)
+
+        start = datetime.now().date() - timedelta(days=days - 1)
+        data = burndown(self.metrics_history.series(project.id, start=start))
+        if not len(data["days"]):
+            text = f"项目 {project.name} 最近 {days} 天没有指标历史记录"
+        else:
+            lines = [
+                f"# {project.name} 燃尽数据（最近 {days} 天）",
+                "",
+                "| 日期 | 剩余 | 已完成 | 延期 |",
+                "| --- | --- | --- | --- |"
+            ]
+            for day, remaining, completed, overdue in zip(
+                    data["days"], data["remaining"], data["completed"], data["overdue"]):
+                lines.append(f"| {from_day_number(day)} | {remaining} | {completed} | {overdue} |")
+            lines.extend(["", f"平均每日消耗: {data['burn_rate']:.2f} 个工作包"])
+            text = "\n".join(lines)
+
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": text
+                }
+            ]
+        }
+
+    async def _get_velocity(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """获取项目团队速度"""
+        project = await self._require_project(arguments)
+        weeks = self._positive_int(arguments, "weeks", 8)
+
+        today = datetime.now().date()
+        series = self.metrics_history.series(project.id, start=today - timedelta(weeks=weeks + 1))
+        if not len(series):
+            text = f"项目 {project.name} 最近 {weeks} 周没有指标历史记录"
+        else:
+            data = velocity(series, weeks, today)
+            lines = [
+                f"# {project.name} 团队速度（最近 {weeks} 周）",
+                "",
+                "| 周（截至） | 完成工作包 |",
+                "| --- | --- |"
+            ]
+            for week_end, completed in zip(data["week_ends"], data["completed"]):
+                lines.append(f"| {from_day_number(week_end)} | {completed} |")
+            lines.extend(["", f"平均每周完成: {data['average']:.1f} 个工作包"])
+            text = "\n".join(lines)
+
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": text
+                }
+            ]
+        }
+
+    async def _forecast_project_completion(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """预测项目完成日期"""
+        project_id = arguments.get("project_id")
+        if not project_id:
+            raise InvalidParams("Missing project_id")
+        simulations = self._positive_int(arguments, "simulations", DEFAULT_SIMULATIONS,
+                                         maximum=MAX_SIMULATIONS)
+        history_days = self._positive_int(arguments, "history_days", DEFAULT_HISTORY_DAYS,
+                                          maximum=MAX_HISTORY_DAYS)
+
+        target_date = None
+        if arguments.get("target_date"):
+            try:
+                target_date = datetime.strptime(arguments["target_date"], "%Y-%m-%d").date()
+            except (TypeError, ValueError):
+                raise InvalidParams("Invalid target_date format, expected YYYY-MM-DD")
+
+        snapshot = await ProjectSnapshot.load(self.client, project_id, columnar=True)
+        store = snapshot.store or WorkPackageStore.from_work_packages(
+            snapshot.work_packages, snapshot.project.id
+        )
+        # Monte Carlo 模拟为 CPU 密集运算，移出事件循环
+        result = await asyncio.to_thread(forecast, store, history_days=history_days,
+                                         simulations=simulations, target_date=target_date)
+
+        lines = [f"# {snapshot.project.name} 完成日期预测", ""]
+        lines.extend(forecast_summary(result))
+        lines.extend(["", "**最近两周燃尽:**", "", "| 日期 | 剩余 | 当日关闭 |", "| --- | --- | --- |"])
+        for point in result.to_dict()["burndown"][-14:]:
+            lines.append(f"| {point['date']} | {point['remaining']} | {point['closed']} |")
+
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": "\n".join(lines)
+                }
+            ]
+        }
+
+    async def _require_project(self, arguments: Dict[str, Any]):
+        """按 project_id 参数获取项目（支持标识符），不存在时报错"""
+        project_id = arguments.get("project_id")
+        if not project_id:
+            raise InvalidParams("Missing project_id")
+        project = await self.client.get_project(project_id)
+        if not project:
+            raise NotFoundError(f"Project not found: {project_id}")
+        return project
+
+    @staticmethod
+    def _positive_int(arguments: Dict[str, Any], name: str, default: int,
+                      maximum: Optional[int] = None) -> int:
+        """读取正整数参数（可指定上限）"""
+        value = arguments.get(name, default)
+        if not isinstance(value, int) or value < 1:
+            raise InvalidParams(f"{name} must be a positive integer")
+        if maximum is not None and value > maximum:
+            raise InvalidParams(f"{name} must not exceed {maximum}")
+        return value
+
     async def _list_report_templates(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """获取报告模板列表"""
-        import os
-        import yaml
-
-        templates = []
-        templates_dir = os.path.join(os.path.dirname(__file__), "../../../../templates/reports")
-
-        if os.path.exists(templates_dir):
-            for root, dirs, files in os.walk(templates_dir):
-                for file in files:
-                    if file.endswith('.yaml') or file.endswith('.yml'):
-                        file_path = os.path.join(root, file)
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                template_data = yaml.safe_load(f)
-                                if template_data and 'template_info' in template_data:
-                                    template_info = template_data['template_info']
-                                    templates.append({
-                                        "id": os.path.splitext(file)[0],
-                                        "name": template_info.get('name', file),
-                                        "type": template_info.get('type', 'unknown'),
-                                        "description": template_info.get('description', ''),
-                                        "version": template_info.get('version', '1.0')
-                                    })
-                        except Exception as e:
-                            self.logger.warning(f"Failed to load template {file_path}: {e}")
+        templates = await self.template_engine.list_templates()
 
         # 格式化输出
         if templates:
@@ -382,59 +758,42 @@ class MCPToolManager:
                     "type": "text",
                     "text": text
                 }
-            ]
+            ],
+            "templates": templates
         }
 
     async def _save_report_template(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """保存报告模板"""
-        import os
-        import yaml
-        from datetime import datetime
-
         template_id = arguments.get("template_id")
         template_data = arguments.get("template_data")
 
         if not template_id or not template_data:
             raise InvalidParams("Missing required parameters: template_id, template_data")
 
-        # 添加时间戳
-        if 'template_info' in template_data:
-            template_data['template_info']['updated_at'] = datetime.now().isoformat()
-
-        # 确定保存路径
-        templates_dir = os.path.join(os.path.dirname(__file__), "../../../../templates/reports")
-        template_type = template_data.get('template_info', {}).get('type', 'custom')
-        type_dir = os.path.join(templates_dir, template_type)
-
-        # 创建目录
-        os.makedirs(type_dir, exist_ok=True)
-
-        # 保存文件
-        file_path = os.path.join(type_dir, f"{template_id}.yaml")
+        if not await self.template_engine.validate_template(template_data):
+            raise InvalidParams(f"Invalid template: {template_id}")
 
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                yaml.dump(template_data, f, default_flow_style=False, allow_unicode=True)
-
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"模板 {template_id} 保存成功"
-                    }
-                ]
-            }
-        except Exception as e:
-            self.logger.error(f"Failed to save template {template_id}: {e}")
-            raise InvalidParams(f"Failed to save template: {str(e)}")
+            await self.template_engine.save_template(
+                template_id, template_data, expected_revision=arguments.get("expected_revision")
+            )
+        except TemplateConflictError:
+            raise
+        except TemplateError as e:
+            raise InvalidParams(e.message)
 
-    async def _generate_report_from_template(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """使用模板生成报告"""
-        import os
-        import yaml
-        from jinja2 import Template, Environment
-        from datetime import datetime, timedelta
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": f"模板 {template_id} 保存成功"
+                }
+            ],
+            "revision": self.template_engine.get_template_revision(template_id)
+        }
 
+    async def _prepare_template_report(self, arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """校验参数并准备模板变量"""
         template_id = arguments.get("template_id")
         project_id = arguments.get("project_id")
         custom_data = arguments.get("custom_data", {})
@@ -442,173 +801,37 @@ class MCPToolManager:
         if not template_id or not project_id:
             raise InvalidParams("Missing required parameters: template_id, project_id")
 
-        # 查找模板文件
-        templates_dir = os.path.join(os.path.dirname(__file__), "../../../../templates/reports")
-        template_file = None
-
-        for root, dirs, files in os.walk(templates_dir):
-            for file in files:
-                if file == f"{template_id}.yaml" or file == f"{template_id}.yml":
-                    template_file = os.path.join(root, file)
-                    break
-            if template_file:
-                break
-
-        if not template_file:
+        # 查找模板
+        if not await self.template_engine.get_template(template_id):
             raise InvalidParams(f"Template not found: {template_id}")
 
-        # 加载模板
-        try:
-            with open(template_file, 'r', encoding='utf-8') as f:
-                template_data = yaml.safe_load(f)
-        except Exception as e:
-            raise InvalidParams(f"Failed to load template: {str(e)}")
-
         # 获取项目数据
         project = await self.client.get_project(project_id)
         if not project:
             raise InvalidParams(f"Project not found: {project_id}")
 
-        # 获取工作包数据
-        work_packages = await self.client.get_work_packages(project_id)
+        # 只计算模板实际引用、且未由 custom_data 提供的变量
+        referenced = self.template_engine.get_referenced_variables(template_id)
+        names = [name for name in referenced if name not in custom_data]
 
-        # 修复完成度计算逻辑 - 基于OpenProject实际状态
-        completed_wps = 0
-        in_progress_wps = 0
-        new_wps = 0
-        scheduled_wps = 0
-        total_progress = 0
-
-        # OpenProject状态映射
-        status_mapping = {
-            # 完成状态
-            'closed': 100, 'resolved': 100, 'done': 100, 'completed': 100,
-            'finished': 100, 'delivered': 100, '完成': 100, '已完成': 100,
-
-            # 进行中状态
-            'in progress': 50, 'in-progress': 50, 'active': 50, 'working': 50,
-            'ongoing': 50, '进行中': 50, '处理中': 50,
-
-            # 新建/未开始状态
-            'new': 0, 'open': 0, 'created': 0, 'todo': 0, 'backlog': 0,
-            'not started': 0, '新建': 0, '未开始': 0,
-
-            # 计划中状态
-            'scheduled': 10, 'planned': 10, 'to be scheduled': 5,
-            '计划中': 10, '已计划': 10,
-
-            # 其他状态
-            'rejected': 0, 'cancelled': 0, 'on hold': 0, 'blocked': 0,
-            '已拒绝': 0, '已取消': 0, '暂停': 0, '阻塞': 0
-        }
+        # 模板不需要工作包统计时不请求工作包
+        work_packages = []
+        schedule = None
+        if template_variables.needs_work_packages(names):
+            work_packages = await self.client.get_work_packages(project_id)
+            # 缓存客户端在工作包列表未变化时复用同一个日程索引
+            if hasattr(self.client, "get_schedule_index"):
+                schedule = self.client.get_schedule_index(project_id, work_packages)
 
-        for wp in work_packages:
-            status = wp.status.lower() if wp.status else 'unknown'
+        context = VariableContext(project, work_packages, schedule=schedule)
+        template_vars = {**template_variables.resolve(names, context), **custom_data}
 
-            # 获取状态对应的进度值
-            if status in status_mapping:
-                progress = status_mapping[status]
-            elif wp.progress is not None and wp.progress >= 0:
-                # 如果有具体进度信息，使用实际进度
-                progress = wp.progress
-            else:
-                # 未知状态默认为0
-                progress = 0
-
-            total_progress += progress
-
-            # 统计各状态数量
-            if progress >= 100:
-                completed_wps += 1
-            elif progress >= 30:  # 进行中的阈值
-                in_progress_wps += 1
-            elif progress >= 5:   # 已计划的阈值
-                scheduled_wps += 1
-            else:
-                new_wps += 1
-
-        total_wps = len(work_packages)
-        # 使用加权平均计算整体完成率
-        completion_rate = round(total_progress / total_wps, 1) if total_wps > 0 else 0
-
-        # 准备模板变量
-        now = datetime.now()
-        start_date = (now - timedelta(days=7)).strftime('%Y-%m-%d')
-        end_date = now.strftime('%Y-%m-%d')
-
-        # 分析工作包状态分布
-        status_distribution = {}
-        for wp in work_packages:
-            status = wp.status or "未分配状态"
-            status_distribution[status] = status_distribution.get(status, 0) + 1
-
-        # 创建Jinja2环境并添加自定义过滤器
-        def add_days_filter(date_str, days):
-            """添加天数到日期字符串"""
-            try:
-                if isinstance(date_str, str):
-                    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                else:
-                    date_obj = date_str
-                new_date = date_obj + timedelta(days=days)
-                return new_date.strftime("%Y-%m-%d")
-            except:
-                return date_str
-
-        def zfill_filter(value, width):
-            """用零填充数字到指定宽度"""
-            return str(value).zfill(width)
-
-        # 创建Jinja2环境
-        jinja_env = Environment()
-        jinja_env.filters['add_days'] = add_days_filter
-        jinja_env.filters['zfill'] = zfill_filter
-
-        template_vars = {
-            "project_name": project.name,
-            "project_id": project.id,
-            "project_description": project.description or "",
-            "start_date": start_date,
-            "end_date": end_date,
-            "completion_rate": completion_rate,
-            "completed_work_packages": completed_wps,
-            "in_progress_work_packages": in_progress_wps,
-            "new_work_packages": new_wps,
-            "scheduled_work_packages": scheduled_wps,
-            "total_work_packages": total_wps,
-            "remaining_work_packages": total_wps - completed_wps,
-            "status_distribution": status_distribution,
-            "team_member_count": 5,  # 示例数据
-            # 日本式报告需要的详细信息
-            "report_date": end_date,
-            "project_health_status": "良好" if completion_rate >= 70 else "要注意" if completion_rate >= 30 else "要対策",
-            "work_packages_today": [],  # 今日的工作包（可以通过日期过滤）
-            "quality_score": 95,  # 品质分数
-            "budget_status": "予算内",  # 预算状态
-            "risk_level": "低" if completion_rate >= 70 else "中" if completion_rate >= 30 else "高",
-            **custom_data
-        }
+        return template_id, template_vars
 
-        # 渲染标题
-        title_template = jinja_env.from_string(template_data.get('title_template', '{{project_name}} 报告'))
-        title = title_template.render(**template_vars)
-
-        # 渲染内容
-        content = f"# {title}\n\n"
-
-        sections = template_data.get('sections', [])
-        for section in sorted(sections, key=lambda x: x.get('order', 999)):
-            section_name = section.get('section_name', '')
-            content_template = section.get('content_template', '')
-
-            if content_template:
-                try:
-                    section_template = jinja_env.from_string(content_template)
-                    section_content = section_template.render(**template_vars)
-                    content += f"{section_content}\n\n"
-                except Exception as e:
-                    self.logger.warning(f"Failed to render section {section_name}: {e}")
-                    content += f"## {section_name}\n\n渲染失败: {str(e)}\n\n"
+    async def _generate_report_from_template(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """使用模板生成报告"""
+        template_id, template_vars = await self._prepare_template_report(arguments)
+        content = await self.template_engine.render_template(template_id, template_vars)
 
         return {
             "content": [
@@ -2,6 +2,7 @@
 OpenProject 客户端接口定义
 """
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 from mcp_core.domain.models import Project, WorkPackage, User, Report
@@ -38,8 +39,15 @@ class IOpenProjectClient(ABC):
     
     # 工作包相关方法
     @abstractmethod
-    async def get_work_packages(self, project_id: Optional[str] = None) -> List[WorkPackage]:
-        """获取工作包列表"""
+    async def get_work_packages(self, project_id: Optional[str] = None,
+                                updated_since: Optional[datetime] = None) -> List[WorkPackage]:
+        """获取工作包列表（可只获取指定时间之后更新的，用于增量同步）"""
+        pass
+    
+    @abstractmethod
+    async def count_work_packages(self, project_id: Optional[str] = None,
+                                  updated_since: Optional[datetime] = None) -> int:
+        """统计工作包数量（可只统计指定时间之后更新的，用于变更探测）"""
         pass
     
     @abstractmethod
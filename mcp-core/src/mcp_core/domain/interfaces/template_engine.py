@@ -19,8 +19,9 @@ class ITemplateEngine(ABC):
         pass
     
     @abstractmethod
-    async def save_template(self, template_id: str, template_data: Dict[str, Any]) -> bool:
-        """保存模板"""
+    async def save_template(self, template_id: str, template_data: Dict[str, Any],
+                            expected_revision: Optional[str] = None) -> bool:
+        """保存模板（expected_revision 与当前版本不一致时拒绝保存）"""
         pass
     
     @abstractmethod
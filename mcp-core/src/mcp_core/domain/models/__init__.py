@@ -7,7 +7,8 @@
 from .project import Project
 from .work_package import WorkPackage
 from .user import User
-from .report import Report, ReportSection
+from .report import MarkdownWriter, Report, ReportBuilder, ReportSection
+from .status import StatusCategory, StatusClassifier, get_status_classifier, set_status_classifier
 
 __all__ = [
     "Project",
@@ -15,4 +16,10 @@ __all__ = [
     "User",
     "Report",
     "ReportSection",
+    "ReportBuilder",
+    "MarkdownWriter",
+    "StatusCategory",
+    "StatusClassifier",
+    "get_status_classifier",
+    "set_status_classifier",
 ]
@@ -1,11 +1,59 @@
 """
 报告领域模型
 """
+from bisect import insort
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Protocol, Tuple
 from pydantic import BaseModel, Field, validator
 
 
+class TextSink(Protocol):
+    """可写入文本的对象（文件、StringIO、响应流等）"""
+
+    def write(self, text: str) -> Any:
+        ...
+
+
+class MarkdownWriter:
+    """缓冲的文本写入器
+
+    片段先追加到列表，取值时一次性拼接，避免在循环中用 += 反复复制整段文本。
+    """
+
+    def __init__(self, text: str = ""):
+        self._parts: List[str] = [text] if text else []
+
+    def write(self, text: str) -> "MarkdownWriter":
+        """追加文本片段"""
+        self._parts.append(text)
+        return self
+
+    def line(self, text: str = "") -> "MarkdownWriter":
+        """追加一行"""
+        self._parts.append(text)
+        self._parts.append("\n")
+        return self
+
+    def lines(self, lines: Iterable[str]) -> "MarkdownWriter":
+        """追加多行"""
+        for text in lines:
+            self.line(text)
+        return self
+
+    def getvalue(self) -> str:
+        """拼接后的文本"""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def __bool__(self) -> bool:
+        return any(self._parts)
+
+
+def _section_order(section: "ReportSection") -> int:
+    return section.order or 999
+
+
 class ReportSection(BaseModel):
     """报告章节"""
     
@@ -65,16 +113,18 @@ class Report(BaseModel):
             raise ValueError('报告摘要不能为空')
         return v.strip()
     
+    @validator('sections')
+    def sections_must_be_ordered(cls, v):
+        # 章节列表始终按顺序保存，添加章节时二分插入即可
+        return sorted(v, key=_section_order)
+    
     def add_section(self, title: str, content: str, order: Optional[int] = None) -> None:
-        """添加报告章节"""
+        """添加报告章节（插入到同顺序章节之后）"""
         if order is None:
             order = len(self.sections) + 1
         
         section = ReportSection(title=title, content=content, order=order)
-        self.sections.append(section)
-        
-        # 按顺序排序
-        self.sections.sort(key=lambda x: x.order or 999)
+        insort(self.sections, section, key=_section_order)
     
     def get_section_by_title(self, title: str) -> Optional[ReportSection]:
         """根据标题获取章节"""
@@ -96,7 +146,16 @@ class Report(BaseModel):
     
     def to_markdown(self) -> str:
         """转换为 Markdown 格式"""
-        lines = [
+        return "".join(self.iter_markdown())
+    
+    def write_markdown(self, sink: TextSink) -> None:
+        """逐节写入 Markdown 到可写对象"""
+        for chunk in self.iter_markdown():
+            sink.write(chunk)
+    
+    def iter_markdown(self) -> Iterator[str]:
+        """逐节生成 Markdown 文本（依次拼接即为完整报告）"""
+        yield "\n".join([
             f"# {self.title}",
             "",
             f"**项目**: {self.project_name}",
@@ -106,22 +165,15 @@ class Report(BaseModel):
             f"## 概述",
             self.summary,
             ""
-        ]
+        ])
         
         # 添加章节
-        for section in sorted(self.sections, key=lambda x: x.order or 999):
-            lines.extend([
-                f"## {section.title}",
-                section.content,
-                ""
-            ])
+        for section in self.sections:
+            yield f"\n## {section.title}\n{section.content}\n"
         
         # 添加统计数据
         if self.statistics:
-            lines.extend([
-                "## 统计数据",
-                ""
-            ])
+            lines = ["", "## 统计数据", ""]
             for key, value in self.statistics.items():
                 if isinstance(value, dict):
                     lines.append(f"**{key}**:")
@@ -130,8 +182,7 @@ class Report(BaseModel):
                 else:
                     lines.append(f"- {key}: {value}")
             lines.append("")
-        
-        return "\n".join(lines)
+            yield "\n".join(lines)
     
     class Config:
         json_encoders = {
@@ -156,3 +207,41 @@ class Report(BaseModel):
                 }
             }
         }
+
+
+class ReportBuilder:
+    """报告构建器
+
+    每个章节对应一个缓冲写入器，章节按顺序二分插入，build 时一次性生成 Report。
+    """
+
+    def __init__(self, title: str, project_name: str, period: str, summary: str = ""):
+        self.title = title
+        self.project_name = project_name
+        self.period = period
+        self.summary = summary
+        self.statistics: Dict[str, Any] = {}
+        # (排序键, 添加序号, 标题, 顺序, 写入器)，按前两项有序
+        self._sections: List[Tuple[int, int, str, Optional[int], MarkdownWriter]] = []
+
+    def section(self, title: str, order: Optional[int] = None, text: str = "") -> MarkdownWriter:
+        """新增章节，返回用于写入章节内容的写入器（未指定顺序时按添加顺序）"""
+        writer = MarkdownWriter(text)
+        insort(self._sections, (order or 999, len(self._sections), title, order, writer))
+        return writer
+
+    def build(self) -> Report:
+        """生成报告（跳过没有内容的章节）"""
+        sections = []
+        for _, _, title, order, writer in self._sections:
+            content = writer.getvalue()
+            if content.strip():
+                sections.append(ReportSection(title=title, content=content, order=order))
+        return Report(
+            title=self.title,
+            project_name=self.project_name,
+            period=self.period,
+            summary=self.summary,
+            sections=sections,
+            statistics=self.statistics
+        )
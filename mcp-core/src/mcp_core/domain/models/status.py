@@ -0,0 +1,181 @@
+"""
+工作包状态分类
+
+将状态名称映射到统一的分类（新建/计划中/进行中/完成等）和进度值，
+所有服务、模板变量和分析模块共用同一个分类器，保证统计口径一致。
+分类表在启动时由默认值和配置构建一次（可选地用 OpenProject /statuses
+的 isClosed 标志校正），查询结果按原始状态名缓存，热循环中不再重复转小写。
+"""
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from mcp_core.shared.config import get_global_config
+from mcp_core.shared.exceptions import ConfigurationError
+
+
+class StatusCategory(IntEnum):
+    """状态分类（整数编码，可直接用于向量化计算）"""
+    UNKNOWN = 0
+    NEW = 1
+    SCHEDULED = 2
+    IN_PROGRESS = 3
+    ON_HOLD = 4
+    REJECTED = 5
+    COMPLETED = 6
+
+
+_COMPLETED = StatusCategory.COMPLETED
+_IN_PROGRESS = StatusCategory.IN_PROGRESS
+
+# 分类的默认进度值（未知状态没有默认值，使用工作包自身的进度）
+CATEGORY_PROGRESS: Dict[StatusCategory, Optional[int]] = {
+    StatusCategory.UNKNOWN: None,
+    StatusCategory.NEW: 0,
+    StatusCategory.SCHEDULED: 10,
+    StatusCategory.IN_PROGRESS: 50,
+    StatusCategory.ON_HOLD: 0,
+    StatusCategory.REJECTED: 0,
+    StatusCategory.COMPLETED: 100,
+}
+
+# 默认的状态名称（小写）→ 分类
+DEFAULT_STATUS_CATEGORIES: Dict[str, StatusCategory] = {
+    # 完成状态
+    **dict.fromkeys(['closed', 'resolved', 'done', 'completed', 'finished', 'delivered',
+                     '完成', '已完成'], StatusCategory.COMPLETED),
+
+    # 进行中状态
+    **dict.fromkeys(['in progress', 'in-progress', 'in_progress', 'active', 'working',
+                     'ongoing', 'feedback', '进行中', '处理中'], StatusCategory.IN_PROGRESS),
+
+    # 新建/未开始状态
+    **dict.fromkeys(['new', 'open', 'created', 'todo', 'backlog', 'not started',
+                     '新建', '未开始'], StatusCategory.NEW),
+
+    # 计划中状态
+    **dict.fromkeys(['scheduled', 'planned', 'to be scheduled', '计划中', '已计划'],
+                    StatusCategory.SCHEDULED),
+
+    # 其他状态
+    **dict.fromkeys(['rejected', 'cancelled', '已拒绝', '已取消'], StatusCategory.REJECTED),
+    **dict.fromkeys(['on hold', 'on_hold', 'blocked', '暂停', '阻塞'], StatusCategory.ON_HOLD),
+}
+
+# 进度值与所属分类默认值不同的状态
+DEFAULT_STATUS_PROGRESS: Dict[str, int] = {
+    'to be scheduled': 5,
+}
+
+
+def _normalize(name: str) -> str:
+    return name.strip().lower()
+
+
+def parse_category(value: Any) -> StatusCategory:
+    """解析分类名称（如 "completed"、"in_progress"）"""
+    if isinstance(value, StatusCategory):
+        return value
+    try:
+        return StatusCategory[str(value).strip().upper().replace('-', '_').replace(' ', '_')]
+    except KeyError:
+        valid = ", ".join(category.name.lower() for category in StatusCategory)
+        raise ConfigurationError(f"Unknown status category: {value} (expected one of: {valid})")
+
+
+class StatusClassifier:
+    """状态分类器"""
+
+    def __init__(self, overrides: Optional[Dict[str, Any]] = None):
+        self._categories: Dict[str, StatusCategory] = dict(DEFAULT_STATUS_CATEGORIES)
+        self._progress: Dict[str, int] = dict(DEFAULT_STATUS_PROGRESS)
+        # 配置中显式指定的分类，优先于从 OpenProject 同步的结果
+        self._overrides = {_normalize(name): parse_category(category)
+                           for name, category in (overrides or {}).items()}
+        for name, category in self._overrides.items():
+            self._categories[name] = category
+            self._progress.pop(name, None)
+        # 原始状态名 → (分类, 进度)，首次遇到时计算
+        self._lookup: Dict[Optional[str], Tuple[StatusCategory, Optional[int]]] = {}
+        # 分类表每次变化时递增，依赖分类结果的缓存据此判断是否失效
+        self.version = 0
+
+    def _resolve(self, status: Optional[str]) -> Tuple[StatusCategory, Optional[int]]:
+        name = _normalize(status) if status else ''
+        category = self._categories.get(name, StatusCategory.UNKNOWN)
+        entry = self._lookup[status] = (category, self._progress.get(name, CATEGORY_PROGRESS[category]))
+        return entry
+
+    # 以下方法在热循环中调用，命中缓存时只做一次字典查找
+    def classify(self, status: Optional[str]) -> StatusCategory:
+        """状态对应的分类"""
+        return (self._lookup.get(status) or self._resolve(status))[0]
+
+    def progress(self, status: Optional[str]) -> Optional[int]:
+        """状态对应的进度值（未知状态为 None）"""
+        return (self._lookup.get(status) or self._resolve(status))[1]
+
+    def is_completed(self, status: Optional[str]) -> bool:
+        return (self._lookup.get(status) or self._resolve(status))[0] is _COMPLETED
+
+    def is_in_progress(self, status: Optional[str]) -> bool:
+        return (self._lookup.get(status) or self._resolve(status))[0] is _IN_PROGRESS
+
+    def category_codes(self, statuses: Sequence[Optional[str]]) -> List[int]:
+        """一组状态名称对应的分类编码（用于把状态编码列映射为分类编码列）"""
+        return [int(self.classify(status)) for status in statuses]
+
+    def register(self, name: str, category: Any, progress: Optional[int] = None) -> None:
+        """添加或修改一个状态的分类"""
+        key = _normalize(name)
+        self._categories[key] = parse_category(category)
+        if progress is None:
+            self._progress.pop(key, None)
+        else:
+            self._progress[key] = progress
+        self._changed()
+
+    def register_statuses(self, statuses: Iterable[Dict[str, Any]]) -> int:
+        """按 OpenProject 状态列表（name, is_closed）校正分类，返回变化的状态数
+
+        关闭的状态归为完成（已归为拒绝的除外），未关闭却被默认归为完成的状态
+        改为未知；配置中显式指定的状态不受影响。
+        """
+        changed = 0
+        for status in statuses:
+            key = _normalize(status.get("name") or '')
+            if not key or key in self._overrides:
+                continue
+            current = self._categories.get(key, StatusCategory.UNKNOWN)
+            if status.get("is_closed"):
+                category = current if current == StatusCategory.REJECTED else StatusCategory.COMPLETED
+            elif current == StatusCategory.COMPLETED:
+                category = StatusCategory.UNKNOWN
+            else:
+                category = current
+            if category != current:
+                self._categories[key] = category
+                changed += 1
+        if changed:
+            self._changed()
+        return changed
+
+    def _changed(self) -> None:
+        self._lookup.clear()
+        self.version += 1
+
+
+_classifier_instance: Optional[StatusClassifier] = None
+
+
+def get_status_classifier() -> StatusClassifier:
+    """获取全局状态分类器（首次调用时由配置构建）"""
+    global _classifier_instance
+    if _classifier_instance is None:
+        _classifier_instance = StatusClassifier(get_global_config().status_categories)
+    return _classifier_instance
+
+
+def set_status_classifier(classifier: StatusClassifier) -> None:
+    """设置全局状态分类器"""
+    global _classifier_instance
+    _classifier_instance = classifier
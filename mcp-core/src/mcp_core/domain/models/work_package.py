@@ -6,6 +6,8 @@ from typing import Optional
 from enum import Enum
 from pydantic import BaseModel, Field, validator
 
+from .status import get_status_classifier
+
 
 class WorkPackageType(str, Enum):
     """工作包类型枚举"""
@@ -70,11 +72,11 @@ class WorkPackage(BaseModel):
     
     def is_completed(self) -> bool:
         """检查工作包是否已完成"""
-        return self.status and self.status.lower() in ['closed', 'resolved']
+        return get_status_classifier().is_completed(self.status)
     
     def is_in_progress(self) -> bool:
         """检查工作包是否正在进行中"""
-        return self.status and self.status.lower() in ['in_progress', 'feedback']
+        return get_status_classifier().is_in_progress(self.status)
     
     def is_overdue(self) -> bool:
         """检查工作包是否已延期"""
@@ -4,14 +4,25 @@
 包含核心业务逻辑服务
 """
 
+from .project_metrics import ProjectMetrics
+from .project_snapshot import ProjectSnapshot, resolve_snapshot
+from .schedule_index import ScheduleIndex
 from .report_generator import ReportGeneratorService
 from .risk_assessor import RiskAssessorService
 from .workload_analyzer import WorkloadAnalyzerService
 from .health_checker import HealthCheckerService
+from .dashboard import ProjectDashboardService
+from .portfolio import PortfolioReportService
 
 __all__ = [
     "ReportGeneratorService",
     "RiskAssessorService",
     "WorkloadAnalyzerService", 
     "HealthCheckerService",
+    "ProjectDashboardService",
+    "PortfolioReportService",
+    "ProjectMetrics",
+    "ProjectSnapshot",
+    "resolve_snapshot",
+    "ScheduleIndex",
 ]
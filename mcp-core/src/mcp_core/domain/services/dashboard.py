@@ -0,0 +1,59 @@
+"""
+项目仪表盘领域服务
+"""
+from typing import List, Union
+
+from mcp_core.domain.models import Report, ReportSection
+from mcp_core.domain.interfaces import IOpenProjectClient
+
+from .health_checker import HealthCheckerService
+from .project_snapshot import ProjectSnapshot, resolve_snapshot
+from .risk_assessor import RiskAssessorService
+from .workload_analyzer import WorkloadAnalyzerService
+
+
+class ProjectDashboardService:
+    """项目仪表盘服务：健康度、风险和工作负载的综合报告"""
+
+    def __init__(self, openproject_client: Union[IOpenProjectClient, ProjectSnapshot],
+                 columnar: bool = False):
+        self.client = openproject_client
+        # 从客户端加载快照时是否使用列式存储（向量化计算指标）
+        self.columnar = columnar
+
+    async def get_project_dashboard(self, project_id: str) -> Report:
+        """基于同一份项目快照依次执行各项分析，合并为一份报告"""
+        snapshot = await resolve_snapshot(self.client, project_id, columnar=self.columnar)
+
+        # 快照加载后各项分析都是纯计算，不再等待 I/O，直接依次执行
+        health = await HealthCheckerService(snapshot).check_project_health(project_id)
+        risks = await RiskAssessorService(snapshot).assess_project_risks(project_id)
+        workload = await WorkloadAnalyzerService(snapshot).analyze_team_workload(project_id)
+
+        sections = [
+            ReportSection(title=title, content=self._format_report(report), order=order)
+            for order, (title, report) in enumerate(
+                [("健康度", health), ("风险", risks), ("工作负载", workload)], 1
+            )
+        ]
+
+        return Report(
+            title=f"{snapshot.project.name} 项目仪表盘",
+            project_name=snapshot.project.name,
+            period=f"分析时间: {snapshot.metrics.now.strftime('%Y-%m-%d %H:%M')}",
+            summary="\n".join(f"- {report.summary}" for report in (health, risks, workload)),
+            sections=sections,
+            statistics={
+                "health": health.statistics,
+                "risks": risks.statistics,
+                "workload": workload.statistics
+            }
+        )
+
+    @staticmethod
+    def _format_report(report: Report) -> str:
+        """将子报告的章节格式化为仪表盘中的一节"""
+        lines: List[str] = []
+        for section in sorted(report.sections, key=lambda x: x.order or 999):
+            lines.extend([f"### {section.title}", section.content, ""])
+        return "\n".join(lines) or report.summary
@@ -2,28 +2,29 @@
 项目健康度检查领域服务
 """
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
-from mcp_core.domain.models import Project, WorkPackage, Report, ReportSection
+from mcp_core.domain.models import Project, WorkPackage, Report, ReportBuilder
 from mcp_core.domain.interfaces import IOpenProjectClient
-from mcp_core.shared.exceptions import NotFoundError
+
+from .project_snapshot import ProjectSnapshot, resolve_snapshot
 
 
 class HealthCheckerService:
     """项目健康度检查服务"""
     
-    def __init__(self, openproject_client: IOpenProjectClient):
+    def __init__(self, openproject_client: Union[IOpenProjectClient, ProjectSnapshot],
+                 columnar: bool = False):
+        # 可以传入客户端，也可以传入同一请求中共享的项目快照
         self.client = openproject_client
+        self.columnar = columnar
     
     async def check_project_health(self, project_id: str) -> Report:
         """检查项目健康度"""
-        # 获取项目信息
-        project = await self.client.get_project(project_id)
-        if not project:
-            raise NotFoundError(f"Project not found: {project_id}")
-
-        # 获取工作包
-        work_packages = await self.client.get_work_packages(project_id)
+        # 获取项目和工作包
+        snapshot = await resolve_snapshot(self.client, project_id, columnar=self.columnar)
+        project = snapshot.project
+        work_packages = snapshot.work_packages
 
         if not work_packages:
             return Report(
@@ -34,20 +35,19 @@ class HealthCheckerService:
             )
 
         # 健康度指标计算
-        total_wps = len(work_packages)
-        completed_wps = len([wp for wp in work_packages if wp.status == 'Closed'])
-        in_progress_wps = len([wp for wp in work_packages if wp.status == 'In progress'])
-        overdue_wps = len([wp for wp in work_packages
-                         if wp.due_date and wp.due_date < datetime.now() and wp.status != 'Closed'])
-        unassigned_wps = len([wp for wp in work_packages if not wp.assigned_to])
-        high_priority_incomplete = len([wp for wp in work_packages
-                                      if wp.priority in ['High', 'Immediate'] and wp.status != 'Closed'])
+        metrics = snapshot.metrics
+        total_wps = metrics.total
+        completed_wps = metrics.completed
+        in_progress_wps = metrics.in_progress
+        overdue_wps = metrics.overdue_count
+        unassigned_wps = metrics.unassigned_count
+        high_priority_incomplete = len(metrics.high_priority_incomplete)
 
         # 计算健康度分数 (0-100)
         health_score = 100
 
         # 完成率影响 (40%)
-        completion_rate = (completed_wps / total_wps) * 100
+        completion_rate = metrics.completion_rate
         if completion_rate < 30:
             health_score -= 40
         elif completion_rate < 60:
@@ -56,7 +56,7 @@ class HealthCheckerService:
             health_score -= 10
 
         # 延期率影响 (30%)
-        overdue_rate = (overdue_wps / total_wps) * 100
+        overdue_rate = metrics.overdue_rate
         if overdue_rate > 20:
             health_score -= 30
         elif overdue_rate > 10:
@@ -65,7 +65,7 @@ class HealthCheckerService:
             health_score -= 10
 
         # 分配率影响 (20%)
-        assignment_rate = ((total_wps - unassigned_wps) / total_wps) * 100
+        assignment_rate = metrics.assignment_rate
         if assignment_rate < 70:
             health_score -= 20
         elif assignment_rate < 85:
@@ -97,20 +97,22 @@ class HealthCheckerService:
             health_emoji = "🔴"
 
         # 生成报告内容
-        sections = []
+        builder = ReportBuilder(
+            title=f"{project.name} 项目健康度检查",
+            project_name=project.name,
+            period=f"检查时间: {metrics.now.strftime('%Y-%m-%d %H:%M')}",
+            summary=f"项目健康度: {health_level} ({health_score:.1f}分)"
+        )
 
         # 健康度概览
-        overview_content = f"{health_emoji} **项目健康度: {health_level} ({health_score:.1f}分)**\n\n"
-        overview_content += f"**关键指标:**\n"
-        overview_content += f"- 完成率: {completion_rate:.1f}% ({completed_wps}/{total_wps})\n"
-        overview_content += f"- 延期率: {overdue_rate:.1f}% ({overdue_wps}/{total_wps})\n"
-        overview_content += f"- 分配率: {assignment_rate:.1f}% ({total_wps - unassigned_wps}/{total_wps})\n"
-        overview_content += f"- 进行中: {in_progress_wps} 个工作包"
-
-        sections.append(ReportSection(
-            title="健康度概览",
-            content=overview_content
-        ))
+        builder.section("健康度概览").lines([
+            f"{health_emoji} **项目健康度: {health_level} ({health_score:.1f}分)**",
+            "",
+            "**关键指标:**",
+            f"- 完成率: {completion_rate:.1f}% ({completed_wps}/{total_wps})",
+            f"- 延期率: {overdue_rate:.1f}% ({overdue_wps}/{total_wps})",
+            f"- 分配率: {assignment_rate:.1f}% ({total_wps - unassigned_wps}/{total_wps})"
+        ]).write(f"- 进行中: {in_progress_wps} 个工作包")
 
         # 问题分析
         issues = []
@@ -133,31 +135,17 @@ class HealthCheckerService:
             recommendations.append("优先处理高优先级工作包，确保关键任务按时完成")
 
         if issues:
-            issues_content = "**发现的问题:**\n"
-            for i, issue in enumerate(issues, 1):
-                issues_content += f"{i}. {issue}\n"
-
-            sections.append(ReportSection(
-                title="问题分析",
-                content=issues_content
-            ))
-
-            recommendations_content = "**改进建议:**\n"
-            for i, rec in enumerate(recommendations, 1):
-                recommendations_content += f"{i}. {rec}\n"
-
-            sections.append(ReportSection(
-                title="改进建议",
-                content=recommendations_content
-            ))
+            builder.section("问题分析", text="**发现的问题:**\n").lines(
+                f"{i}. {issue}" for i, issue in enumerate(issues, 1)
+            )
+            builder.section("改进建议", text="**改进建议:**\n").lines(
+                f"{i}. {rec}" for i, rec in enumerate(recommendations, 1)
+            )
         else:
-            sections.append(ReportSection(
-                title="项目状态",
-                content="✅ 项目整体运行良好，无明显问题。"
-            ))
+            builder.section("项目状态", text="✅ 项目整体运行良好，无明显问题。")
 
         # 统计数据
-        statistics = {
+        builder.statistics = {
             "health_score": round(health_score, 1),
             "health_level": health_level,
             "completion_rate": round(completion_rate, 1),
@@ -171,11 +159,4 @@ class HealthCheckerService:
             "issues_count": len(issues)
         }
 
-        return Report(
-            title=f"{project.name} 项目健康度检查",
-            project_name=project.name,
-            period=f"检查时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-            summary=f"项目健康度: {health_level} ({health_score:.1f}分)",
-            sections=sections,
-            statistics=statistics
-        )
+        return builder.build()
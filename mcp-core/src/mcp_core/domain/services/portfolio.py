@@ -0,0 +1,174 @@
+"""
+项目组合报告领域服务
+
+对所有项目（或指定项目）执行健康度检查、风险评估和完成度统计。
+项目列表只获取一次，各项目的工作包在并发上限内并行加载，
+每个项目完成后立即产出结果，便于流式输出。
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from mcp_core.domain.models import Project, Report, ReportSection
+from mcp_core.domain.interfaces import IOpenProjectClient
+
+from .health_checker import HealthCheckerService
+from .project_snapshot import ProjectSnapshot
+from .risk_assessor import RiskAssessorService
+
+# 健康度低于该分数或存在高风险的项目列为需要关注（没有工作包的项目除外）
+ATTENTION_HEALTH_SCORE = 60
+
+
+class PortfolioReportService:
+    """项目组合报告服务"""
+
+    def __init__(self, openproject_client: IOpenProjectClient,
+                 max_concurrency: int = 10, columnar: bool = False,
+                 metrics_store: Optional[Any] = None):
+        self.client = openproject_client
+        self.max_concurrency = max(1, max_concurrency)
+        self.columnar = columnar
+        # 增量指标存储（IncrementalMetricsStore），提供时只同步变更的工作包
+        self.metrics_store = metrics_store
+
+    async def iter_project_results(self, project_ids: Optional[List[str]] = None
+                                   ) -> AsyncIterator[Dict[str, Any]]:
+        """按完成顺序逐个产出项目结果（单个项目失败不影响其他项目）"""
+        projects, missing = await self._select_projects(project_ids)
+        # 找不到的项目 ID 同样作为失败结果列出，不静默忽略
+        for project_id in missing:
+            yield {"project_id": project_id, "project_name": project_id,
+                   "error": f"Project not found: {project_id}"}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def analyze(project: Project) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self._analyze_project(project)
+                except Exception as e:
+                    return {"project_id": project.id, "project_name": project.name, "error": str(e)}
+
+        tasks = [asyncio.create_task(analyze(project)) for project in projects]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            # 消费方提前停止（如客户端断开）时取消未完成的项目
+            for task in tasks:
+                task.cancel()
+
+    async def generate_portfolio_report(self, project_ids: Optional[List[str]] = None) -> Report:
+        """生成项目组合报告"""
+        results = [result async for result in self.iter_project_results(project_ids)]
+        return self.build_report(results)
+
+    def build_report(self, results: List[Dict[str, Any]]) -> Report:
+        """由各项目结果汇总生成报告"""
+        # 健康度从低到高，没有工作包的项目排在最后
+        succeeded = sorted(
+            (r for r in results if not r.get("error")),
+            key=lambda r: (not r["total_work_packages"], r["health_score"], r["project_name"])
+        )
+        failed = [r for r in results if r.get("error")]
+        active = [r for r in succeeded if r["total_work_packages"]]
+
+        total_wps = sum(r["total_work_packages"] for r in active)
+        completed_wps = sum(r["completed_work_packages"] for r in active)
+        average_health = sum(r["health_score"] for r in active) / len(active) if active else 0.0
+        attention = [r for r in active
+                     if r["health_score"] < ATTENTION_HEALTH_SCORE or r["high_risk_count"]]
+
+        sections = []
+        if succeeded:
+            lines = [
+                "| 项目 | 健康度 | 完成率 | 延期率 | 工作包 | 风险（高） |",
+                "| --- | --- | --- | --- | --- | --- |"
+            ]
+            for r in succeeded:
+                lines.append(
+                    f"| {r['project_name']} | {r['health_level']} ({r['health_score']:.1f}) "
+                    f"| {r['completion_rate']:.1f}% | {r['overdue_rate']:.1f}% "
+                    f"| {r['completed_work_packages']}/{r['total_work_packages']} "
+                    f"| {r['total_risks']} ({r['high_risk_count']}) |"
+                )
+            sections.append(ReportSection(title="项目概览", content="\n".join(lines), order=1))
+
+        if attention:
+            content = "\n".join(
+                f"- **{r['project_name']}**: 健康度 {r['health_score']:.1f} 分，"
+                f"高风险 {r['high_risk_count']} 项"
+                for r in attention
+            )
+            sections.append(ReportSection(title="需要关注的项目", content=content, order=2))
+
+        if failed:
+            content = "\n".join(f"- {r['project_name']}: {r['error']}" for r in failed)
+            sections.append(ReportSection(title="分析失败的项目", content=content, order=3))
+
+        return Report(
+            title="项目组合报告",
+            project_name=f"全部项目（{len(results)} 个）",
+            period=f"分析时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            summary=(f"共分析 {len(results)} 个项目，平均健康度 {average_health:.1f} 分，"
+                     f"{len(attention)} 个项目需要关注"),
+            sections=sections,
+            statistics={
+                "total_projects": len(results),
+                "failed_projects": len(failed),
+                "attention_projects": len(attention),
+                "average_health_score": round(average_health, 1),
+                "total_work_packages": total_wps,
+                "completed_work_packages": completed_wps,
+                "completion_rate": round(completed_wps / total_wps * 100, 1) if total_wps else 0
+            }
+        )
+
+    @staticmethod
+    def format_project_result(result: Dict[str, Any]) -> str:
+        """单个项目结果的 Markdown 文本（用于流式输出）"""
+        if result.get("error"):
+            return f"- ❌ **{result['project_name']}**: 分析失败 ({result['error']})\n"
+        return (f"- **{result['project_name']}**: 健康度 {result['health_level']} "
+                f"({result['health_score']:.1f})，完成率 {result['completion_rate']:.1f}%，"
+                f"风险 {result['total_risks']} 项（高 {result['high_risk_count']}）\n")
+
+    async def _select_projects(self, project_ids: Optional[List[str]]
+                               ) -> Tuple[List[Project], List[str]]:
+        """获取项目列表（只请求一次），可按 ID 或标识符筛选
+
+        返回 (匹配的项目, 找不到的 ID 或标识符)。
+        """
+        projects = await self.client.get_projects()
+        if not project_ids:
+            return projects, []
+        wanted = set(project_ids)
+        selected = [p for p in projects if p.id in wanted or p.identifier in wanted]
+        found = {p.id for p in selected} | {p.identifier for p in selected}
+        missing = list(dict.fromkeys(pid for pid in project_ids if pid not in found))
+        return selected, missing
+
+    async def _analyze_project(self, project: Project) -> Dict[str, Any]:
+        """基于同一份快照执行健康度检查和风险评估"""
+        if self.metrics_store is not None:
+            snapshot = await self.metrics_store.snapshot_for(self.client, project)
+        else:
+            snapshot = await ProjectSnapshot.for_project(self.client, project, columnar=self.columnar)
+        health, risks = await asyncio.gather(
+            HealthCheckerService(snapshot).check_project_health(project.id),
+            RiskAssessorService(snapshot).assess_project_risks(project.id)
+        )
+        metrics = snapshot.metrics
+        return {
+            "project_id": project.id,
+            "project_name": project.name,
+            "health_score": health.statistics.get("health_score", 0.0),
+            "health_level": health.statistics.get("health_level", "无数据"),
+            "completion_rate": round(metrics.completion_rate, 1),
+            "overdue_rate": round(metrics.overdue_rate, 1),
+            "total_work_packages": metrics.total,
+            "completed_work_packages": metrics.completed,
+            "total_risks": risks.statistics.get("total_risks", 0),
+            "high_risk_count": risks.statistics.get("high_risk_count", 0),
+            "error": None
+        }
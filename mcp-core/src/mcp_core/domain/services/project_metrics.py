@@ -0,0 +1,145 @@
+"""
+项目指标聚合
+
+一次遍历工作包列表，计算各领域服务共用的计数、分布、按负责人统计
+以及延期/停滞等集合，保证不同报告中的数字一致。
+"""
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Sequence
+
+from mcp_core.domain.models import StatusCategory, StatusClassifier, WorkPackage, get_status_classifier
+
+HIGH_PRIORITIES = ('High', 'Immediate')
+
+# 进行中的工作包超过该天数未更新视为停滞
+STAGNANT_DAYS = 7
+
+# 截止日期在该天数内的未完成工作包视为截止临近
+DUE_SOON_DAYS = 7
+
+
+@dataclass
+class ProjectMetrics:
+    """项目工作包指标"""
+
+    now: datetime
+    total: int = 0
+    completed: int = 0
+    in_progress: int = 0
+    status_distribution: Dict[str, int] = field(default_factory=dict)
+    overdue: List[WorkPackage] = field(default_factory=list)
+    unassigned: List[WorkPackage] = field(default_factory=list)
+    high_priority_incomplete: List[WorkPackage] = field(default_factory=list)
+    stagnant: List[WorkPackage] = field(default_factory=list)
+    # 未来 DUE_SOON_DAYS 天内到期的未完成工作包（按截止日期排序）
+    due_soon: List[WorkPackage] = field(default_factory=list)
+    # 按截止日期排序的延期工作包（已排好序时提供，否则由 overdue 按需排序）
+    overdue_by_due_date: Optional[Sequence[WorkPackage]] = None
+    # 负责人 → {total, in_progress, completed, overdue, high_priority, work_packages}
+    assignee_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_work_packages(cls, work_packages: List[WorkPackage],
+                           now: Optional[datetime] = None,
+                           classifier: Optional[StatusClassifier] = None) -> "ProjectMetrics":
+        """一次遍历计算所有指标"""
+        metrics = cls(now=now or datetime.now())
+        current = metrics.now
+        due_soon_end = current + timedelta(days=DUE_SOON_DAYS)
+        status_distribution = metrics.status_distribution
+        assignee_stats = metrics.assignee_stats
+        classify = (classifier or get_status_classifier()).classify
+
+        for wp in work_packages:
+            status = wp.status
+            category = classify(status)
+            is_completed = category == StatusCategory.COMPLETED
+            is_in_progress = category == StatusCategory.IN_PROGRESS
+            is_high_priority = wp.priority in HIGH_PRIORITIES
+            due_date = wp.due_date
+            is_overdue = bool(due_date and due_date < current and not is_completed)
+
+            key = status or "未知状态"
+            status_distribution[key] = status_distribution.get(key, 0) + 1
+
+            if is_completed:
+                metrics.completed += 1
+            elif is_in_progress:
+                metrics.in_progress += 1
+                if wp.updated_at and (current - wp.updated_at).days > STAGNANT_DAYS:
+                    metrics.stagnant.append(wp)
+
+            if is_overdue:
+                metrics.overdue.append(wp)
+            elif due_date and not is_completed and due_date < due_soon_end:
+                metrics.due_soon.append(wp)
+            if is_high_priority and not is_completed:
+                metrics.high_priority_incomplete.append(wp)
+
+            if not wp.assigned_to:
+                metrics.unassigned.append(wp)
+                continue
+
+            stats = assignee_stats.get(wp.assigned_to)
+            if stats is None:
+                stats = assignee_stats[wp.assigned_to] = {
+                    "total": 0,
+                    "in_progress": 0,
+                    "completed": 0,
+                    "overdue": 0,
+                    "high_priority": 0,
+                    "work_packages": []
+                }
+            stats["total"] += 1
+            stats["work_packages"].append(wp)
+            if is_completed:
+                stats["completed"] += 1
+            elif is_in_progress:
+                stats["in_progress"] += 1
+            if is_overdue:
+                stats["overdue"] += 1
+            if is_high_priority:
+                stats["high_priority"] += 1
+
+        metrics.total = len(work_packages)
+        metrics.due_soon.sort(key=attrgetter('due_date'))
+        return metrics
+
+    def most_overdue(self, limit: int) -> List[WorkPackage]:
+        """延期最久的若干个工作包（截止日期最早的在前）"""
+        if self.overdue_by_due_date is not None:
+            return list(self.overdue_by_due_date[:limit])
+        return heapq.nsmallest(limit, self.overdue, key=attrgetter('due_date'))
+
+    @property
+    def overdue_count(self) -> int:
+        """延期工作包数"""
+        return len(self.overdue)
+
+    @property
+    def unassigned_count(self) -> int:
+        """未分配工作包数"""
+        return len(self.unassigned)
+
+    @property
+    def assigned_count(self) -> int:
+        """已分配工作包数"""
+        return self.total - len(self.unassigned)
+
+    @property
+    def completion_rate(self) -> float:
+        """完成率（%）"""
+        return self.completed / self.total * 100 if self.total else 0.0
+
+    @property
+    def overdue_rate(self) -> float:
+        """延期率（%）"""
+        return len(self.overdue) / self.total * 100 if self.total else 0.0
+
+    @property
+    def assignment_rate(self) -> float:
+        """分配率（%）"""
+        return self.assigned_count / self.total * 100 if self.total else 0.0
@@ -0,0 +1,108 @@
+"""
+请求级项目快照
+
+一次请求（或组合报告）中只加载一次项目、工作包和用户数据，
+由多个领域服务共享，避免各服务重复请求 OpenProject。
+客户端支持时可加载列式工作包存储，指标改为向量化计算。
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from mcp_core.domain.interfaces import IOpenProjectClient
+from mcp_core.domain.models import Project, WorkPackage, User
+from mcp_core.shared.exceptions import NotFoundError, ValidationError
+
+from .project_metrics import ProjectMetrics
+
+
+class ProjectSnapshot:
+    """项目数据快照（项目 + 工作包 + 用户）"""
+
+    def __init__(self, project: Project, work_packages: Sequence[WorkPackage],
+                 users: Optional[List[User]] = None,
+                 client: Optional[IOpenProjectClient] = None,
+                 store: Optional[Any] = None,
+                 metrics: Optional[ProjectMetrics] = None):
+        self.project = project
+        self.work_packages = work_packages
+        # 列式工作包存储（WorkPackageStore），存在时用于计算指标
+        self.store = store
+        self.loaded_at = datetime.now()
+        self._users = users
+        # 用于按需加载用户
+        self._client = client
+        # 可传入预先计算（如增量维护）的指标
+        self._metrics: Optional[ProjectMetrics] = metrics
+
+    @classmethod
+    async def load(cls, client: IOpenProjectClient, project_id: str,
+                   include_users: bool = False, columnar: bool = False) -> "ProjectSnapshot":
+        """并发加载项目数据（columnar 为 True 且客户端支持时加载列式存储）"""
+        pending = [asyncio.ensure_future(cls._load_work_packages(client, project_id, columnar))]
+        if include_users:
+            pending.append(asyncio.ensure_future(client.get_users()))
+        try:
+            project = await client.get_project(project_id)
+            if not project:
+                raise NotFoundError(f"Project not found: {project_id}")
+            results = await asyncio.gather(*pending)
+        except BaseException:
+            # 项目不存在或加载失败时取消其余请求，不再为其拉取工作包
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+        work_packages, store = results[0]
+        users = results[1] if include_users else None
+        return cls(project, work_packages, users=users, client=client, store=store)
+
+    @classmethod
+    async def for_project(cls, client: IOpenProjectClient, project: Project,
+                          columnar: bool = False) -> "ProjectSnapshot":
+        """为已获取的项目加载工作包（不再重复请求项目信息）"""
+        work_packages, store = await cls._load_work_packages(client, project.id, columnar)
+        return cls(project, work_packages, client=client, store=store)
+
+    @staticmethod
+    async def _load_work_packages(client: IOpenProjectClient, project_id: str,
+                                  columnar: bool) -> Tuple[Sequence[WorkPackage], Optional[Any]]:
+        """加载工作包，返回 (工作包序列, 列式存储或 None)"""
+        if columnar and hasattr(client, "get_work_package_store"):
+            store = await client.get_work_package_store(project_id)
+            return store.rows(), store
+        return await client.get_work_packages(project_id), None
+
+    @property
+    def metrics(self) -> ProjectMetrics:
+        """工作包指标（首次访问时计算）"""
+        if self._metrics is None:
+            if self.store is not None:
+                self._metrics = self.store.to_metrics()
+            else:
+                self._metrics = ProjectMetrics.from_work_packages(self.work_packages)
+        return self._metrics
+
+    async def get_users(self) -> List[User]:
+        """获取用户列表（首次调用时加载）"""
+        if self._users is None:
+            self._users = await self._client.get_users() if self._client else []
+        return self._users
+
+    def matches(self, project_id: str) -> bool:
+        """快照是否属于指定项目（ID 或标识符）"""
+        return project_id in (self.project.id, self.project.identifier)
+
+
+async def resolve_snapshot(source: Union[IOpenProjectClient, ProjectSnapshot],
+                           project_id: str, columnar: bool = False) -> ProjectSnapshot:
+    """从客户端加载快照，或直接使用传入的快照"""
+    if isinstance(source, ProjectSnapshot):
+        if not source.matches(project_id):
+            raise ValidationError(
+                f"Snapshot is for project {source.project.id}, not {project_id}",
+                field="project_id"
+            )
+        return source
+    return await ProjectSnapshot.load(source, project_id, columnar=columnar)
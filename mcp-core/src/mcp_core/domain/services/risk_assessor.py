@@ -2,28 +2,30 @@
 风险评估领域服务
 """
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
-from mcp_core.domain.models import Project, WorkPackage, Report, ReportSection
+from mcp_core.domain.models import Project, WorkPackage, Report, ReportBuilder
 from mcp_core.domain.interfaces import IOpenProjectClient
-from mcp_core.shared.exceptions import NotFoundError
+
+from .project_metrics import DUE_SOON_DAYS
+from .project_snapshot import ProjectSnapshot, resolve_snapshot
 
 
 class RiskAssessorService:
     """风险评估服务"""
     
-    def __init__(self, openproject_client: IOpenProjectClient):
+    def __init__(self, openproject_client: Union[IOpenProjectClient, ProjectSnapshot],
+                 columnar: bool = False):
+        # 可以传入客户端，也可以传入同一请求中共享的项目快照
         self.client = openproject_client
+        self.columnar = columnar
     
     async def assess_project_risks(self, project_id: str) -> Report:
         """评估项目风险"""
-        # 获取项目信息
-        project = await self.client.get_project(project_id)
-        if not project:
-            raise NotFoundError(f"Project not found: {project_id}")
-
-        # 获取工作包
-        work_packages = await self.client.get_work_packages(project_id)
+        # 获取项目和工作包
+        snapshot = await resolve_snapshot(self.client, project_id, columnar=self.columnar)
+        project = snapshot.project
+        work_packages = snapshot.work_packages
         
         if not work_packages:
             return Report(
@@ -35,11 +37,11 @@ class RiskAssessorService:
 
         # 风险评估逻辑
         risks = []
-        current_date = datetime.now()
+        metrics = snapshot.metrics
+        current_date = metrics.now
         
         # 1. 延期风险
-        overdue_wps = [wp for wp in work_packages 
-                      if wp.due_date and wp.due_date < current_date and wp.status != 'Closed']
+        overdue_wps = metrics.overdue
         
         if overdue_wps:
             risk_level = "高" if len(overdue_wps) > len(work_packages) * 0.2 else "中"
@@ -47,11 +49,23 @@ class RiskAssessorService:
                 "type": "延期风险",
                 "level": risk_level,
                 "description": f"有 {len(overdue_wps)} 个工作包已延期",
-                "work_packages": overdue_wps[:5]  # 只显示前5个
+                # 只显示延期最久的前5个
+                "work_packages": metrics.most_overdue(5)
+            })
+        
+        # 2. 截止临近风险
+        due_soon_wps = metrics.due_soon
+        if due_soon_wps:
+            risk_level = "中" if len(due_soon_wps) > 5 else "低"
+            risks.append({
+                "type": "截止临近风险",
+                "level": risk_level,
+                "description": f"有 {len(due_soon_wps)} 个工作包将在{DUE_SOON_DAYS}天内到期",
+                "work_packages": due_soon_wps[:5]
             })
         
-        # 2. 资源分配风险
-        unassigned_wps = [wp for wp in work_packages if not wp.assigned_to]
+        # 3. 资源分配风险
+        unassigned_wps = metrics.unassigned
         if unassigned_wps:
             risk_level = "高" if len(unassigned_wps) > len(work_packages) * 0.3 else "中"
             risks.append({
@@ -61,9 +75,8 @@ class RiskAssessorService:
                 "work_packages": unassigned_wps[:5]
             })
         
-        # 3. 高优先级未完成风险
-        high_priority_incomplete = [wp for wp in work_packages 
-                                  if wp.priority in ['High', 'Immediate'] and wp.status != 'Closed']
+        # 4. 高优先级未完成风险
+        high_priority_incomplete = metrics.high_priority_incomplete
         if high_priority_incomplete:
             risk_level = "高" if len(high_priority_incomplete) > 3 else "中"
             risks.append({
@@ -73,12 +86,8 @@ class RiskAssessorService:
                 "work_packages": high_priority_incomplete[:5]
             })
         
-        # 4. 进度停滞风险
-        stagnant_wps = []
-        for wp in work_packages:
-            if (wp.status == 'In progress' and wp.updated_at and 
-                (current_date - wp.updated_at).days > 7):
-                stagnant_wps.append(wp)
+        # 5. 进度停滞风险
+        stagnant_wps = metrics.stagnant
         
         if stagnant_wps:
             risk_level = "中" if len(stagnant_wps) > 2 else "低"
@@ -90,56 +99,55 @@ class RiskAssessorService:
             })
 
         # 生成报告内容
-        sections = []
+        builder = ReportBuilder(
+            title=f"{project.name} 风险评估报告",
+            project_name=project.name,
+            period=f"评估时间: {current_date.strftime('%Y-%m-%d %H:%M')}",
+            summary=f"项目 {project.name} 的风险评估结果"
+        )
         
         # 风险概览
         high_risk_count = len([r for r in risks if r["level"] == "高"])
         medium_risk_count = len([r for r in risks if r["level"] == "中"])
         low_risk_count = len([r for r in risks if r["level"] == "低"])
         
-        overview_content = f"**风险评估结果:**\n"
-        overview_content += f"- 高风险项: {high_risk_count}\n"
-        overview_content += f"- 中风险项: {medium_risk_count}\n"
-        overview_content += f"- 低风险项: {low_risk_count}\n"
-        overview_content += f"- 总风险项: {len(risks)}\n"
+        overview_content = builder.section("风险概览").lines([
+            "**风险评估结果:**",
+            f"- 高风险项: {high_risk_count}",
+            f"- 中风险项: {medium_risk_count}",
+            f"- 低风险项: {low_risk_count}",
+            f"- 总风险项: {len(risks)}"
+        ])
         
         if not risks:
-            overview_content += "\n✅ 项目当前无明显风险。"
+            overview_content.write("\n✅ 项目当前无明显风险。")
         elif high_risk_count > 0:
-            overview_content += "\n⚠️ 项目存在高风险项，需要立即关注。"
+            overview_content.write("\n⚠️ 项目存在高风险项，需要立即关注。")
         else:
-            overview_content += "\n⚡ 项目存在一些风险，建议持续监控。"
-        
-        sections.append(ReportSection(
-            title="风险概览",
-            content=overview_content
-        ))
+            overview_content.write("\n⚡ 项目存在一些风险，建议持续监控。")
         
         # 详细风险分析
-        if risks:
-            for risk in risks:
-                risk_emoji = "🔴" if risk["level"] == "高" else "🟡" if risk["level"] == "中" else "🟢"
-                content = f"{risk_emoji} **风险等级: {risk['level']}**\n\n"
-                content += f"{risk['description']}\n\n"
-                
-                if risk["work_packages"]:
-                    content += "**相关工作包:**\n"
-                    for wp in risk["work_packages"]:
-                        content += f"- {wp.subject} (ID: {wp.id})\n"
-                        if wp.due_date and risk["type"] == "延期风险":
-                            days_overdue = (current_date - wp.due_date).days
-                            content += f"  延期 {days_overdue} 天\n"
-                    
-                    if len(risk["work_packages"]) == 5:
-                        content += "...\n"
+        for risk in risks:
+            risk_emoji = "🔴" if risk["level"] == "高" else "🟡" if risk["level"] == "中" else "🟢"
+            content = builder.section(risk["type"])
+            content.line(f"{risk_emoji} **风险等级: {risk['level']}**").line()
+            content.line(risk["description"]).line()
+            
+            if risk["work_packages"]:
+                content.line("**相关工作包:**")
+                for wp in risk["work_packages"]:
+                    content.line(f"- {wp.subject} (ID: {wp.id})")
+                    if wp.due_date and risk["type"] == "延期风险":
+                        days_overdue = (current_date - wp.due_date).days
+                        content.line(f"  延期 {days_overdue} 天")
+                    elif wp.due_date and risk["type"] == "截止临近风险":
+                        content.line(f"  截止日期 {wp.due_date.strftime('%Y-%m-%d')}")
                 
-                sections.append(ReportSection(
-                    title=risk["type"],
-                    content=content
-                ))
+                if len(risk["work_packages"]) == 5:
+                    content.line("...")
 
         # 统计数据
-        statistics = {
+        builder.statistics = {
             "total_risks": len(risks),
             "high_risk_count": high_risk_count,
             "medium_risk_count": medium_risk_count,
@@ -148,11 +156,4 @@ class RiskAssessorService:
             "risk_percentage": round(len(risks) / len(work_packages) * 100, 1) if work_packages else 0
         }
 
-        return Report(
-            title=f"{project.name} 风险评估报告",
-            project_name=project.name,
-            period=f"评估时间: {current_date.strftime('%Y-%m-%d %H:%M')}",
-            summary=f"项目 {project.name} 的风险评估结果",
-            sections=sections,
-            statistics=statistics
-        )
+        return builder.build()
@@ -0,0 +1,150 @@
+"""
+工作包日程索引
+
+按开始/截止日期排序的索引，用二分查找回答"已延期"、"本周到期"、
+"今天开始"等时间窗口查询，只需 O(log n + k)，不必每次遍历全部工作包。
+计划区间（开始日期 ~ 截止日期）的重叠查询使用按开始日期排序、
+记录子树最大结束时间的静态区间树。
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from mcp_core.domain.models import WorkPackage
+
+# 截止日期当天仍在计划内，区间结束时间为截止日期的下一天（不含）
+_ONE_DAY = timedelta(days=1)
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo else value
+
+
+class _SortedEntries:
+    """按键排序的工作包，支持半开区间 [lo, hi) 查询"""
+
+    def __init__(self, entries: Iterable[Tuple[datetime, WorkPackage]]):
+        # 键相同时保持原始顺序
+        ordered = sorted(entries, key=lambda entry: entry[0])
+        self.keys = [key for key, _ in ordered]
+        self.items = [wp for _, wp in ordered]
+
+    def between(self, lo: Optional[datetime], hi: Optional[datetime]) -> List[WorkPackage]:
+        start = bisect_left(self.keys, lo) if lo is not None else 0
+        end = bisect_left(self.keys, hi) if hi is not None else len(self.keys)
+        return self.items[start:end]
+
+
+class _IntervalTree:
+    """计划区间的静态区间树（按开始时间排序 + 子树最大结束时间）"""
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, WorkPackage]]):
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [start for start, _, _ in ordered]
+        self.items = [wp for _, _, wp in ordered]
+
+        size = 1
+        while size < len(ordered):
+            size *= 2
+        self.size = size
+        # 完全二叉树数组：叶子为区间结束时间，内部节点为子树最大值（逐层自底向上计算）
+        level = [end for _, end, _ in ordered] + [datetime.min] * (size - len(ordered))
+        levels = [level]
+        while len(level) > 1:
+            level = [a if a > b else b for a, b in zip(level[0::2], level[1::2])]
+            levels.append(level)
+        self.max_end = [datetime.min]
+        for level in reversed(levels):
+            self.max_end.extend(level)
+
+    def overlapping(self, lo: datetime, hi: datetime) -> List[WorkPackage]:
+        """与 [lo, hi) 重叠的区间（按开始时间排序）"""
+        # 开始时间 >= hi 的区间不可能重叠，只在前 limit 个叶子中查找
+        limit = bisect_left(self.starts, hi)
+        result = []
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, node_lo, node_hi = stack.pop()
+            if node_lo >= limit or self.max_end[node] <= lo:
+                continue
+            if node >= self.size:
+                result.append(self.items[node_lo])
+                continue
+            mid = (node_lo + node_hi) // 2
+            # 先压右子树，保证按开始时间顺序输出
+            stack.append((2 * node + 1, mid, node_hi))
+            stack.append((2 * node, node_lo, mid))
+        return result
+
+
+class _ScheduleView:
+    """一组工作包的截止日期、开始日期和计划区间索引"""
+
+    def __init__(self, work_packages: Sequence[WorkPackage]):
+        due = []
+        starts = []
+        intervals = []
+        for wp in work_packages:
+            start_date = _naive(wp.start_date)
+            due_date = _naive(wp.due_date)
+            if due_date is not None:
+                due.append((due_date, wp))
+            if start_date is not None:
+                starts.append((start_date, wp))
+            if start_date is not None or due_date is not None:
+                # 只有一个日期的工作包视为当天的计划
+                interval_start = start_date or due_date
+                interval_end = (due_date or start_date) + _ONE_DAY
+                intervals.append((interval_start, max(interval_start, interval_end), wp))
+
+        self.due = _SortedEntries(due)
+        self.starts = _SortedEntries(starts)
+        self.intervals = _IntervalTree(intervals)
+
+
+class ScheduleIndex:
+    """按开始/截止日期索引的工作包（构建一次，多次窗口查询）"""
+
+    def __init__(self, work_packages: Sequence[WorkPackage],
+                 is_completed: Optional[Callable[[WorkPackage], bool]] = None):
+        self._work_packages = work_packages
+        self._is_completed = is_completed or WorkPackage.is_completed
+        # include_completed → 索引，首次查询时构建
+        self._views: Dict[bool, _ScheduleView] = {}
+
+    def _view(self, include_completed: bool) -> _ScheduleView:
+        view = self._views.get(include_completed)
+        if view is None:
+            work_packages = (self._work_packages if include_completed else
+                             [wp for wp in self._work_packages if not self._is_completed(wp)])
+            view = self._views[include_completed] = _ScheduleView(work_packages)
+        return view
+
+    def due_between(self, start: Optional[datetime], end: Optional[datetime],
+                    include_completed: bool = False) -> List[WorkPackage]:
+        """截止日期在 [start, end) 内的工作包（按截止日期排序，None 表示不限）"""
+        return self._view(include_completed).due.between(start, end)
+
+    def starting_between(self, start: Optional[datetime], end: Optional[datetime],
+                         include_completed: bool = False) -> List[WorkPackage]:
+        """开始日期在 [start, end) 内的工作包（按开始日期排序）"""
+        return self._view(include_completed).starts.between(start, end)
+
+    def scheduled_between(self, start: datetime, end: datetime,
+                          include_completed: bool = False) -> List[WorkPackage]:
+        """计划区间与 [start, end) 重叠的工作包（按开始日期排序）"""
+        return self._view(include_completed).intervals.overlapping(start, end)
+
+    def overdue(self, now: Optional[datetime] = None) -> List[WorkPackage]:
+        """已延期的未完成工作包（截止日期最早的在前）"""
+        return self.due_between(None, now or datetime.now())
+
+    def due_within(self, days: int, now: Optional[datetime] = None) -> List[WorkPackage]:
+        """未来若干天内到期的未完成工作包"""
+        now = now or datetime.now()
+        return self.due_between(now, now + timedelta(days=days))
+
+    def scheduled_on(self, day: datetime, include_completed: bool = False) -> List[WorkPackage]:
+        """计划在某一天进行的工作包"""
+        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.scheduled_between(day_start, day_start + _ONE_DAY, include_completed)
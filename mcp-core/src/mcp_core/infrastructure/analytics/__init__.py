@@ -0,0 +1,26 @@
+"""
+分析基础设施
+
+提供基于 NumPy 的列式工作包存储（需要安装 analytics 可选依赖）
+、基于工作包变更增量维护的项目指标、每日指标历史以及完成日期预测
+"""
+
+from .work_package_store import NUMPY_AVAILABLE, WorkPackageRows, WorkPackageStore
+from .incremental_metrics import IncrementalProjectMetrics, IncrementalMetricsStore
+from .metrics_history import MetricsHistoryStore, burndown, velocity
+from .history_job import MetricsHistoryJob
+from .forecast import Forecast, forecast
+
+__all__ = [
+    "NUMPY_AVAILABLE",
+    "WorkPackageRows",
+    "WorkPackageStore",
+    "IncrementalProjectMetrics",
+    "IncrementalMetricsStore",
+    "MetricsHistoryStore",
+    "MetricsHistoryJob",
+    "burndown",
+    "velocity",
+    "Forecast",
+    "forecast",
+]
@@ -0,0 +1,140 @@
+"""
+每日指标快照任务
+
+每天在指定时间为所有项目记录一次指标；启动时补记当天尚未记录的项目，
+记录失败的项目每隔 RETRY_INTERVAL 秒重试，直到下一次定时记录。
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from mcp_core.domain.interfaces import IOpenProjectClient
+from mcp_core.domain.models import Project
+from mcp_core.domain.services import ProjectSnapshot
+from mcp_core.shared.config import get_global_config
+from mcp_core.shared.logger import get_logger
+
+from .metrics_history import MetricsHistoryStore
+
+# 有项目记录失败时的重试间隔（秒）
+RETRY_INTERVAL = 15 * 60
+
+
+class MetricsHistoryJob:
+    """定时记录项目指标历史"""
+
+    def __init__(self, client: IOpenProjectClient, history: MetricsHistoryStore,
+                 hour: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 metrics_store: Optional[Any] = None,
+                 prepare: Optional[Callable[[], Awaitable[Any]]] = None):
+        config = get_global_config()
+        self.client = client
+        self.history = history
+        self.hour = config.metrics_history_hour if hour is None else hour
+        self.max_concurrency = (config.max_concurrent_requests
+                                if max_concurrency is None else max_concurrency)
+        # 增量指标存储（IncrementalMetricsStore），提供时只同步变更的工作包
+        self.metrics_store = metrics_store
+        # 每次记录前执行（如同步状态分类），保证各天的统计口径一致
+        self.prepare = prepare
+        self.logger = get_logger("mcp.analytics")
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """在后台启动定时任务"""
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止定时任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def record_all(self, day: Optional[date] = None,
+                         only_missing: bool = False) -> Dict[str, Any]:
+        """为所有项目记录一次指标
+
+        only_missing 为 True 时跳过当天已有记录的项目（启动补记和失败重试）。
+        """
+        day = day or date.today()
+        result = {"day": day.isoformat(), "recorded": 0, "failed": 0, "skipped": 0}
+        if self.prepare is not None:
+            await self.prepare()
+        projects = await self.client.get_projects()
+        if only_missing:
+            recorded = await asyncio.to_thread(self.history.recorded_projects, day)
+            result["skipped"] = sum(1 for project in projects if project.id in recorded)
+            projects = [project for project in projects if project.id not in recorded]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        entries: List[Tuple[str, Any]] = []
+
+        async def collect(project: Project) -> None:
+            async with semaphore:
+                try:
+                    if self.metrics_store is not None:
+                        snapshot = await self.metrics_store.snapshot_for(self.client, project)
+                    else:
+                        snapshot = await ProjectSnapshot.for_project(self.client, project)
+                    entries.append((project.id, snapshot.metrics))
+                except Exception as e:
+                    result["failed"] += 1
+                    self.logger.warning(f"Failed to record metrics for {project.name}: {e}")
+
+        await asyncio.gather(*[collect(project) for project in projects])
+
+        # 所有项目的记录一次追加写入，磁盘同步放到线程中执行，不阻塞事件循环
+        try:
+            await asyncio.to_thread(self.history.record_many, entries, day)
+            result["recorded"] = len(entries)
+        except Exception as e:
+            result["failed"] += len(entries)
+            self.logger.error("Failed to write metrics history", e)
+
+        self.logger.info(f"Metrics history recorded: {result}")
+        return result
+
+    def next_run_time(self, now: Optional[datetime] = None) -> datetime:
+        """下一次定时记录的时间"""
+        now = now or datetime.now()
+        next_run = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return next_run
+
+    def seconds_until_next_run(self, now: Optional[datetime] = None) -> float:
+        """距下一次记录时间的秒数"""
+        now = now or datetime.now()
+        return (self.next_run_time(now) - now).total_seconds()
+
+    async def _run(self) -> None:
+        next_run: Optional[datetime] = None
+        while True:
+            now = datetime.now()
+            # 到达定时记录时间时记录所有项目；启动补记和失败重试只记录当天缺失的项目
+            scheduled = next_run is not None and now >= next_run
+            if next_run is None or scheduled:
+                next_run = self.next_run_time(now)
+
+            retry = False
+            try:
+                result = await self.record_all(only_missing=not scheduled)
+                retry = result["failed"] > 0
+            except Exception as e:
+                # 记录失败不终止任务，稍后重试
+                self.logger.error("Metrics history job failed", e)
+                retry = True
+
+            delay = (next_run - datetime.now()).total_seconds()
+            if retry:
+                delay = min(delay, RETRY_INTERVAL)
+            await asyncio.sleep(max(delay, 0))
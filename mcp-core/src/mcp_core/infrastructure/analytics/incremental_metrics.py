@@ -0,0 +1,358 @@
+"""
+增量项目指标
+
+为每个项目维护运行中的聚合数据（状态计数、按截止日期排序的未完成工作包、
+按负责人的负载等），只根据变更的工作包（旧版本 → 新版本）更新，
+配合 updatedAt 增量查询，刷新成本取决于变更数量而不是项目规模。
+"""
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from mcp_core.domain.interfaces import IOpenProjectClient
+from mcp_core.domain.models import Project, StatusCategory, WorkPackage, get_status_classifier
+from mcp_core.domain.services.project_metrics import (
+    DUE_SOON_DAYS, HIGH_PRIORITIES, STAGNANT_DAYS, ProjectMetrics
+)
+from mcp_core.domain.services.project_snapshot import ProjectSnapshot
+from mcp_core.shared.config import get_global_config
+from mcp_core.shared.exceptions import NotFoundError
+from mcp_core.shared.logger import get_logger
+
+
+class _RankedView(Sequence):
+    """按首次出现顺序访问一组工作包（首次访问时才排序；ranked 为 False 时保持给定顺序）"""
+
+    def __init__(self, metrics: "IncrementalProjectMetrics", ids: Iterable[str], ranked: bool = True):
+        self._metrics = metrics
+        self._ids = ids
+        self._ranked = ranked
+        self._items: Optional[List[WorkPackage]] = None
+
+    def _resolve(self) -> List[WorkPackage]:
+        if self._items is None:
+            ids = sorted(self._ids, key=self._metrics._rank.__getitem__) if self._ranked else self._ids
+            self._items = [self._metrics.work_packages[i] for i in ids]
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        return self._resolve()[index]
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+
+class IncrementalProjectMetrics:
+    """单个项目的增量指标"""
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        # 计入时使用的状态分类器及其版本，分类表变化后需要全量重建
+        self.classifier = get_status_classifier()
+        self.classifier_version = self.classifier.version
+        self.work_packages: Dict[str, WorkPackage] = {}
+        # 工作包首次出现的顺序，保证列表顺序与全量计算一致
+        self._rank: Dict[str, int] = {}
+        self._next_rank = 0
+
+        self.completed = 0
+        self.in_progress = 0
+        self.status_counts: Dict[str, int] = {}
+        # 未完成且有截止日期的工作包：(截止日期, 顺序, ID)，按截止日期排序
+        self._open_by_due: List[Tuple[datetime, int, str]] = []
+        # 进行中且有更新时间的工作包：(更新时间, 顺序, ID)，用于判断停滞
+        self._in_progress_by_update: List[Tuple[datetime, int, str]] = []
+        # 有序集合（dict 的键）
+        self._unassigned: Dict[str, None] = {}
+        self._high_priority_incomplete: Dict[str, None] = {}
+        # 负责人 → {total, in_progress, completed, high_priority, ids}
+        self._assignees: Dict[str, Dict[str, Any]] = {}
+
+        # 已同步到的最新 updatedAt（服务器时间），用于下一次增量查询
+        self.synced_until: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self.work_packages)
+
+    @property
+    def is_stale(self) -> bool:
+        """状态分类器在计入后是否被替换或修改"""
+        return (self.classifier is not get_status_classifier()
+                or self.classifier_version != self.classifier.version)
+
+    def apply(self, work_package: WorkPackage) -> None:
+        """新增或更新一个工作包（撤销旧版本的贡献后计入新版本）"""
+        previous = self.work_packages.get(work_package.id)
+        if previous is not None:
+            self._account(previous, -1)
+        else:
+            self._rank[work_package.id] = self._next_rank
+            self._next_rank += 1
+        self.work_packages[work_package.id] = work_package
+        self._account(work_package, 1)
+
+        if work_package.updated_at and (self.synced_until is None
+                                        or work_package.updated_at > self.synced_until):
+            self.synced_until = work_package.updated_at
+
+    def apply_all(self, work_packages: Iterable[WorkPackage]) -> int:
+        """批量应用变更，返回应用的数量"""
+        count = 0
+        for work_package in work_packages:
+            self.apply(work_package)
+            count += 1
+        return count
+
+    def remove(self, work_package_id: str) -> None:
+        """移除工作包（已删除或移出项目）"""
+        previous = self.work_packages.pop(work_package_id, None)
+        if previous is not None:
+            self._account(previous, -1)
+            del self._rank[work_package_id]
+
+    def to_metrics(self, now: Optional[datetime] = None) -> ProjectMetrics:
+        """生成当前时间点的 ProjectMetrics（只有延期和停滞与时间有关）"""
+        now = now or datetime.now()
+
+        # 截止日期早于当前时间的未完成工作包，以及之后 DUE_SOON_DAYS 天内到期的（按截止日期排序）
+        overdue_end = bisect_left(self._open_by_due, (now,))
+        due_soon_end = bisect_left(self._open_by_due, (now + timedelta(days=DUE_SOON_DAYS),))
+        overdue_ids = [wp_id for _, _, wp_id in self._open_by_due[:overdue_end]]
+        due_soon_ids = [wp_id for _, _, wp_id in self._open_by_due[overdue_end:due_soon_end]]
+        # (now - updated_at).days > STAGNANT_DAYS 等价于 updated_at <= now - (STAGNANT_DAYS + 1) 天
+        cutoff = now - timedelta(days=STAGNANT_DAYS + 1)
+        stagnant_ids = [
+            wp_id for _, _, wp_id
+            in self._in_progress_by_update[:bisect_right(self._in_progress_by_update, (cutoff, float("inf")))]
+        ]
+
+        overdue_by_assignee: Dict[str, int] = {}
+        for wp_id in overdue_ids:
+            assignee = self.work_packages[wp_id].assigned_to
+            if assignee:
+                overdue_by_assignee[assignee] = overdue_by_assignee.get(assignee, 0) + 1
+
+        return ProjectMetrics(
+            now=now,
+            total=len(self.work_packages),
+            completed=self.completed,
+            in_progress=self.in_progress,
+            status_distribution=dict(self.status_counts),
+            overdue=_RankedView(self, overdue_ids),
+            unassigned=_RankedView(self, list(self._unassigned)),
+            high_priority_incomplete=_RankedView(self, list(self._high_priority_incomplete)),
+            stagnant=_RankedView(self, stagnant_ids),
+            due_soon=_RankedView(self, due_soon_ids, ranked=False),
+            overdue_by_due_date=_RankedView(self, overdue_ids, ranked=False),
+            assignee_stats={
+                name: {
+                    "total": stats["total"],
+                    "in_progress": stats["in_progress"],
+                    "completed": stats["completed"],
+                    "overdue": overdue_by_assignee.get(name, 0),
+                    "high_priority": stats["high_priority"],
+                    "work_packages": _RankedView(self, list(stats["ids"]))
+                }
+                for name, stats in self._assignees.items()
+            }
+        )
+
+    def _account(self, wp: WorkPackage, sign: int) -> None:
+        """计入（sign=1）或撤销（sign=-1）一个工作包对各聚合的贡献"""
+        rank = self._rank[wp.id]
+        category = self.classifier.classify(wp.status)
+        is_completed = category == StatusCategory.COMPLETED
+        is_in_progress = category == StatusCategory.IN_PROGRESS
+        is_high_priority = wp.priority in HIGH_PRIORITIES
+
+        key = wp.status or "未知状态"
+        count = self.status_counts.get(key, 0) + sign
+        if count:
+            self.status_counts[key] = count
+        else:
+            del self.status_counts[key]
+
+        if is_completed:
+            self.completed += sign
+        elif is_in_progress:
+            self.in_progress += sign
+            if wp.updated_at:
+                self._update_sorted(self._in_progress_by_update, (wp.updated_at, rank, wp.id), sign)
+
+        if wp.due_date and not is_completed:
+            self._update_sorted(self._open_by_due, (wp.due_date, rank, wp.id), sign)
+        if is_high_priority and not is_completed:
+            self._update_set(self._high_priority_incomplete, wp.id, sign)
+
+        if not wp.assigned_to:
+            self._update_set(self._unassigned, wp.id, sign)
+            return
+
+        stats = self._assignees.get(wp.assigned_to)
+        if stats is None:
+            stats = self._assignees[wp.assigned_to] = {
+                "total": 0, "in_progress": 0, "completed": 0, "high_priority": 0, "ids": {}
+            }
+        stats["total"] += sign
+        if is_completed:
+            stats["completed"] += sign
+        elif is_in_progress:
+            stats["in_progress"] += sign
+        if is_high_priority:
+            stats["high_priority"] += sign
+        self._update_set(stats["ids"], wp.id, sign)
+        if not stats["total"]:
+            del self._assignees[wp.assigned_to]
+
+    @staticmethod
+    def _update_sorted(entries: List[Tuple[datetime, int, str]], entry: Tuple[datetime, int, str],
+                       sign: int) -> None:
+        if sign > 0:
+            insort(entries, entry)
+        else:
+            del entries[bisect_left(entries, entry)]
+
+    @staticmethod
+    def _update_set(members: Dict[str, None], wp_id: str, sign: int) -> None:
+        if sign > 0:
+            members[wp_id] = None
+        else:
+            del members[wp_id]
+
+
+class IncrementalMetricsStore:
+    """按项目保存增量指标，并通过 updatedAt 增量查询保持同步
+
+    增量查询无法发现被删除或移出项目的工作包，因此每次同步后先比对服务器上的
+    工作包总数；只有总数不一致时才获取工作包 ID 集合并移除已不存在的工作包
+    （被删除的工作包同时有新建时，新工作包出现在增量结果中，总数同样不一致）。
+    客户端不支持 ID 查询或移除后仍不一致时重新全量加载。
+    """
+
+    def __init__(self, max_projects: Optional[int] = None):
+        self.max_projects = (get_global_config().analytics_incremental_max_projects
+                             if max_projects is None else max_projects)
+        # 按最近访问排序，超过上限时淘汰最久未访问的项目
+        self._projects: "OrderedDict[str, IncrementalProjectMetrics]" = OrderedDict()
+        # 项目 → [锁, 使用者数]，只在有请求使用时保留
+        self._locks: Dict[str, List[Any]] = {}
+        self.logger = get_logger("mcp.analytics")
+        self.full_loads = 0
+        self.delta_loads = 0
+        self.removed = 0
+
+    async def refresh(self, client: IOpenProjectClient, project_id: str) -> IncrementalProjectMetrics:
+        """同步项目指标（首次全量加载，之后只获取变更的工作包）"""
+        async with self._project_lock(project_id):
+            metrics = self._projects.get(project_id)
+            if metrics is None or metrics.synced_until is None or metrics.is_stale:
+                return await self._full_load(client, project_id)
+            self._projects.move_to_end(project_id)
+
+            changed = await client.get_work_packages(project_id, updated_since=metrics.synced_until)
+            applied = metrics.apply_all(changed)
+            self.delta_loads += 1
+
+            # 总数一致时不必获取 ID 集合，同步成本只取决于变更数量
+            total = await client.count_work_packages(project_id)
+            if total != len(metrics):
+                server_ids = await self._server_ids(client, project_id)
+                if server_ids is not None:
+                    deleted = [wp_id for wp_id in metrics.work_packages if wp_id not in server_ids]
+                    for wp_id in deleted:
+                        metrics.remove(wp_id)
+                    self.removed += len(deleted)
+                    total = len(server_ids)
+
+            if total != len(metrics):
+                self.logger.info(
+                    f"Work package mismatch for project {project_id} "
+                    f"({len(metrics)} cached, {total} on server), reloading"
+                )
+                return await self._full_load(client, project_id)
+
+            self.logger.debug(f"Applied {applied} changed work packages to project {project_id}")
+            return metrics
+
+    async def load_snapshot(self, client: IOpenProjectClient, project_id: str) -> ProjectSnapshot:
+        """加载项目并同步指标，返回可供领域服务共享的快照"""
+        project, metrics = await asyncio.gather(
+            client.get_project(project_id), self.refresh(client, project_id)
+        )
+        if not project:
+            # 不保留不存在项目的状态
+            self.invalidate(project_id)
+            raise NotFoundError(f"Project not found: {project_id}")
+        return self._snapshot(client, project, metrics)
+
+    async def snapshot_for(self, client: IOpenProjectClient, project: Project) -> ProjectSnapshot:
+        """为已获取的项目同步指标并返回快照"""
+        metrics = await self.refresh(client, project.id)
+        return self._snapshot(client, project, metrics)
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """丢弃项目（默认全部）的增量状态，下次访问时全量加载"""
+        if project_id:
+            self._projects.pop(project_id, None)
+        else:
+            self._projects.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """统计信息"""
+        return {
+            "projects": len(self._projects),
+            "work_packages": sum(len(m) for m in self._projects.values()),
+            "full_loads": self.full_loads,
+            "delta_loads": self.delta_loads,
+            "removed": self.removed
+        }
+
+    @asynccontextmanager
+    async def _project_lock(self, project_id: str) -> AsyncIterator[None]:
+        """同一项目的同步互斥执行，锁在没有使用者后释放"""
+        entry = self._locks.get(project_id)
+        if entry is None:
+            entry = self._locks[project_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[project_id]
+
+    @staticmethod
+    async def _server_ids(client: IOpenProjectClient, project_id: str) -> Optional[Set[str]]:
+        """服务器上项目的全部工作包 ID（客户端不支持时为 None）"""
+        if not hasattr(client, "get_work_package_ids"):
+            return None
+        ids = await client.get_work_package_ids(project_id)
+        return set(ids) if ids is not None else None
+
+    async def _full_load(self, client: IOpenProjectClient, project_id: str) -> IncrementalProjectMetrics:
+        metrics = IncrementalProjectMetrics(project_id)
+        metrics.apply_all(await client.get_work_packages(project_id))
+        self._projects[project_id] = metrics
+        self._projects.move_to_end(project_id)
+        while len(self._projects) > self.max_projects:
+            self._projects.popitem(last=False)
+        self.full_loads += 1
+        return metrics
+
+    @staticmethod
+    def _snapshot(client: IOpenProjectClient, project: Project,
+                  metrics: IncrementalProjectMetrics) -> ProjectSnapshot:
+        return ProjectSnapshot(
+            project,
+            list(metrics.work_packages.values()),
+            client=client,
+            metrics=metrics.to_metrics()
+        )
@@ -0,0 +1,261 @@
+"""
+项目指标历史（每日快照）
+
+每个项目每天一行定长记录，追加写入 metrics.dat，读取时通过 np.memmap
+映射为结构化数组，按项目/日期筛选都是向量化运算。项目 ID 和状态名称
+到编码的映射保存在 meta.json 中。同一天多次记录时以最后一条为准。
+"""
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from mcp_core.domain.services.project_metrics import ProjectMetrics
+from mcp_core.infrastructure.templates.loader import write_file_atomic
+from mcp_core.shared.logger import get_logger
+
+from .work_package_store import NUMPY_AVAILABLE, _require_numpy
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# 每行保存的状态数上限，超出的状态计入最后一个槽位
+MAX_STATUSES = 16
+OTHER_STATUS = "其他"
+
+DATA_FILENAME = "metrics.dat"
+META_FILENAME = "meta.json"
+FORMAT_VERSION = 1
+
+ROW_DTYPE = np.dtype([
+    ("day", "<i4"),                 # 距 1970-01-01 的天数
+    ("project", "<i4"),             # 项目编码（见 meta.json）
+    ("total", "<i4"),
+    ("completed", "<i4"),
+    ("in_progress", "<i4"),
+    ("overdue", "<i4"),
+    ("high_priority_open", "<i4"),
+    ("unassigned", "<i4"),
+    ("completion_rate", "<f4"),
+    ("status_counts", "<i4", (MAX_STATUSES,)),
+]) if NUMPY_AVAILABLE else None
+
+_EPOCH = date(1970, 1, 1)
+
+
+def to_day_number(value: date) -> int:
+    """日期 → 距 1970-01-01 的天数"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def from_day_number(day: int) -> date:
+    """距 1970-01-01 的天数 → 日期"""
+    return _EPOCH + timedelta(days=int(day))
+
+
+class MetricsHistoryStore:
+    """只追加的每日项目指标存储"""
+
+    def __init__(self, directory: str):
+        _require_numpy()
+        self.directory = directory
+        self.data_path = os.path.join(directory, DATA_FILENAME)
+        self.meta_path = os.path.join(directory, META_FILENAME)
+        self.logger = get_logger("mcp.analytics")
+        self._lock = threading.Lock()
+
+        self._projects: List[str] = []
+        self._statuses: List[str] = []
+        self._load_meta()
+
+        # 当前映射的数组及对应的文件大小，文件增长后重新映射
+        self._rows = np.zeros(0, dtype=ROW_DTYPE)
+        self._mapped_size = 0
+
+    def record(self, project_id: str, metrics: ProjectMetrics,
+               day: Optional[date] = None) -> None:
+        """追加一个项目某天的指标"""
+        self.record_many([(project_id, metrics)], day or metrics.now.date())
+
+    def record_many(self, entries: Sequence[Tuple[str, ProjectMetrics]], day: date) -> None:
+        """追加多个项目某天的指标（一次写入、一次 fsync）
+
+        涉及磁盘同步，在事件循环中应通过 asyncio.to_thread 调用。
+        """
+        if not entries:
+            return
+        with self._lock:
+            meta_changed = False
+            rows = np.zeros(len(entries), dtype=ROW_DTYPE)
+            rows["day"] = to_day_number(day)
+            for i, (project_id, metrics) in enumerate(entries):
+                if project_id not in self._projects:
+                    self._projects.append(project_id)
+                    meta_changed = True
+
+                row = rows[i]
+                row["project"] = self._projects.index(project_id)
+                row["total"] = metrics.total
+                row["completed"] = metrics.completed
+                row["in_progress"] = metrics.in_progress
+                row["overdue"] = metrics.overdue_count
+                row["high_priority_open"] = len(metrics.high_priority_incomplete)
+                row["unassigned"] = metrics.unassigned_count
+                row["completion_rate"] = metrics.completion_rate
+                for status, count in metrics.status_distribution.items():
+                    slot, added = self._status_slot(status)
+                    meta_changed = meta_changed or added
+                    row["status_counts"][slot] += count
+
+            # 先保存映射再写数据，保证数据行引用的编码都已持久化
+            if meta_changed:
+                self._save_meta()
+            self._append(rows.tobytes())
+
+    def series(self, project_id: str, start: Optional[date] = None,
+               end: Optional[date] = None) -> "np.ndarray":
+        """项目在 [start, end] 内的每日记录（按日期升序，每天一行）"""
+        rows = self._read_rows()
+        if project_id not in self._projects or not len(rows):
+            return np.zeros(0, dtype=ROW_DTYPE)
+
+        mask = rows["project"] == self._projects.index(project_id)
+        if start is not None:
+            mask &= rows["day"] >= to_day_number(start)
+        if end is not None:
+            mask &= rows["day"] <= to_day_number(end)
+        selected = rows[mask]
+
+        # 同一天多次记录时保留最后追加的一条
+        days = selected["day"][::-1]
+        _, first_in_reversed = np.unique(days, return_index=True)
+        return np.array(selected[len(days) - 1 - first_in_reversed])
+
+    def status_names(self) -> List[str]:
+        """状态槽位对应的名称"""
+        return list(self._statuses)
+
+    def projects(self) -> List[str]:
+        """有历史记录的项目 ID"""
+        return list(self._projects)
+
+    def last_day(self) -> Optional[date]:
+        """最近一次记录的日期"""
+        rows = self._read_rows()
+        return from_day_number(rows["day"].max()) if len(rows) else None
+
+    def recorded_projects(self, day: date) -> Set[str]:
+        """某天已有记录的项目 ID"""
+        rows = self._read_rows()
+        if not len(rows):
+            return set()
+        codes = np.unique(rows["project"][rows["day"] == to_day_number(day)])
+        return {self._projects[code] for code in codes if code < len(self._projects)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """统计信息"""
+        rows = self._read_rows()
+        return {
+            "rows": len(rows),
+            "projects": len(self._projects),
+            "statuses": len(self._statuses),
+            "bytes": self._mapped_size,
+            "last_day": self.last_day().isoformat() if len(rows) else None
+        }
+
+    def _status_slot(self, status: str):
+        """状态对应的槽位，返回 (槽位, 是否新增)"""
+        if status in self._statuses:
+            return self._statuses.index(status), False
+        if len(self._statuses) < MAX_STATUSES - 1:
+            self._statuses.append(status)
+            return len(self._statuses) - 1, True
+        if not self._statuses or self._statuses[-1] != OTHER_STATUS:
+            self._statuses.append(OTHER_STATUS)
+            return MAX_STATUSES - 1, True
+        return MAX_STATUSES - 1, False
+
+    def _append(self, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.data_path, "ab") as f:
+            # 上次写入中断留下的半行会使后续记录错位，先截掉
+            size = f.seek(0, os.SEEK_END)
+            remainder = size % ROW_DTYPE.itemsize
+            if remainder:
+                self.logger.warning(f"Truncating {remainder} trailing bytes in {self.data_path}")
+                f.truncate(size - remainder)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_rows(self) -> "np.ndarray":
+        """映射数据文件（大小未变时复用上次的映射）"""
+        try:
+            size = os.path.getsize(self.data_path)
+        except FileNotFoundError:
+            return self._rows
+        size -= size % ROW_DTYPE.itemsize
+        if size != self._mapped_size:
+            with self._lock:
+                self._load_meta()
+                self._rows = (np.memmap(self.data_path, dtype=ROW_DTYPE, mode="r",
+                                        shape=(size // ROW_DTYPE.itemsize,))
+                              if size else np.zeros(0, dtype=ROW_DTYPE))
+                self._mapped_size = size
+        return self._rows
+
+    def _load_meta(self) -> None:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return
+        self._projects = meta.get("projects", [])
+        self._statuses = meta.get("statuses", [])
+
+    def _save_meta(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        write_file_atomic(self.meta_path, json.dumps({
+            "version": FORMAT_VERSION,
+            "projects": self._projects,
+            "statuses": self._statuses
+        }, ensure_ascii=False, indent=2))
+
+
+def burndown(series: "np.ndarray") -> Dict[str, Any]:
+    """燃尽数据：每天的剩余（未完成）工作包数及平均每日消耗"""
+    days = series["day"]
+    remaining = series["total"] - series["completed"]
+    burn_rate = 0.0
+    if len(series) > 1 and days[-1] > days[0]:
+        burn_rate = float(remaining[0] - remaining[-1]) / float(days[-1] - days[0])
+    return {
+        "days": days,
+        "remaining": remaining,
+        "completed": series["completed"],
+        "overdue": series["overdue"],
+        "burn_rate": burn_rate
+    }
+
+
+def velocity(series: "np.ndarray", weeks: int, today: Optional[date] = None) -> Dict[str, Any]:
+    """最近若干周每周完成的工作包数（以每周最后一条记录的完成数之差计算）"""
+    today_number = to_day_number(today or date.today())
+    # 各周的结束日（含），最后一周以今天结束
+    week_ends = today_number - 7 * np.arange(weeks, -1, -1)
+    days = series["day"]
+    if not len(days):
+        return {"week_ends": week_ends[1:], "completed": np.zeros(weeks, dtype=np.int64), "average": 0.0}
+
+    # 每个周末之前最后一条记录的完成数；早于第一条记录的周末取第一条，避免把历史存量算作一周的完成量
+    positions = np.searchsorted(days, week_ends, side="right") - 1
+    completed_at = series["completed"][np.maximum(positions, 0)]
+    per_week = np.maximum(np.diff(completed_at), 0)
+    return {
+        "week_ends": week_ends[1:],
+        "completed": per_week,
+        "average": float(per_week.mean()) if weeks else 0.0
+    }
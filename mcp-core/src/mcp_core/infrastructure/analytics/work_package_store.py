@@ -0,0 +1,322 @@
+"""
+列式工作包存储
+
+将项目的工作包保存为 NumPy 列（日期为 int64 天数、时间戳为 int64 秒、
+进度为 float32、状态/优先级/负责人/类型为分类编码），直接由 OpenProject
+HAL 响应构建，不创建 pydantic 对象；指标计算为向量化运算。
+只有需要展示具体工作包时才按行生成 WorkPackage 对象。
+"""
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from mcp_core.domain.models import StatusCategory, StatusClassifier, WorkPackage, get_status_classifier
+from mcp_core.domain.services.project_metrics import (
+    DUE_SOON_DAYS, HIGH_PRIORITIES, STAGNANT_DAYS, ProjectMetrics
+)
+from mcp_core.shared.exceptions import ConfigurationError
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# NaT 对应的 int64 值，表示缺失的日期/时间
+MISSING = -(2 ** 63)
+SECONDS_PER_DAY = 86400
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise ConfigurationError(
+            "NumPy is required for columnar analytics: pip install mcp-core[analytics]"
+        )
+
+
+class _Categories:
+    """分类编码（按首次出现顺序编号，None 也是一个分类）"""
+
+    def __init__(self):
+        self.names: List[Optional[str]] = []
+        self._codes: Dict[Optional[str], int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.names)
+            self.names.append(value)
+        return code
+
+
+def _name(item: Dict[str, Any], key: str) -> Optional[str]:
+    """读取 HAL 元素中关联资源的名称（与适配器的解析方式一致）"""
+    value = item.get(key)
+    return value.get('name') if value else None
+
+
+def _timestamp(value: Optional[str]) -> Optional[str]:
+    """ISO 时间戳截取到秒并去掉时区（与适配器一致，保留原始时间部分）"""
+    return value[:19] if value else None
+
+
+class WorkPackageRows(Sequence):
+    """按行访问列式存储中的部分工作包，访问时才生成 WorkPackage"""
+
+    def __init__(self, store: "WorkPackageStore", indices):
+        self._store = store
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return [self._store.row(int(i)) for i in self._indices[key]]
+        return self._store.row(int(self._indices[key]))
+
+    def __iter__(self) -> Iterator[WorkPackage]:
+        for i in self._indices:
+            yield self._store.row(int(i))
+
+
+@dataclass
+class WorkPackageStore:
+    """项目工作包的列式表示"""
+
+    ids: "np.ndarray"
+    subjects: List[str]
+    status: "np.ndarray"
+    priority: "np.ndarray"
+    assignee: "np.ndarray"
+    type: "np.ndarray"
+    status_names: List[Optional[str]]
+    priority_names: List[Optional[str]]
+    assignee_names: List[Optional[str]]
+    type_names: List[Optional[str]]
+    # 时间戳：距 1970-01-01 的秒数；日期：距 1970-01-01 的天数；缺失为 MISSING
+    created_at: "np.ndarray"
+    updated_at: "np.ndarray"
+    start_date: "np.ndarray"
+    due_date: "np.ndarray"
+    # 缺失为 NaN
+    progress: "np.ndarray"
+    project_id: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __sizeof__(self) -> int:
+        # 供缓存估算内存占用（sys.getsizeof）
+        arrays = (self.ids, self.status, self.priority, self.assignee, self.type,
+                  self.created_at, self.updated_at, self.start_date, self.due_date, self.progress)
+        return (object.__sizeof__(self) + sum(a.nbytes for a in arrays)
+                + sum(sys.getsizeof(s) for s in self.subjects))
+
+    @classmethod
+    def from_hal_elements(cls, elements: Iterable[Dict[str, Any]],
+                          project_id: Optional[str] = None) -> "WorkPackageStore":
+        """由 /work_packages 响应的 _embedded.elements 构建（可传入多页元素的迭代器）"""
+        _require_numpy()
+        statuses, priorities, assignees, types = _Categories(), _Categories(), _Categories(), _Categories()
+        ids, subjects = [], []
+        status, priority, assignee, wp_type = [], [], [], []
+        created, updated, start, due, progress = [], [], [], [], []
+
+        for item in elements:
+            ids.append(int(item['id']))
+            subjects.append(item['subject'])
+            status.append(statuses.code(_name(item, 'status')))
+            priority.append(priorities.code(_name(item, 'priority')))
+            assignee.append(assignees.code(_name(item, 'assignee')))
+            wp_type.append(types.code(_name(item, 'type')))
+            created.append(_timestamp(item.get('createdAt')))
+            updated.append(_timestamp(item.get('updatedAt')))
+            start.append(item.get('startDate'))
+            due.append(item.get('dueDate'))
+            done = item.get('percentageDone')
+            progress.append(float('nan') if done is None else done)
+
+        return cls(
+            ids=np.array(ids, dtype=np.int64),
+            subjects=subjects,
+            status=np.array(status, dtype=np.int32),
+            priority=np.array(priority, dtype=np.int32),
+            assignee=np.array(assignee, dtype=np.int32),
+            type=np.array(wp_type, dtype=np.int32),
+            status_names=statuses.names,
+            priority_names=priorities.names,
+            assignee_names=assignees.names,
+            type_names=types.names,
+            created_at=cls._parse_column(created, "datetime64[s]"),
+            updated_at=cls._parse_column(updated, "datetime64[s]"),
+            start_date=cls._parse_column(start, "datetime64[D]"),
+            due_date=cls._parse_column(due, "datetime64[D]"),
+            progress=np.array(progress, dtype=np.float32),
+            project_id=project_id
+        )
+
+    @classmethod
+    def from_work_packages(cls, work_packages: Iterable[WorkPackage],
+                           project_id: Optional[str] = None) -> "WorkPackageStore":
+        """由已有的 WorkPackage 对象构建"""
+        def to_iso(value: Optional[datetime], date_only: bool = False) -> Optional[str]:
+            if value is None:
+                return None
+            return value.strftime('%Y-%m-%d') if date_only else value.strftime('%Y-%m-%dT%H:%M:%S')
+
+        return cls.from_hal_elements((
+            {
+                'id': wp.id,
+                'subject': wp.subject,
+                'status': {'name': wp.status} if wp.status else None,
+                'priority': {'name': wp.priority} if wp.priority else None,
+                'assignee': {'name': wp.assigned_to} if wp.assigned_to else None,
+                'type': {'name': wp.type} if wp.type else None,
+                'createdAt': to_iso(wp.created_at),
+                'updatedAt': to_iso(wp.updated_at),
+                'startDate': to_iso(wp.start_date, date_only=True),
+                'dueDate': to_iso(wp.due_date, date_only=True),
+                'percentageDone': wp.progress
+            }
+            for wp in work_packages
+        ), project_id)
+
+    def row(self, index: int) -> WorkPackage:
+        """生成第 index 行的 WorkPackage（描述不在列式存储中）"""
+        progress = self.progress[index]
+        return WorkPackage(
+            id=str(self.ids[index]),
+            subject=self.subjects[index],
+            status=self.status_names[self.status[index]],
+            type=self.type_names[self.type[index]],
+            priority=self.priority_names[self.priority[index]],
+            assigned_to=self.assignee_names[self.assignee[index]],
+            created_at=self._to_datetime(self.created_at[index], 1),
+            updated_at=self._to_datetime(self.updated_at[index], 1),
+            start_date=self._to_datetime(self.start_date[index], SECONDS_PER_DAY),
+            due_date=self._to_datetime(self.due_date[index], SECONDS_PER_DAY),
+            progress=None if np.isnan(progress) else round(float(progress), 2),
+            project_id=self.project_id
+        )
+
+    def rows(self, indices=None) -> WorkPackageRows:
+        """按行访问（默认全部）"""
+        return WorkPackageRows(self, np.arange(len(self)) if indices is None else indices)
+
+    def status_categories(self, classifier: Optional[StatusClassifier] = None):
+        """每行状态的分类编码（StatusCategory）"""
+        classifier = classifier or get_status_classifier()
+        table = np.array(classifier.category_codes(self.status_names), dtype=np.int8)
+        return table[self.status] if len(table) else np.zeros(len(self), dtype=np.int8)
+
+    def to_metrics(self, now: Optional[datetime] = None,
+                   classifier: Optional[StatusClassifier] = None) -> ProjectMetrics:
+        """向量化计算 ProjectMetrics（与逐个遍历的结果一致）"""
+        now = now or datetime.now()
+        now_seconds = int((now - _EPOCH).total_seconds())
+
+        categories = self.status_categories(classifier)
+        completed = categories == StatusCategory.COMPLETED
+        in_progress = categories == StatusCategory.IN_PROGRESS
+        high_priority = self._mask(self.priority, self.priority_names, HIGH_PRIORITIES)
+        unassigned = self._mask(self.assignee, self.assignee_names, (None,))
+
+        open_due = (self.due_date != MISSING) & ~completed
+        due_seconds = np.where(open_due, self.due_date, 0) * SECONDS_PER_DAY
+        overdue = open_due & (due_seconds < now_seconds)
+        due_soon = open_due & ~overdue & (due_seconds < now_seconds + DUE_SOON_DAYS * SECONDS_PER_DAY)
+
+        has_updated = self.updated_at != MISSING
+        age_days = (now_seconds - np.where(has_updated, self.updated_at, now_seconds)) // SECONDS_PER_DAY
+        stagnant = in_progress & has_updated & (age_days > STAGNANT_DAYS)
+
+        metrics = ProjectMetrics(
+            now=now,
+            total=len(self),
+            completed=int(completed.sum()),
+            in_progress=int(in_progress.sum()),
+            overdue=self.rows(np.flatnonzero(overdue)),
+            unassigned=self.rows(np.flatnonzero(unassigned)),
+            high_priority_incomplete=self.rows(np.flatnonzero(high_priority & ~completed)),
+            stagnant=self.rows(np.flatnonzero(stagnant)),
+            due_soon=self._rows_by_due_date(due_soon),
+            overdue_by_due_date=self._rows_by_due_date(overdue)
+        )
+
+        # 状态分布（分类按首次出现顺序编号，与逐个遍历时的字典顺序一致）
+        counts = np.bincount(self.status, minlength=len(self.status_names))
+        for code, name in enumerate(self.status_names):
+            if counts[code]:
+                key = name or "未知状态"
+                metrics.status_distribution[key] = metrics.status_distribution.get(key, 0) + int(counts[code])
+
+        metrics.assignee_stats = self._assignee_stats(completed, in_progress, overdue, high_priority)
+        return metrics
+
+    def _rows_by_due_date(self, mask) -> WorkPackageRows:
+        """掩码选中的行，按截止日期稳定排序"""
+        indices = np.flatnonzero(mask)
+        return self.rows(indices[np.argsort(self.due_date[indices], kind="stable")])
+
+    def _assignee_stats(self, completed, in_progress, overdue, high_priority) -> Dict[str, Dict[str, Any]]:
+        """按负责人分组统计"""
+        size = len(self.assignee_names)
+
+        def count(mask=None):
+            return np.bincount(self.assignee, weights=mask, minlength=size).astype(np.int64)
+
+        totals = count()
+        completed_counts = count(completed)
+        in_progress_counts = count(in_progress & ~completed)
+        overdue_counts = count(overdue)
+        high_priority_counts = count(high_priority)
+
+        # 按负责人编码稳定排序后切分，得到每个负责人的行号
+        order = np.argsort(self.assignee, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(totals)))
+
+        stats = {}
+        for code, name in enumerate(self.assignee_names):
+            if name is None or not totals[code]:
+                continue
+            stats[name] = {
+                "total": int(totals[code]),
+                "in_progress": int(in_progress_counts[code]),
+                "completed": int(completed_counts[code]),
+                "overdue": int(overdue_counts[code]),
+                "high_priority": int(high_priority_counts[code]),
+                "work_packages": self.rows(order[bounds[code]:bounds[code + 1]])
+            }
+        return stats
+
+    @staticmethod
+    def _mask(codes, names: List[Optional[str]], values: Tuple[Optional[str], ...]):
+        """分类列等于给定值之一的布尔掩码"""
+        matched = [code for code, name in enumerate(names) if name in values]
+        if not matched:
+            return np.zeros(len(codes), dtype=bool)
+        return np.isin(codes, matched)
+
+    @staticmethod
+    def _parse_column(values: List[Optional[str]], dtype: str):
+        """向量化解析日期字符串，无法解析的值视为缺失"""
+        try:
+            return np.array(values, dtype=dtype).view(np.int64)
+        except ValueError:
+            parsed = []
+            for value in values:
+                try:
+                    parsed.append(np.datetime64(value, dtype[len("datetime64["):-1]))
+                except (ValueError, TypeError):
+                    parsed.append(np.datetime64("NaT"))
+            return np.array(parsed, dtype=dtype).view(np.int64)
+
+    @staticmethod
+    def _to_datetime(value, unit_seconds: int) -> Optional[datetime]:
+        if value == MISSING:
+            return None
+        return _EPOCH + timedelta(seconds=int(value) * unit_seconds)
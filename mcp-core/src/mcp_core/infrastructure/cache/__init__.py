@@ -0,0 +1,15 @@
+"""
+缓存系统
+
+提供内存缓存实现和带缓存的 OpenProject 客户端
+"""
+
+from .memory_cache import MemoryCacheProvider, CacheEntry, estimate_size
+from .cached_client import CachedOpenProjectClient
+
+__all__ = [
+    "MemoryCacheProvider",
+    "CacheEntry",
+    "estimate_size",
+    "CachedOpenProjectClient",
+]
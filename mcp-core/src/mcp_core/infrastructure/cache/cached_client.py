@@ -0,0 +1,488 @@
+"""
+带缓存的 OpenProject 客户端装饰器
+
+对热点数据（项目列表、项目工作包）采用 stale-while-revalidate 策略：
+过期但未超过最大陈旧时间的值立即返回，同时在后台刷新；
+访问频繁的键在过期前提前刷新（refresh-ahead）。
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from mcp_core.domain.interfaces import IOpenProjectClient
+from mcp_core.domain.models import Project, WorkPackage, User, Report, get_status_classifier
+from mcp_core.domain.services import ReportGeneratorService, ScheduleIndex
+from mcp_core.infrastructure.analytics import WorkPackageStore
+from mcp_core.shared.config import get_global_config
+from mcp_core.shared.logger import get_logger
+
+from .memory_cache import MemoryCacheProvider, CacheEntry
+
+# 保留日程索引的项目数上限
+MAX_SCHEDULE_INDEXES = 64
+
+# 未找到记录的条目数上限
+MAX_NEGATIVE_ENTRIES = 1024
+
+
+class _NegativeCache:
+    """未找到（404）结果的短期记录
+
+    与主缓存分开保存且容量有限，大量无效 ID 不会挤掉热点数据；
+    不写入快照，重启后不会保留。
+    """
+
+    def __init__(self, ttl: int, max_size: int = MAX_NEGATIVE_ENTRIES):
+        self.ttl = ttl
+        self.max_size = max_size
+        # 键 → 过期时间（单调时钟）
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: str) -> None:
+        """记录未找到的键（ttl 为 0 时不记录）"""
+        if self.ttl <= 0:
+            return
+        self._entries[key] = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def discard_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+
+class CachedOpenProjectClient(IOpenProjectClient):
+    """为任意 OpenProject 客户端增加缓存层"""
+
+    def __init__(self, client: IOpenProjectClient,
+                 cache: Optional[MemoryCacheProvider] = None,
+                 ttl: Optional[int] = None,
+                 stale_ttl: Optional[int] = None,
+                 refresh_ahead_ratio: Optional[float] = None,
+                 hot_key_threshold: Optional[int] = None,
+                 negative_ttl: Optional[int] = None):
+        config = get_global_config()
+        self.client = client
+        self.cache = cache or MemoryCacheProvider(**config.get_cache_config())
+        self.ttl = config.cache_ttl if ttl is None else ttl
+        self.stale_ttl = config.cache_stale_ttl if stale_ttl is None else stale_ttl
+        self.refresh_ahead_ratio = (config.cache_refresh_ahead_ratio
+                                    if refresh_ahead_ratio is None else refresh_ahead_ratio)
+        self.hot_key_threshold = (config.cache_hot_key_threshold
+                                  if hot_key_threshold is None else hot_key_threshold)
+        # 404 结果的缓存时间，防止对无效 ID 的反复查询
+        self.negative_ttl = config.cache_negative_ttl if negative_ttl is None else negative_ttl
+        self.missing = _NegativeCache(self.negative_ttl)
+        self.logger = get_logger("mcp.cache")
+
+        # 正在进行的加载任务，用于合并并发请求
+        self._pending: Dict[str, asyncio.Task] = {}
+        # 项目 → (工作包列表, 分类器版本, 日程索引)，列表被替换后重建
+        self._schedules: "OrderedDict[str, Tuple[List[WorkPackage], Tuple[int, int], ScheduleIndex]]" = (
+            OrderedDict()
+        )
+
+        # 报告服务使用缓存客户端，避免重复请求
+        self.report_generator = ReportGeneratorService(self)
+
+    async def initialize(self) -> None:
+        """初始化客户端"""
+        await self.client.initialize()
+
+    async def cleanup(self) -> None:
+        """清理资源"""
+        for task in list(self._pending.values()):
+            task.cancel()
+        self._pending.clear()
+        await self.client.cleanup()
+
+    async def check_connection(self) -> bool:
+        """检查连接状态"""
+        return await self.client.check_connection()
+
+    # 项目相关方法
+    async def get_projects(self) -> List[Project]:
+        """获取所有项目"""
+        return await self._get_or_load("projects", self._load_projects)
+
+    async def get_project(self, project_id: str) -> Optional[Project]:
+        """获取单个项目（不存在的项目短时间内直接返回 None）"""
+        missing_key = f"project:{project_id}"
+        if missing_key in self.missing:
+            return None
+
+        project = await self._get_or_load(
+            f"project:{project_id}",
+            lambda: self.client.get_project(project_id)
+        )
+        if project is None:
+            self.missing.add(missing_key)
+        return project
+
+    # 工作包相关方法
+    async def _load_projects(self) -> List[Project]:
+        """加载项目列表，并清除新出现项目的未找到记录"""
+        projects = await self.client.get_projects()
+        for project in projects:
+            self.missing.discard(f"project:{project.id}")
+            self.missing.discard(f"project:{project.identifier}")
+        return projects
+
+    async def get_work_packages(self, project_id: Optional[str] = None,
+                                updated_since: Optional[datetime] = None) -> List[WorkPackage]:
+        """获取工作包列表（增量查询不经过缓存）"""
+        if updated_since:
+            return await self.client.get_work_packages(project_id, updated_since)
+        return await self._get_or_load(
+            f"work_packages:{project_id or '*'}",
+            lambda: self.client.get_work_packages(project_id)
+        )
+
+    async def get_work_package_store(self, project_id: str) -> WorkPackageStore:
+        """获取项目工作包的列式存储"""
+        return await self._get_or_load(
+            f"work_package_store:{project_id}",
+            lambda: self._load_work_package_store(project_id)
+        )
+
+    async def _load_work_package_store(self, project_id: str) -> WorkPackageStore:
+        """由底层客户端加载列式存储，不支持时由工作包列表构建"""
+        if hasattr(self.client, "get_work_package_store"):
+            return await self.client.get_work_package_store(project_id)
+        work_packages = await self.get_work_packages(project_id)
+        return WorkPackageStore.from_work_packages(work_packages, project_id)
+
+    def get_schedule_index(self, project_id: str, work_packages: List[WorkPackage]) -> ScheduleIndex:
+        """工作包列表的日程索引（缓存中的列表未被替换时跨请求复用）"""
+        classifier = get_status_classifier()
+        version = (id(classifier), classifier.version)
+        entry = self._schedules.get(project_id)
+        if entry is not None and entry[0] is work_packages and entry[1] == version:
+            self._schedules.move_to_end(project_id)
+            return entry[2]
+
+        schedule = ScheduleIndex(work_packages)
+        self._schedules[project_id] = (work_packages, version, schedule)
+        self._schedules.move_to_end(project_id)
+        while len(self._schedules) > MAX_SCHEDULE_INDEXES:
+            self._schedules.popitem(last=False)
+        return schedule
+
+    async def get_work_package_ids(self, project_id: str) -> Optional[List[str]]:
+        """获取项目全部工作包的 ID（不缓存；底层客户端不支持时为 None）"""
+        if not hasattr(self.client, "get_work_package_ids"):
+            return None
+        return await self.client.get_work_package_ids(project_id)
+
+    async def count_work_packages(self, project_id: Optional[str] = None,
+                                  updated_since: Optional[datetime] = None) -> int:
+        """统计工作包数量"""
+        return await self.client.count_work_packages(project_id, updated_since)
+
+    async def get_work_package(self, work_package_id: str) -> Optional[WorkPackage]:
+        """获取单个工作包（不存在的工作包短时间内直接返回 None）"""
+        missing_key = f"work_package:{work_package_id}"
+        if missing_key in self.missing:
+            return None
+
+        work_package = await self.client.get_work_package(work_package_id)
+        if work_package is None:
+            self.missing.add(missing_key)
+        return work_package
+
+    async def create_work_package(self, work_package_data: Dict[str, Any]) -> WorkPackage:
+        """创建工作包"""
+        work_package = await self.client.create_work_package(work_package_data)
+        await self.invalidate_work_packages()
+        # 新建的工作包可能正是之前查询不到的 ID
+        self.missing.discard_prefix("work_package:")
+        return work_package
+
+    async def update_work_package(self, work_package_id: str,
+                                work_package_data: Dict[str, Any]) -> WorkPackage:
+        """更新工作包"""
+        work_package = await self.client.update_work_package(work_package_id, work_package_data)
+        await self.invalidate_work_packages()
+        return work_package
+
+    # 用户相关方法
+    async def get_users(self) -> List[User]:
+        """获取用户列表"""
+        return await self._get_or_load("users", self.client.get_users)
+
+    async def get_statuses(self) -> List[Dict[str, Any]]:
+        """获取工作包状态列表（底层客户端不支持时为空）"""
+        if not hasattr(self.client, "get_statuses"):
+            return []
+        return await self._get_or_load("statuses", self.client.get_statuses)
+
+    async def get_user(self, user_id: str) -> Optional[User]:
+        """获取单个用户"""
+        return await self.client.get_user(user_id)
+
+    # 报告生成方法
+    async def generate_weekly_report(self, project_id: str,
+                                   start_date: str, end_date: str) -> Report:
+        """生成周报"""
+        return await self.report_generator.generate_weekly_report(project_id, start_date, end_date)
+
+    async def generate_monthly_report(self, project_id: str,
+                                    year: int, month: int) -> Report:
+        """生成月报"""
+        return await self.report_generator.generate_monthly_report(project_id, year, month)
+
+    async def assess_project_risks(self, project_id: str) -> Report:
+        """评估项目风险"""
+        return await self.client.assess_project_risks(project_id)
+
+    # 配置方法
+    def get_base_url(self) -> str:
+        """获取基础 URL"""
+        return self.client.get_base_url()
+
+    def get_api_key(self) -> str:
+        """获取 API 密钥"""
+        return self.client.get_api_key()
+
+    # 缓存管理
+    async def invalidate_work_packages(self, project_id: Optional[str] = None) -> None:
+        """使工作包缓存失效"""
+        if project_id:
+            await self.cache.delete(f"work_packages:{project_id}")
+            await self.cache.delete(f"work_package_store:{project_id}")
+            await self.cache.delete("work_packages:*")
+            self._schedules.pop(project_id, None)
+        else:
+            await self.cache.delete_prefix("work_packages:")
+            await self.cache.delete_prefix("work_package_store:")
+            self._schedules.clear()
+
+    async def warm_up(self, project_count: Optional[int] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """预热缓存：并发加载项目列表、用户和最近更新项目的工作包"""
+        config = get_global_config()
+        project_count = config.cache_warmup_projects if project_count is None else project_count
+        timeout = config.cache_warmup_timeout if timeout is None else timeout
+
+        start_time = time.perf_counter()
+        result = {"projects": 0, "users": 0, "work_packages": 0, "warmed_projects": 0}
+
+        async def load_project_work_packages(project: Project, semaphore: asyncio.Semaphore) -> None:
+            async with semaphore:
+                work_packages = await self.get_work_packages(project.id)
+            result["work_packages"] += len(work_packages)
+            result["warmed_projects"] += 1
+            self.logger.info(
+                f"Cache warm-up: {project.name} ({len(work_packages)} work packages) "
+                f"[{result['warmed_projects']}/{project_count}]"
+            )
+
+        async def run() -> None:
+            projects, users = await asyncio.gather(self.get_projects(), self.get_users())
+            result["projects"] = len(projects)
+            result["users"] = len(users)
+            self.logger.info(f"Cache warm-up: {len(projects)} projects, {len(users)} users loaded")
+
+            # 只预热最近更新的 N 个项目
+            recent_projects = sorted(
+                projects, key=lambda p: p.updated_at or datetime.min, reverse=True
+            )[:project_count]
+            semaphore = asyncio.Semaphore(config.max_concurrent_requests)
+            await asyncio.gather(*[
+                load_project_work_packages(project, semaphore) for project in recent_projects
+            ])
+
+        try:
+            await asyncio.wait_for(run(), timeout=timeout)
+            result["completed"] = True
+        except asyncio.TimeoutError:
+            # 超时不影响启动，已发起的加载会在后台继续写入缓存
+            result["completed"] = False
+            self.logger.warning(f"Cache warm-up exceeded time budget ({timeout}s)")
+        except Exception as e:
+            result["completed"] = False
+            self.logger.error("Cache warm-up failed", e)
+
+        result["duration"] = round(time.perf_counter() - start_time, 3)
+        self.logger.info(f"Cache warm-up finished: {result}")
+        return result
+
+    def save_snapshot(self, path: Optional[str] = None) -> int:
+        """将当前缓存保存为快照文件"""
+        path = path or get_global_config().cache_snapshot_path
+        count = self.cache.save_snapshot(path)
+        self.logger.info(f"Cache snapshot saved: {count} entries -> {path}")
+        return count
+
+    async def restore_snapshot(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """从快照恢复缓存，并用变更探测代替全量重新获取"""
+        config = get_global_config()
+        path = path or config.cache_snapshot_path
+        result = {"restored": 0, "revalidated": 0, "stale": 0, "dropped": 0}
+
+        try:
+            result["restored"] = self.cache.load_snapshot(path)
+        except Exception as e:
+            self.logger.error(f"Failed to restore cache snapshot {path}", e)
+            return result
+        if not result["restored"]:
+            return result
+
+        semaphore = asyncio.Semaphore(config.max_concurrent_requests)
+
+        async def probe_work_packages(key: str) -> None:
+            entry = self.cache.peek_entry(key)
+            if entry is None:
+                return
+            project_id = key.split(":", 1)[1]
+            scope = None if project_id == "*" else project_id
+            since = datetime.fromtimestamp(entry.created_at, timezone.utc).replace(tzinfo=None)
+            async with semaphore:
+                # 变更数只能发现更新，被删除或移出项目的工作包要靠总数比对
+                changed, total = await asyncio.gather(
+                    self.client.count_work_packages(scope, updated_since=since),
+                    self.client.count_work_packages(scope)
+                )
+            if changed or total != self._cached_count(entry):
+                self._mark_stale(entry)
+                result["stale"] += 1
+            else:
+                self._mark_fresh(entry)
+                result["revalidated"] += 1
+
+        async def probe_projects() -> None:
+            # 一次项目列表请求即可验证所有单个项目条目
+            projects = await self._load("projects", self._load_projects)
+            latest = {project.id: project.updated_at for project in projects}
+            for key in self.cache.keys():
+                if not key.startswith("project:"):
+                    continue
+                # 经缓存反序列化，按实际对象更新内存统计
+                entry = self.cache.resolve_entry(key)
+                if entry is None:
+                    continue
+                project = entry.value
+                if project is not None and latest.get(project.id) == project.updated_at:
+                    self._mark_fresh(entry)
+                    result["revalidated"] += 1
+                else:
+                    await self.cache.delete(key)
+                    result["dropped"] += 1
+
+        probes = [probe_projects()]
+        for key in self.cache.keys():
+            if key.startswith(("work_packages:", "work_package_store:")):
+                probes.append(probe_work_packages(key))
+            elif key == "users":
+                # 用户列表下次访问时后台刷新即可
+                entry = self.cache.peek_entry(key)
+                if entry is not None:
+                    self._mark_stale(entry)
+                    result["stale"] += 1
+
+        for error in await asyncio.gather(*probes, return_exceptions=True):
+            if isinstance(error, Exception):
+                # 探测失败的条目保留原有时间戳，陈旧程度仍受原过期时间约束
+                self.logger.warning(f"Cache snapshot revalidation probe failed: {error}")
+
+        self.logger.info(f"Cache snapshot restored from {path}: {result}")
+        return result
+
+    @staticmethod
+    def _cached_count(entry: CacheEntry) -> Optional[int]:
+        """缓存值的元素数（快照中的值不反序列化）"""
+        if entry.lazy:
+            return entry.value.count
+        try:
+            return len(entry.value)
+        except TypeError:
+            return None
+
+    def _mark_fresh(self, entry: CacheEntry) -> None:
+        """将条目标记为刚刚验证过"""
+        now = time.time()
+        entry.created_at = now
+        entry.expires_at = now + self.ttl + self.stale_ttl
+
+    def _mark_stale(self, entry: CacheEntry) -> None:
+        """将条目标记为已过期（下次访问时返回旧值并后台刷新）"""
+        now = time.time()
+        entry.created_at = now - self.ttl
+        entry.expires_at = now + self.stale_ttl
+
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        stats = await self.cache.get_stats()
+        stats["refreshing"] = len(self._pending)
+        return stats
+
+    async def _get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """按 stale-while-revalidate 策略读取缓存"""
+        entry = self.cache.get_entry(key)
+        if entry is None:
+            return await self._load(key, loader)
+
+        age = entry.get_age()
+        if age >= self.ttl:
+            # 已过期但仍在最大陈旧时间内：立即返回旧值并后台刷新
+            self._refresh_in_background(key, loader)
+        elif (entry.hits >= self.hot_key_threshold
+              and age >= self.ttl * self.refresh_ahead_ratio):
+            # 热点键提前刷新，避免过期时出现延迟尖峰
+            self._refresh_in_background(key, loader)
+
+        return entry.value
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """加载数据并写入缓存，合并同一键的并发加载"""
+        task = self._pending.get(key)
+        if task is None:
+            task = self._start_refresh(key, loader)
+        return await asyncio.shield(task)
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        """触发后台刷新（同一键只会有一个刷新任务）"""
+        if key not in self._pending:
+            self._start_refresh(key, loader)
+
+    def _start_refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """创建刷新任务"""
+        async def refresh() -> Any:
+            value = await loader()
+            if value is not None:
+                # 存储时间覆盖新鲜期和最大陈旧期，超过后由缓存自动淘汰
+                await self.cache.set(key, value, ttl=self.ttl + self.stale_ttl)
+            return value
+
+        task = asyncio.create_task(refresh())
+        self._pending[key] = task
+        task.add_done_callback(lambda t: self._on_refresh_done(key, t))
+        return task
+
+    def _on_refresh_done(self, key: str, task: asyncio.Task) -> None:
+        """刷新任务完成回调"""
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.logger.warning(f"Cache refresh failed for {key}: {error}")
@@ -0,0 +1,279 @@
+"""
+内存缓存提供者实现
+"""
+import mmap
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Dict
+
+from pydantic import BaseModel
+
+from mcp_core.domain.interfaces import ICacheProvider
+
+# 估算大容器内存时的采样数量
+_SIZE_SAMPLE = 64
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """估算对象占用的内存（字节）
+
+    大列表只对前若干个元素采样后按数量外推，避免插入时遍历整个列表。
+    """
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+
+    if isinstance(value, BaseModel):
+        return size + sum(estimate_size(v, _depth + 1) for v in value.__dict__.values())
+
+    if isinstance(value, dict):
+        items = list(value.items())
+        sample = items[:_SIZE_SAMPLE]
+        if not sample:
+            return size
+        sample_size = sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+                          for k, v in sample)
+        return size + sample_size * len(items) // len(sample)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = value if isinstance(value, (list, tuple)) else list(value)
+        sample = items[:_SIZE_SAMPLE]
+        if not sample:
+            return size
+        sample_size = sum(estimate_size(item, _depth + 1) for item in sample)
+        return size + sample_size * len(items) // len(sample)
+
+    return size
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+
+    value: Any
+    created_at: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None
+    hits: int = 0
+    # 估算的内存占用（字节）
+    size: int = 0
+    # 值是否仍为快照中的未反序列化数据
+    lazy: bool = False
+
+    def resolve(self) -> Any:
+        """返回实际值，必要时从快照中反序列化"""
+        if self.lazy:
+            self.value = self.value.load()
+            self.lazy = False
+        return self.value
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """检查条目是否已过期"""
+        if self.expires_at is None:
+            return False
+        return (now or time.time()) >= self.expires_at
+
+    def get_age(self, now: Optional[float] = None) -> float:
+        """获取条目存活时间（秒）"""
+        return (now or time.time()) - self.created_at
+
+
+class MemoryCacheProvider(ICacheProvider):
+    """基于 LRU 的进程内缓存，同时限制条目数和估算内存"""
+
+    def __init__(self, ttl: int = 300, max_size: int = 1000, max_bytes: int = 0):
+        self.default_ttl = ttl
+        self.max_size = max_size
+        # 0 表示不限制内存
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes_used = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._snapshot_buffer: Optional[mmap.mmap] = None
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """获取缓存条目（包含元数据），并记录访问"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        if entry.is_expired():
+            self._remove(key)
+            self._misses += 1
+            return None
+
+        self._resolve(entry)
+        entry.hits += 1
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def peek_entry(self, key: str) -> Optional[CacheEntry]:
+        """获取缓存条目但不记录访问、不反序列化快照数据"""
+        entry = self._entries.get(key)
+        if entry is None or entry.is_expired():
+            return None
+        return entry
+
+    def resolve_entry(self, key: str) -> Optional[CacheEntry]:
+        """获取缓存条目并反序列化快照数据（更新内存统计），但不记录访问"""
+        entry = self.peek_entry(key)
+        if entry is not None and entry.lazy:
+            self._resolve(entry)
+            self._evict_if_needed()
+        return entry
+
+    def keys(self) -> list:
+        """获取当前所有键"""
+        return list(self._entries.keys())
+
+    def save_snapshot(self, path: str) -> int:
+        """将缓存内容持久化到快照文件"""
+        from .snapshot import save_snapshot
+        entries = list(self._entries.items())
+        # 写入前需要实际值，经 _resolve 反序列化以保持内存统计准确
+        for _, entry in entries:
+            self._resolve(entry)
+        return save_snapshot(path, entries)
+
+    def load_snapshot(self, path: str) -> int:
+        """从快照文件恢复缓存（值在首次访问时才反序列化）"""
+        from .snapshot import load_snapshot
+        entries, buffer = load_snapshot(path)
+        if buffer is not None:
+            self._close_snapshot()
+            self._snapshot_buffer = buffer
+        for key, entry in entries.items():
+            # 内存中已有的新数据优先
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._bytes_used += entry.size
+        self._evict_if_needed()
+        return len(entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """获取缓存值"""
+        entry = self.get_entry(key)
+        return entry.value if entry else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """设置缓存值"""
+        ttl = self.default_ttl if ttl is None else ttl
+        previous = self._remove(key)
+
+        size = estimate_size(value)
+        if self.max_bytes and size > self.max_bytes:
+            # 单个值超过整个预算时不缓存，避免清空其他所有条目
+            return
+
+        entry = CacheEntry(
+            value=value,
+            expires_at=time.time() + ttl if ttl > 0 else None,
+            # 刷新后保留访问热度，便于识别热点键
+            hits=previous.hits if previous else 0,
+            size=size
+        )
+        self._entries[key] = entry
+        self._bytes_used += size
+        self._evict_if_needed()
+
+    async def delete(self, key: str) -> bool:
+        """删除缓存值"""
+        return self._remove(key) is not None
+
+    async def delete_prefix(self, prefix: str) -> int:
+        """删除指定前缀的所有缓存值"""
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        """清空所有缓存"""
+        self._entries.clear()
+        self._bytes_used = 0
+        self._close_snapshot()
+
+    async def exists(self, key: str) -> bool:
+        """检查键是否存在"""
+        entry = self._entries.get(key)
+        return entry is not None and not entry.is_expired()
+
+    async def get_ttl(self, key: str) -> Optional[int]:
+        """获取键的剩余生存时间"""
+        entry = self._entries.get(key)
+        if entry is None or entry.is_expired():
+            return None
+        if entry.expires_at is None:
+            return -1
+        return int(entry.expires_at - time.time())
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        total_requests = self._hits + self._misses
+
+        # 按键前缀（冒号之前的部分）汇总内存占用
+        bytes_by_prefix: Dict[str, int] = {}
+        for key, entry in self._entries.items():
+            prefix = key.split(":", 1)[0]
+            bytes_by_prefix[prefix] = bytes_by_prefix.get(prefix, 0) + entry.size
+
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "bytes_used": self._bytes_used,
+            "max_bytes": self.max_bytes,
+            "bytes_by_prefix": bytes_by_prefix,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": round(self._hits / total_requests * 100, 1) if total_requests else 0
+        }
+
+    async def cleanup_expired(self) -> int:
+        """清理过期的缓存项"""
+        now = time.time()
+        expired_keys = [key for key, entry in self._entries.items() if entry.is_expired(now)]
+        for key in expired_keys:
+            self._remove(key)
+        return len(expired_keys)
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        """移除条目并更新内存统计"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes_used -= entry.size
+        return entry
+
+    def _resolve(self, entry: CacheEntry) -> None:
+        """反序列化快照条目，并按实际对象重新估算内存"""
+        if not entry.lazy:
+            return
+        entry.resolve()
+        size = estimate_size(entry.value)
+        self._bytes_used += size - entry.size
+        entry.size = size
+
+    def _evict_if_needed(self) -> None:
+        """超过条目数或内存预算时淘汰最久未使用的条目"""
+        while self._entries and (
+            len(self._entries) > self.max_size
+            or (self.max_bytes and self._bytes_used > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._evictions += 1
+
+    def _close_snapshot(self) -> None:
+        """释放快照内存映射（先反序列化仍引用它的条目）"""
+        if self._snapshot_buffer is None:
+            return
+        for entry in list(self._entries.values()):
+            self._resolve(entry)
+        self._snapshot_buffer.close()
+        self._snapshot_buffer = None
+        self._evict_if_needed()
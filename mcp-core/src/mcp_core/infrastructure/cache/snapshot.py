@@ -0,0 +1,135 @@
+"""
+缓存快照持久化
+
+快照文件格式：
+    魔数 (8 字节) | 索引长度 (8 字节, 小端) | 索引 (JSON) | 条目数据 (pickle)
+
+启动时只解析索引，条目数据通过内存映射按需反序列化，
+因此大快照的加载时间与条目数量无关。
+"""
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from mcp_core.shared.exceptions import CacheError
+
+from .memory_cache import CacheEntry
+
+SNAPSHOT_MAGIC = b"MCPCACHE"
+SNAPSHOT_VERSION = 3
+_HEADER_STRUCT = struct.Struct("<8sQ")
+
+
+class SnapshotValue:
+    """快照中尚未反序列化的缓存值"""
+
+    __slots__ = ("_buffer", "_offset", "_length", "count")
+
+    def __init__(self, buffer: mmap.mmap, offset: int, length: int, count: Optional[int] = None):
+        self._buffer = buffer
+        self._offset = offset
+        self._length = length
+        # 值的元素数（列表等），无需反序列化即可与服务器总数比对
+        self.count = count
+
+    def load(self) -> Any:
+        """从内存映射中反序列化值"""
+        return pickle.loads(self._buffer[self._offset:self._offset + self._length])
+
+
+def save_snapshot(path: str, entries: Iterable[Tuple[str, CacheEntry]]) -> int:
+    """将缓存条目写入快照文件，返回写入的条目数"""
+    index: Dict[str, Any] = {}
+    payloads = []
+    offset = 0
+    now = time.time()
+
+    for key, entry in entries:
+        if entry.is_expired(now):
+            continue
+        value = entry.resolve()
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # 无法序列化的值直接跳过，不影响其他条目
+            continue
+        try:
+            count = len(value)
+        except TypeError:
+            count = None
+        index[key] = [offset, len(payload), entry.created_at, entry.expires_at, entry.hits, entry.size, count]
+        payloads.append(payload)
+        offset += len(payload)
+
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "saved_at": now,
+        "entries": index
+    }).encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    # 先写临时文件再原子替换，避免重启过程中留下半个快照
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".cache-snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER_STRUCT.pack(SNAPSHOT_MAGIC, len(header)))
+            f.write(header)
+            for payload in payloads:
+                f.write(payload)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise CacheError(f"Failed to write cache snapshot: {e}")
+
+    return len(index)
+
+
+def load_snapshot(path: str) -> Tuple[Dict[str, CacheEntry], Optional[mmap.mmap]]:
+    """加载快照索引，条目值延迟到首次访问时反序列化"""
+    if not os.path.exists(path) or os.path.getsize(path) < _HEADER_STRUCT.size:
+        return {}, None
+
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        magic, header_length = _HEADER_STRUCT.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise CacheError(f"Invalid cache snapshot: {path}")
+
+        header_start = _HEADER_STRUCT.size
+        header = json.loads(buffer[header_start:header_start + header_length])
+        if header.get("version") != SNAPSHOT_VERSION:
+            buffer.close()
+            return {}, None
+    except CacheError:
+        buffer.close()
+        raise
+    except Exception as e:
+        buffer.close()
+        raise CacheError(f"Failed to read cache snapshot: {e}")
+
+    data_start = header_start + header_length
+    now = time.time()
+    entries = {}
+    for key, (offset, length, created_at, expires_at, hits, size, count) in header["entries"].items():
+        if expires_at is not None and expires_at <= now:
+            continue
+        entries[key] = CacheEntry(
+            value=SnapshotValue(buffer, data_start + offset, length, count),
+            created_at=created_at,
+            expires_at=expires_at,
+            hits=hits,
+            size=size,
+            lazy=True
+        )
+
+    return entries, buffer
@@ -0,0 +1,26 @@
+"""
+模板系统
+
+提供报告模板的索引、加载和渲染
+"""
+
+from .registry import TemplateRegistry, TemplateRecord, DEFAULT_TEMPLATES_DIR
+from .compiler import TemplateCompiler, create_environment
+from .filters import TEMPLATE_FILTERS
+from .watcher import TemplateWatcher
+from .variables import TemplateVariableRegistry, VariableContext, template_variables
+from .engine import JinjaTemplateEngine
+
+__all__ = [
+    "TemplateRegistry",
+    "TemplateRecord",
+    "DEFAULT_TEMPLATES_DIR",
+    "TemplateCompiler",
+    "create_environment",
+    "TEMPLATE_FILTERS",
+    "TemplateWatcher",
+    "TemplateVariableRegistry",
+    "VariableContext",
+    "template_variables",
+    "JinjaTemplateEngine",
+]
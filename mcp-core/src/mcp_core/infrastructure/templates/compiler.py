@@ -0,0 +1,84 @@
+"""
+模板编译缓存
+
+使用长期存在的 Jinja2 环境，并按 (模板 ID, 内容哈希) 缓存编译结果，
+避免每次渲染都重新编译标题和各章节模板。缓存可能同时被事件循环、
+渲染线程和文件监听线程访问，读写都在锁内进行（编译本身在锁外）。
+"""
+import hashlib
+import threading
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+from jinja2 import Environment, Template, meta
+
+from .filters import TEMPLATE_FILTERS
+
+
+def create_environment() -> Environment:
+    """创建注册了自定义过滤器的 Jinja2 环境"""
+    env = Environment()
+    env.filters.update(TEMPLATE_FILTERS)
+    return env
+
+
+class TemplateCompiler:
+    """编译后模板的缓存"""
+
+    def __init__(self, env: Environment = None):
+        self.env = env or create_environment()
+        self._compiled: Dict[str, Dict[str, Template]] = {}
+        # 模板 ID → (内容哈希, 引用的变量)
+        self._variables: Dict[str, Tuple[str, FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_id: str, source: str) -> Template:
+        """获取编译后的模板，未命中时编译并缓存"""
+        source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            template = self._compiled.get(template_id, {}).get(source_hash)
+        if template is None:
+            template = self.env.from_string(source)
+            with self._lock:
+                self._compiled.setdefault(template_id, {})[source_hash] = template
+        return template
+
+    def get_variables(self, template_id: str, sources: Iterable[str]) -> FrozenSet[str]:
+        """获取模板各片段引用的全部未声明变量（按内容哈希缓存）"""
+        sources = [source for source in sources if source]
+        digest = hashlib.sha1("\0".join(sources).encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._variables.get(template_id)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        names = set()
+        for source in sources:
+            try:
+                names.update(meta.find_undeclared_variables(self.env.parse(source)))
+            except Exception:
+                # 语法错误的片段渲染时会单独报错
+                continue
+        variables = frozenset(names)
+        with self._lock:
+            self._variables[template_id] = (digest, variables)
+        return variables
+
+    def invalidate(self, template_id: str) -> None:
+        """丢弃指定模板的所有编译结果（可在文件监听线程中调用）"""
+        with self._lock:
+            self._compiled.pop(template_id, None)
+            self._variables.pop(template_id, None)
+
+    def clear(self) -> None:
+        """清空编译缓存"""
+        with self._lock:
+            self._compiled.clear()
+            self._variables.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                "compiled_templates": len(self._compiled),
+                "compiled_sources": sum(len(t) for t in self._compiled.values())
+            }
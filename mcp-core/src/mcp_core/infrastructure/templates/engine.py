@@ -0,0 +1,397 @@
+"""
+基于 Jinja2 的模板引擎实现
+
+模板索引、编译缓存、沙箱渲染和渲染耗时统计都集中在这里，
+MCP 工具层只负责准备模板变量。
+"""
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional
+
+import yaml
+from jinja2 import meta
+from jinja2.sandbox import SandboxedEnvironment
+
+from mcp_core.domain.interfaces import ITemplateEngine
+from mcp_core.shared.config import get_global_config
+from mcp_core.shared.exceptions import TemplateConflictError, TemplateError
+from mcp_core.shared.logger import get_logger
+
+from .compiler import TemplateCompiler
+from .loader import write_file_atomic
+from .filters import TEMPLATE_FILTERS
+from .registry import TemplateRegistry, TemplateRecord
+from .watcher import TemplateWatcher
+
+DEFAULT_TITLE_TEMPLATE = "{{project_name}} 报告"
+
+# 模板源码超过该大小时在线程池中渲染
+_OFFLOAD_SOURCE_BYTES = 16 * 1024
+
+# 流式渲染时累积到该大小（字符数）才输出一个分块
+_STREAM_CHUNK_SIZE = 8 * 1024
+
+
+class JinjaTemplateEngine(ITemplateEngine):
+    """Jinja2 模板引擎"""
+
+    def __init__(self, templates_dir: Optional[str] = None,
+                 enable_async: Optional[bool] = None,
+                 offload_threshold: Optional[int] = None):
+        config = get_global_config()
+        self.registry = TemplateRegistry(templates_dir, scan_interval=config.template_scan_interval,
+                                         parse_cache=config.template_parse_cache_enabled,
+                                         parse_cache_root=config.template_parse_cache_dir or None)
+        self.enable_async = config.template_enable_async if enable_async is None else enable_async
+        # 模板变量中列表长度达到该值时，渲染移出事件循环
+        self.offload_threshold = (config.template_offload_threshold
+                                  if offload_threshold is None else offload_threshold)
+
+        env = SandboxedEnvironment(enable_async=self.enable_async)
+        env.filters.update(TEMPLATE_FILTERS)
+        self.compiler = TemplateCompiler(env)
+        self.logger = get_logger("mcp.templates")
+
+        self.watcher = TemplateWatcher(
+            self.registry,
+            on_change=self.compiler.invalidate,
+            poll_interval=config.template_watch_poll_interval
+        )
+
+        self._render_count = 0
+        self._render_seconds = 0.0
+        self._save_lock = threading.Lock()
+
+        if config.template_watch_enabled:
+            self.start_watching()
+
+    @property
+    def templates_dir(self) -> str:
+        """模板根目录"""
+        return self.registry.templates_dir
+
+    def start_watching(self) -> None:
+        """监听模板目录，文件修改后立即生效（无需按请求扫描）"""
+        self.watcher.start()
+
+    def stop_watching(self) -> None:
+        """停止监听模板目录"""
+        self.watcher.stop()
+
+    async def list_templates(self) -> List[Dict[str, Any]]:
+        """获取所有模板列表"""
+        return [record.to_summary() for record in self.registry.list()]
+
+    async def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """获取指定模板"""
+        record = self.registry.get(template_id)
+        return record.data if record else None
+
+    async def save_template(self, template_id: str, template_data: Dict[str, Any],
+                            expected_revision: Optional[str] = None) -> bool:
+        """保存模板
+
+        写入临时文件后原子替换，并就地更新模板索引和编译缓存。
+        传入 expected_revision 时，只有模板当前版本与之一致才会保存（乐观锁）。
+        """
+        # 添加时间戳（没有 template_info 的模板按 custom 类型保存）
+        template_info = template_data.setdefault('template_info', {})
+        template_info['updated_at'] = datetime.now().isoformat()
+
+        template_type = template_info.get('type', 'custom')
+        type_dir = os.path.join(self.templates_dir, template_type)
+        file_path = os.path.join(type_dir, f"{template_id}.yaml")
+        content = yaml.dump(template_data, default_flow_style=False, allow_unicode=True)
+
+        with self._save_lock:
+            existing = self.registry.get(template_id)
+            if expected_revision is not None:
+                # 从磁盘重新索引，以发现其他进程或手工的修改
+                current = self.registry.index_file(existing.path) if existing else None
+                current_revision = current.digest if current else None
+                if current_revision != expected_revision:
+                    raise TemplateConflictError(
+                        f"Template {template_id} was modified by someone else",
+                        template_id=template_id,
+                        current_revision=current_revision
+                    )
+
+            try:
+                os.makedirs(type_dir, exist_ok=True)
+                write_file_atomic(file_path, content)
+            except Exception as e:
+                self.logger.error(f"Failed to save template {template_id}: {e}")
+                raise TemplateError(f"Failed to save template: {str(e)}", template_id=template_id)
+
+            # 模板类型变化时移除旧位置的文件，避免同名模板遮盖新版本
+            if existing and existing.path != file_path:
+                try:
+                    os.remove(existing.path)
+                except OSError as e:
+                    self.logger.warning(f"Failed to remove old template file {existing.path}: {e}")
+                self.registry.index_file(existing.path)
+
+            # 更新模板索引并丢弃旧的编译结果，保存后立即可用
+            self.registry.index_file(file_path)
+            self.compiler.invalidate(template_id)
+        return True
+
+    def get_template_revision(self, template_id: str) -> Optional[str]:
+        """获取模板当前版本（文件内容哈希）"""
+        record = self.registry.get(template_id)
+        return record.digest if record else None
+
+    async def delete_template(self, template_id: str) -> bool:
+        """删除模板"""
+        record = self.registry.get(template_id)
+        if not record:
+            return False
+
+        try:
+            os.remove(record.path)
+        except OSError as e:
+            raise TemplateError(f"Failed to delete template: {str(e)}", template_id=template_id)
+
+        self.registry.index_file(record.path)
+        self.compiler.invalidate(template_id)
+        return True
+
+    async def render_template(self, template_id: str, data: Dict[str, Any]) -> str:
+        """渲染模板为 Markdown 文本"""
+        record = self._get_record(template_id)
+        start_time = time.perf_counter()
+
+        title_template, section_templates = self._compile(record)
+
+        if self.enable_async:
+            content = await self._render_async(title_template, section_templates, data)
+        elif self._should_offload(record, data):
+            content = await asyncio.to_thread(
+                self._render_sync, title_template, section_templates, data
+            )
+        else:
+            content = self._render_sync(title_template, section_templates, data)
+
+        duration = time.perf_counter() - start_time
+        self._render_count += 1
+        self._render_seconds += duration
+        self.logger.debug(f"Rendered template {template_id} in {duration * 1000:.1f}ms")
+        return content
+
+    async def render_template_stream(self, template_id: str,
+                                     data: Dict[str, Any]) -> AsyncIterator[str]:
+        """流式渲染模板，逐章节产出 Markdown 分块
+
+        章节通过 generate()/generate_async() 逐步渲染，输出内容与 render_template 相同；
+        章节内容未输出前渲染失败时，整个章节替换为错误信息。
+        """
+        record = self._get_record(template_id)
+        start_time = time.perf_counter()
+
+        title_template, section_templates = self._compile(record)
+        if self.enable_async:
+            title = await title_template.render_async(**data)
+        else:
+            title = title_template.render(**data)
+        yield f"# {title}\n\n"
+
+        for section_name, template in section_templates:
+            if isinstance(template, Exception):
+                yield self._format_section_error(section_name, template)
+                continue
+
+            buffer: List[str] = []
+            buffered = 0
+            flushed = False
+            try:
+                async for part in self._generate_section(template, data):
+                    buffer.append(part)
+                    buffered += len(part)
+                    if buffered >= _STREAM_CHUNK_SIZE:
+                        yield "".join(buffer)
+                        buffer, buffered, flushed = [], 0, True
+                        # 让出事件循环，避免大章节阻塞其他请求
+                        await asyncio.sleep(0)
+            except Exception as e:
+                if flushed:
+                    yield "".join(buffer)
+                    yield f"\n\n渲染失败: {str(e)}\n\n"
+                    self.logger.warning(f"Failed to render section {section_name}: {e}")
+                else:
+                    yield self._format_section_error(section_name, e)
+                continue
+
+            buffer.append("\n\n")
+            yield "".join(buffer)
+
+        duration = time.perf_counter() - start_time
+        self._render_count += 1
+        self._render_seconds += duration
+        self.logger.debug(f"Stream-rendered template {template_id} in {duration * 1000:.1f}ms")
+
+    async def get_template_variables(self, template_id: str) -> List[Dict[str, Any]]:
+        """获取模板中使用的变量"""
+        record = self._get_record(template_id)
+        usages: Dict[str, List[str]] = {}
+
+        sources = [("title", record.data.get('title_template', DEFAULT_TITLE_TEMPLATE))]
+        for section in record.data.get('sections', []):
+            sources.append((section.get('section_id', ''), section.get('content_template', '')))
+
+        for location, source in sources:
+            if not source:
+                continue
+            try:
+                names = meta.find_undeclared_variables(self.compiler.env.parse(source))
+            except Exception:
+                continue
+            for name in names:
+                usages.setdefault(name, []).append(location)
+
+        return [{"name": name, "used_in": locations} for name, locations in sorted(usages.items())]
+
+    def get_referenced_variables(self, template_id: str) -> FrozenSet[str]:
+        """模板（标题和所有章节）引用的变量名，按模板缓存"""
+        record = self._get_record(template_id)
+        sources = [record.data.get('title_template', DEFAULT_TITLE_TEMPLATE)]
+        sources.extend(section.get('content_template', '')
+                       for section in record.data.get('sections', []))
+        return self.compiler.get_variables(template_id, sources)
+
+    async def validate_template(self, template_data: Dict[str, Any]) -> bool:
+        """验证模板格式（结构完整且所有模板片段可以编译，template_info 可省略）"""
+        if not isinstance(template_data, dict):
+            return False
+        if not isinstance(template_data.get('template_info', {}), dict):
+            return False
+
+        sections = template_data.get('sections', [])
+        if not isinstance(sections, list):
+            return False
+
+        sources = [template_data.get('title_template', DEFAULT_TITLE_TEMPLATE)]
+        sources.extend(section.get('content_template', '') for section in sections
+                       if isinstance(section, dict))
+        try:
+            for source in sources:
+                self.compiler.env.parse(source)
+        except Exception:
+            return False
+        return True
+
+    async def create_default_templates(self) -> None:
+        """创建默认模板（模板目录为空时）"""
+        if self.registry.list():
+            return
+
+        await self.save_template("simple_weekly", {
+            "template_info": {
+                "name": "简化周报模板",
+                "type": "weekly",
+                "description": "适合小团队的简化周报格式",
+                "version": "1.0"
+            },
+            "title_template": "{{project_name}} 简化周报 ({{start_date}} - {{end_date}})",
+            "sections": [
+                {
+                    "section_id": "summary",
+                    "section_name": "本周总结",
+                    "order": 1,
+                    "content_template": "## 本周总结\n\n项目: {{project_name}}\n完成率: {{completion_rate}}%"
+                }
+            ]
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取渲染统计信息"""
+        return {
+            "templates": len(self.registry.list()),
+            "renders": self._render_count,
+            "render_seconds": round(self._render_seconds, 3),
+            "watch_mode": self.watcher.mode,
+            "parse_cache_hits": self.registry.parse_cache.hits,
+            "parse_cache_misses": self.registry.parse_cache.misses,
+            **self.compiler.get_stats()
+        }
+
+    def _get_record(self, template_id: str) -> TemplateRecord:
+        """获取模板记录，不存在时抛出异常"""
+        record = self.registry.get(template_id)
+        if not record:
+            raise TemplateError(f"Template not found: {template_id}", template_id=template_id)
+        return record
+
+    def _compile(self, record: TemplateRecord):
+        """编译标题和各章节模板（使用编译缓存）"""
+        template_id = record.template_id
+        title_template = self.compiler.get(
+            template_id, record.data.get('title_template', DEFAULT_TITLE_TEMPLATE)
+        )
+
+        section_templates = []
+        sections = record.data.get('sections', [])
+        for section in sorted(sections, key=lambda x: x.get('order', 999)):
+            section_name = section.get('section_name', '')
+            content_template = section.get('content_template', '')
+            if not content_template:
+                continue
+            try:
+                section_templates.append((section_name, self.compiler.get(template_id, content_template)))
+            except Exception as e:
+                # 编译失败的章节在渲染结果中标出，不影响其他章节
+                section_templates.append((section_name, e))
+
+        return title_template, section_templates
+
+    def _should_offload(self, record: TemplateRecord, data: Dict[str, Any]) -> bool:
+        """判断是否需要在线程池中渲染"""
+        if record.size >= _OFFLOAD_SOURCE_BYTES:
+            return True
+        return any(isinstance(value, (list, tuple)) and len(value) >= self.offload_threshold
+                   for value in data.values())
+
+    def _render_sync(self, title_template, section_templates, data: Dict[str, Any]) -> str:
+        """同步渲染"""
+        parts = [f"# {title_template.render(**data)}\n\n"]
+        for section_name, template in section_templates:
+            parts.append(self._render_section(section_name, template, data))
+        return "".join(parts)
+
+    async def _render_async(self, title_template, section_templates, data: Dict[str, Any]) -> str:
+        """异步渲染（enable_async 模式）"""
+        parts = [f"# {await title_template.render_async(**data)}\n\n"]
+        for section_name, template in section_templates:
+            if isinstance(template, Exception):
+                parts.append(self._format_section_error(section_name, template))
+                continue
+            try:
+                parts.append(f"{await template.render_async(**data)}\n\n")
+            except Exception as e:
+                parts.append(self._format_section_error(section_name, e))
+        return "".join(parts)
+
+    def _render_section(self, section_name: str, template, data: Dict[str, Any]) -> str:
+        """渲染单个章节，失败时输出错误信息"""
+        if isinstance(template, Exception):
+            return self._format_section_error(section_name, template)
+        try:
+            return f"{template.render(**data)}\n\n"
+        except Exception as e:
+            return self._format_section_error(section_name, e)
+
+    async def _generate_section(self, template, data: Dict[str, Any]) -> AsyncIterator[str]:
+        """逐段产出章节内容"""
+        if self.enable_async:
+            async for part in template.generate_async(**data):
+                yield part
+        else:
+            for part in template.generate(**data):
+                yield part
+
+    def _format_section_error(self, section_name: str, error: Exception) -> str:
+        """章节渲染失败时的输出"""
+        self.logger.warning(f"Failed to render section {section_name}: {error}")
+        return f"## {section_name}\n\n渲染失败: {str(error)}\n\n"
@@ -0,0 +1,42 @@
+"""
+模板自定义过滤器
+"""
+from datetime import datetime, timedelta
+from typing import Any
+
+
+def add_days_filter(date_str: Any, days: int) -> Any:
+    """添加天数到日期字符串"""
+    try:
+        if isinstance(date_str, str):
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        else:
+            date_obj = date_str
+        new_date = date_obj + timedelta(days=days)
+        return new_date.strftime("%Y-%m-%d")
+    except Exception:
+        return date_str
+
+
+def zfill_filter(value: Any, width: int) -> str:
+    """用零填充数字到指定宽度"""
+    return str(value).zfill(width)
+
+
+def strftime_filter(date_str: Any, fmt: str = "%Y-%m-%d") -> Any:
+    """按指定格式输出日期（支持 YYYY-MM-DD 字符串和 datetime）"""
+    try:
+        if isinstance(date_str, str):
+            date_obj = datetime.strptime(date_str[:10], "%Y-%m-%d")
+        else:
+            date_obj = date_str
+        return date_obj.strftime(fmt)
+    except Exception:
+        return date_str
+
+
+TEMPLATE_FILTERS = {
+    "add_days": add_days_filter,
+    "zfill": zfill_filter,
+    "strftime": strftime_filter,
+}
@@ -0,0 +1,166 @@
+"""
+模板文件加载
+
+优先使用 libyaml 提供的 C 解析器；解析结果按文件内容哈希缓存为二进制文件
+（默认位于用户缓存目录，不写入模板目录），冷启动和索引失效时无需重新解析 YAML。
+"""
+import hashlib
+import io
+import os
+import pickle
+import stat
+import tempfile
+from typing import Any, Iterable, Optional, Tuple
+
+import yaml
+
+from mcp_core.shared.logger import get_logger
+
+# libyaml 不可用时退回纯 Python 解析器
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_CACHE_SUFFIX = ".pickle"
+
+# 模板数据中允许出现的非内置类型（YAML 日期时间）
+_ALLOWED_CLASSES = {
+    ("datetime", "date"),
+    ("datetime", "datetime"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+}
+
+
+class _TemplateUnpickler(pickle.Unpickler):
+    """只允许还原 YAML 可能产生的类型，缓存文件被篡改时不会执行任意代码"""
+
+    def find_class(self, module: str, name: str):
+        if (module, name) in _ALLOWED_CLASSES:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Disallowed type in template cache: {module}.{name}")
+
+
+def parse_yaml(content: bytes) -> Any:
+    """解析 YAML 内容"""
+    return yaml.load(content, Loader=SafeLoader)
+
+
+def write_file_atomic(path: str, content: str) -> None:
+    """写入文件：先写同目录下的临时文件，再原子替换，读取方不会看到半个文件"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件只有属主可读，保持与原文件（或普通新文件）一致的权限
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def default_cache_root() -> str:
+    """默认的解析缓存根目录（$XDG_CACHE_HOME 或 ~/.cache 下的 mcp-core/templates）"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mcp-core", "templates")
+
+
+def parse_cache_dir(templates_dir: str, cache_root: Optional[str] = None) -> str:
+    """模板目录对应的解析缓存目录
+
+    每个模板目录使用独立的子目录，清理缓存时不会删除其他模板目录的缓存。
+    """
+    key = hashlib.sha1(os.path.abspath(templates_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_root or default_cache_root(), key)
+
+
+class TemplateParseCache:
+    """模板解析结果缓存（按内容哈希）"""
+
+    def __init__(self, cache_dir: Optional[str]):
+        self.logger = get_logger("mcp.templates")
+        # None 表示不使用磁盘缓存；目录不可写时同样不使用
+        self.cache_dir = cache_dir if cache_dir and self._prepare(cache_dir) else None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: str) -> Tuple[Any, str]:
+        """加载模板文件，返回 (解析结果, 内容哈希)"""
+        with open(path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()
+
+        if self.cache_dir:
+            data = self._read(digest)
+            if data is not None:
+                self.hits += 1
+                return data, digest
+
+        self.misses += 1
+        data = parse_yaml(content)
+        if self.cache_dir and isinstance(data, dict):
+            self._write(digest, data)
+        return data, digest
+
+    def prune(self, digests: Iterable[str]) -> int:
+        """删除不再对应任何模板的缓存文件"""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+
+        keep = {f"{digest}{_CACHE_SUFFIX}" for digest in digests}
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_CACHE_SUFFIX) and name not in keep:
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _prepare(self, cache_dir: str) -> bool:
+        """创建缓存目录并检查是否可写"""
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            self.logger.warning(f"Template cache disabled, cannot create {cache_dir}: {e}")
+            return False
+        if not os.access(cache_dir, os.W_OK | os.X_OK):
+            self.logger.warning(f"Template cache disabled, {cache_dir} is not writable")
+            return False
+        return True
+
+    def _cache_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}{_CACHE_SUFFIX}")
+
+    def _read(self, digest: str) -> Optional[Any]:
+        """读取缓存，缓存不存在或损坏时返回 None"""
+        try:
+            with open(self._cache_path(digest), "rb") as f:
+                return _TemplateUnpickler(io.BytesIO(f.read())).load()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable template cache {digest}: {e}")
+            return None
+
+    def _write(self, digest: str, data: Any) -> None:
+        """写入缓存（临时文件 + 原子替换）；失败只记录日志"""
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._cache_path(digest))
+        except Exception as e:
+            self.logger.warning(f"Failed to write template cache {digest}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
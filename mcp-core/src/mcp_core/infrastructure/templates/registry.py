@@ -0,0 +1,214 @@
+"""
+报告模板注册表
+
+为模板目录建立内存索引（模板 ID → 路径、元数据、解析后的内容），
+重新扫描时只解析 mtime 或大小发生变化的文件，查找为 O(1)。
+文件解析见 loader 模块（C 解析器 + 按内容哈希的解析结果缓存）。
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from mcp_core.shared.logger import get_logger
+
+from .loader import TemplateParseCache, parse_cache_dir
+
+DEFAULT_TEMPLATES_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "../../../../templates/reports")
+)
+TEMPLATE_EXTENSIONS = (".yaml", ".yml")
+
+
+@dataclass
+class TemplateRecord:
+    """已索引的模板"""
+
+    template_id: str
+    path: str
+    mtime_ns: int
+    size: int
+    data: Optional[Dict[str, Any]]
+    # 文件内容哈希
+    digest: str = ""
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        """模板元数据（template_info）"""
+        if not self.data:
+            return {}
+        return self.data.get("template_info") or {}
+
+    def is_listed(self) -> bool:
+        """是否为可列出的报告模板（包含 template_info）"""
+        return bool(self.data) and "template_info" in self.data
+
+    def to_summary(self) -> Dict[str, Any]:
+        """模板摘要信息"""
+        info = self.info
+        return {
+            "id": self.template_id,
+            "name": info.get("name", os.path.basename(self.path)),
+            "type": info.get("type", "unknown"),
+            "description": info.get("description", ""),
+            "version": info.get("version", "1.0"),
+            # 文件内容哈希，保存时用于检测并发修改
+            "revision": self.digest
+        }
+
+
+class TemplateRegistry:
+    """模板索引"""
+
+    def __init__(self, templates_dir: Optional[str] = None, scan_interval: float = 5.0,
+                 parse_cache: bool = True, parse_cache_root: Optional[str] = None):
+        self.templates_dir = templates_dir or DEFAULT_TEMPLATES_DIR
+        # 两次目录扫描的最小间隔（秒），期间的查找直接使用索引
+        self.scan_interval = scan_interval
+        # 由文件监听负责更新索引时关闭按请求扫描
+        self.auto_refresh = True
+        self.logger = get_logger("mcp.templates")
+        self._records: Dict[str, TemplateRecord] = {}
+        self._last_scan: Optional[float] = None
+        self._lock = threading.RLock()
+        # 解析缓存不写入模板目录（可能只读或受版本控制），默认使用用户缓存目录
+        self.parse_cache = TemplateParseCache(
+            parse_cache_dir(self.templates_dir, parse_cache_root) if parse_cache else None
+        )
+
+    def get(self, template_id: str) -> Optional[TemplateRecord]:
+        """按 ID 获取模板"""
+        self._refresh_if_due()
+        record = self._records.get(template_id)
+        if record is None or record.data is None:
+            return None
+        return record
+
+    def list(self) -> List[TemplateRecord]:
+        """列出所有报告模板"""
+        self._refresh_if_due()
+        return [record for record in self._records.values() if record.is_listed()]
+
+    def refresh(self) -> Set[str]:
+        """扫描模板目录，只重新解析发生变化的文件，返回变化的模板 ID"""
+        with self._lock:
+            seen: Dict[str, TemplateRecord] = {}
+            changed: Set[str] = set()
+
+            for path in self._iter_template_files(self.templates_dir):
+                template_id = os.path.splitext(os.path.basename(path))[0]
+                if template_id in seen:
+                    # 同名模板以扫描顺序中的第一个为准
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                record = self._records.get(template_id)
+                if (record is None or record.path != path
+                        or record.mtime_ns != stat.st_mtime_ns or record.size != stat.st_size):
+                    record = self._load(template_id, path, stat)
+                    changed.add(template_id)
+                seen[template_id] = record
+
+            changed.update(set(self._records) - set(seen))
+            self._records = seen
+            self._last_scan = time.monotonic()
+
+            if changed:
+                self.parse_cache.prune(record.digest for record in seen.values())
+            return changed
+
+    def refresh_subtree(self, directory: str) -> Set[str]:
+        """重新扫描单个子目录（目录新增、删除或重命名时），返回变化的模板 ID"""
+        prefix = os.path.join(os.path.normpath(directory), "")
+        with self._lock:
+            seen: Set[str] = set()
+            changed: Set[str] = set()
+
+            for path in self._iter_template_files(directory):
+                template_id = os.path.splitext(os.path.basename(path))[0]
+                if template_id in seen:
+                    continue
+                record = self._records.get(template_id)
+                if (record is not None and not record.path.startswith(prefix)
+                        and os.path.exists(record.path)):
+                    # 同名模板已在子目录之外索引，保留原记录
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                seen.add(template_id)
+                if (record is None or record.path != path
+                        or record.mtime_ns != stat.st_mtime_ns or record.size != stat.st_size):
+                    self._records[template_id] = self._load(template_id, path, stat)
+                    changed.add(template_id)
+
+            # 子目录下已不存在的模板（目录被删除或移走）
+            for template_id, record in list(self._records.items()):
+                if record.path.startswith(prefix) and template_id not in seen:
+                    del self._records[template_id]
+                    changed.add(template_id)
+            return changed
+
+    def index_file(self, path: str) -> Optional[TemplateRecord]:
+        """索引单个模板文件（用于保存后或收到文件变更通知时立即生效）"""
+        template_id = os.path.splitext(os.path.basename(path))[0]
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # 文件已删除：只移除指向该路径的记录
+                record = self._records.get(template_id)
+                if record is not None and record.path == path:
+                    del self._records[template_id]
+                return None
+
+            record = self._load(template_id, path, stat)
+            self._records[template_id] = record
+            return record
+
+    def _refresh_if_due(self) -> None:
+        """超过扫描间隔时重新扫描"""
+        if self._last_scan is None:
+            self.refresh()
+        elif self.auto_refresh and time.monotonic() - self._last_scan >= self.scan_interval:
+            self.refresh()
+
+    def _load(self, template_id: str, path: str, stat: os.stat_result) -> TemplateRecord:
+        """解析模板文件"""
+        data = None
+        digest = ""
+        try:
+            data, digest = self.parse_cache.load(path)
+        except Exception as e:
+            self.logger.warning(f"Failed to load template {path}: {e}")
+
+        return TemplateRecord(
+            template_id=template_id,
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            data=data if isinstance(data, dict) else None,
+            digest=digest
+        )
+
+    @staticmethod
+    def _iter_template_files(directory: str):
+        """按确定顺序遍历模板文件"""
+        if not os.path.isdir(directory):
+            return
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name.startswith("."):
+                    # 跳过隐藏目录
+                    continue
+                yield from TemplateRegistry._iter_template_files(entry.path)
+            elif entry.name.endswith(TEMPLATE_EXTENSIONS):
+                yield entry.path
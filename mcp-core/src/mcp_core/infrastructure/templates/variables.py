@@ -0,0 +1,331 @@
+"""
+报告模板变量提供者
+
+每个模板变量由一个提供者函数计算，渲染前只计算模板实际引用的变量，
+简单模板不会为逐人统计、逾期列表等开销较大的变量付出代价。
+多个变量共用的中间结果（如按状态统计的进度）在上下文中只计算一次。
+"""
+from datetime import datetime, timedelta
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from mcp_core.domain.models import Project, WorkPackage, get_status_classifier
+from mcp_core.domain.services.schedule_index import ScheduleIndex
+
+
+class VariableContext:
+    """计算模板变量所需的数据，以及共享的中间结果"""
+
+    def __init__(self, project: Project, work_packages: Optional[List[WorkPackage]] = None,
+                 now: Optional[datetime] = None, period_days: int = 7,
+                 schedule: Optional[ScheduleIndex] = None):
+        self.project = project
+        self.work_packages = work_packages or []
+        self.now = now or datetime.now()
+        self.period_days = period_days
+        # 可传入跨请求复用的日程索引（必须基于同一工作包列表）
+        self._schedule = schedule
+
+    @cached_property
+    def period_start(self) -> datetime:
+        """统计周期开始时间"""
+        return self.now - timedelta(days=self.period_days)
+
+    @cached_property
+    def progress_summary(self) -> Dict[str, Any]:
+        """按状态映射的进度统计（一次遍历）"""
+        completed = in_progress = scheduled = new = 0
+        total_progress = 0.0
+        status_progress = get_status_classifier().progress
+
+        for wp in self.work_packages:
+            # 获取状态对应的进度值，未知状态使用实际进度（没有则为 0）
+            progress = status_progress(wp.status)
+            if progress is None:
+                progress = wp.progress if wp.progress is not None and wp.progress >= 0 else 0
+
+            total_progress += progress
+
+            # 统计各状态数量
+            if progress >= 100:
+                completed += 1
+            elif progress >= 30:  # 进行中的阈值
+                in_progress += 1
+            elif progress >= 5:   # 已计划的阈值
+                scheduled += 1
+            else:
+                new += 1
+
+        total = len(self.work_packages)
+        return {
+            "total": total,
+            "completed": completed,
+            "in_progress": in_progress,
+            "scheduled": scheduled,
+            "new": new,
+            # 使用加权平均计算整体完成率
+            "completion_rate": round(total_progress / total, 1) if total > 0 else 0
+        }
+
+    @cached_property
+    def schedule(self) -> ScheduleIndex:
+        """按开始/截止日期索引的工作包（未传入时为本次渲染构建）"""
+        return self._schedule or ScheduleIndex(self.work_packages)
+
+    @property
+    def completion_rate(self) -> float:
+        """整体完成率"""
+        return self.progress_summary["completion_rate"]
+
+
+VariableProvider = Callable[[VariableContext], Any]
+
+
+class TemplateVariableRegistry:
+    """模板变量提供者注册表"""
+
+    def __init__(self):
+        self._providers: Dict[str, VariableProvider] = {}
+        self._needs_work_packages: Dict[str, bool] = {}
+
+    def register(self, name: str, provider: VariableProvider,
+                 needs_work_packages: bool = True) -> None:
+        """注册变量提供者"""
+        self._providers[name] = provider
+        self._needs_work_packages[name] = needs_work_packages
+
+    def provider(self, name: str, needs_work_packages: bool = True):
+        """注册变量提供者的装饰器"""
+        def decorator(func: VariableProvider) -> VariableProvider:
+            self.register(name, func, needs_work_packages)
+            return func
+        return decorator
+
+    def names(self) -> List[str]:
+        """所有可用的变量名"""
+        return sorted(self._providers)
+
+    def needs_work_packages(self, names: Iterable[str]) -> bool:
+        """计算这些变量是否需要工作包数据"""
+        return any(self._needs_work_packages.get(name, False) for name in names)
+
+    def resolve(self, names: Iterable[str], context: VariableContext) -> Dict[str, Any]:
+        """只计算给定的变量（没有提供者的变量忽略）"""
+        variables = {}
+        for name in names:
+            provider = self._providers.get(name)
+            if provider is not None:
+                variables[name] = provider(context)
+        return variables
+
+
+template_variables = TemplateVariableRegistry()
+_provider = template_variables.provider
+
+
+# 项目信息
+@_provider("project_name", needs_work_packages=False)
+def _project_name(ctx: VariableContext) -> str:
+    return ctx.project.name
+
+
+@_provider("project_id", needs_work_packages=False)
+def _project_id(ctx: VariableContext) -> str:
+    return ctx.project.id
+
+
+@_provider("project_description", needs_work_packages=False)
+def _project_description(ctx: VariableContext) -> str:
+    return ctx.project.description or ""
+
+
+# 日期
+@_provider("start_date", needs_work_packages=False)
+def _start_date(ctx: VariableContext) -> str:
+    return ctx.period_start.strftime('%Y-%m-%d')
+
+
+@_provider("end_date", needs_work_packages=False)
+def _end_date(ctx: VariableContext) -> str:
+    return ctx.now.strftime('%Y-%m-%d')
+
+
+@_provider("report_date", needs_work_packages=False)
+def _report_date(ctx: VariableContext) -> str:
+    return ctx.now.strftime('%Y-%m-%d')
+
+
+# 进度统计
+@_provider("completion_rate")
+def _completion_rate(ctx: VariableContext) -> float:
+    return ctx.completion_rate
+
+
+@_provider("completed_work_packages")
+def _completed(ctx: VariableContext) -> int:
+    return ctx.progress_summary["completed"]
+
+
+@_provider("in_progress_work_packages")
+def _in_progress(ctx: VariableContext) -> int:
+    return ctx.progress_summary["in_progress"]
+
+
+@_provider("new_work_packages")
+def _new(ctx: VariableContext) -> int:
+    return ctx.progress_summary["new"]
+
+
+@_provider("scheduled_work_packages")
+def _scheduled(ctx: VariableContext) -> int:
+    return ctx.progress_summary["scheduled"]
+
+
+@_provider("total_work_packages")
+def _total(ctx: VariableContext) -> int:
+    return len(ctx.work_packages)
+
+
+@_provider("remaining_work_packages")
+def _remaining(ctx: VariableContext) -> int:
+    return len(ctx.work_packages) - ctx.progress_summary["completed"]
+
+
+@_provider("in_progress_rate")
+def _in_progress_rate(ctx: VariableContext) -> float:
+    total = len(ctx.work_packages)
+    return round(ctx.progress_summary["in_progress"] / total * 100, 1) if total else 0
+
+
+@_provider("status_distribution")
+def _status_distribution(ctx: VariableContext) -> Dict[str, int]:
+    distribution: Dict[str, int] = {}
+    for wp in ctx.work_packages:
+        status = wp.status or "未分配状态"
+        distribution[status] = distribution.get(status, 0) + 1
+    return distribution
+
+
+# 本周期内的变化
+@_provider("weekly_new_work_packages")
+def _weekly_new(ctx: VariableContext) -> int:
+    return sum(1 for wp in ctx.work_packages
+               if wp.created_at and wp.created_at.replace(tzinfo=None) >= ctx.period_start)
+
+
+@_provider("weekly_completed_work_packages")
+def _weekly_completed(ctx: VariableContext) -> int:
+    return sum(1 for wp in ctx.work_packages
+               if wp.is_completed() and wp.updated_at
+               and wp.updated_at.replace(tzinfo=None) >= ctx.period_start)
+
+
+# 明细（只有模板引用时才计算）
+@_provider("assignee_breakdown")
+def _assignee_breakdown(ctx: VariableContext) -> List[Dict[str, Any]]:
+    breakdown: Dict[str, Dict[str, Any]] = {}
+    for wp in ctx.work_packages:
+        name = wp.assigned_to or "未分配"
+        item = breakdown.setdefault(name, {"assignee": name, "total": 0, "completed": 0, "overdue": 0})
+        item["total"] += 1
+        if wp.is_completed():
+            item["completed"] += 1
+        elif wp.is_overdue():
+            item["overdue"] += 1
+    return sorted(breakdown.values(), key=lambda x: x["total"], reverse=True)
+
+
+@_provider("overdue_work_packages")
+def _overdue_work_packages(ctx: VariableContext) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": wp.id,
+            "subject": wp.subject,
+            "assigned_to": wp.assigned_to or "未分配",
+            "due_date": wp.due_date.strftime('%Y-%m-%d'),
+            "days_overdue": (ctx.now - wp.due_date.replace(tzinfo=None)).days
+        }
+        for wp in ctx.schedule.overdue(ctx.now)
+    ]
+
+
+def _schedule_item(wp: WorkPackage) -> Dict[str, Any]:
+    return {
+        "id": wp.id,
+        "subject": wp.subject,
+        "description": wp.description,
+        "status": wp.status,
+        "assigned_to": wp.assigned_to or "未分配",
+        "progress": wp.progress,
+        "start_date": wp.start_date.strftime('%Y-%m-%d') if wp.start_date else None,
+        "due_date": wp.due_date.strftime('%Y-%m-%d') if wp.due_date else None
+    }
+
+
+@_provider("work_packages_today")
+def _work_packages_today(ctx: VariableContext) -> List[Dict[str, Any]]:
+    # 计划区间（开始日期 ~ 截止日期）包含今天的未完成工作包
+    return [_schedule_item(wp) for wp in ctx.schedule.scheduled_on(ctx.now)]
+
+
+@_provider("started_today_work_packages")
+def _started_today_work_packages(ctx: VariableContext) -> List[Dict[str, Any]]:
+    today = ctx.now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return [_schedule_item(wp) for wp in
+            ctx.schedule.starting_between(today, today + timedelta(days=1), include_completed=True)]
+
+
+@_provider("due_in_period_work_packages")
+def _due_in_period_work_packages(ctx: VariableContext) -> List[Dict[str, Any]]:
+    # 截止日期在统计周期内的工作包（含已完成）
+    return [
+        dict(_schedule_item(wp), completed=bool(wp.is_completed()))
+        for wp in ctx.schedule.due_between(ctx.period_start, ctx.now, include_completed=True)
+    ]
+
+
+@_provider("upcoming_due_work_packages")
+def _upcoming_due_work_packages(ctx: VariableContext) -> List[Dict[str, Any]]:
+    # 下一个统计周期内到期的未完成工作包
+    return [_schedule_item(wp) for wp in ctx.schedule.due_within(ctx.period_days, ctx.now)]
+
+
+# 预测（需要 NumPy，未安装时为 None）
+@_provider("completion_forecast")
+def _completion_forecast(ctx: VariableContext) -> Optional[Dict[str, Any]]:
+    from mcp_core.infrastructure.analytics import NUMPY_AVAILABLE, WorkPackageStore
+    from mcp_core.infrastructure.analytics.forecast import forecast
+
+    if not NUMPY_AVAILABLE:
+        return None
+    store = WorkPackageStore.from_work_packages(ctx.work_packages, ctx.project.id)
+    return forecast(store, now=ctx.now).to_dict()
+
+
+# 评估类指标
+@_provider("project_health_status")
+def _project_health_status(ctx: VariableContext) -> str:
+    rate = ctx.completion_rate
+    return "良好" if rate >= 70 else "要注意" if rate >= 30 else "要対策"
+
+
+@_provider("risk_level")
+def _risk_level(ctx: VariableContext) -> str:
+    rate = ctx.completion_rate
+    return "低" if rate >= 70 else "中" if rate >= 30 else "高"
+
+
+# 示例数据
+@_provider("team_member_count", needs_work_packages=False)
+def _team_member_count(ctx: VariableContext) -> int:
+    return 5
+
+
+@_provider("quality_score", needs_work_packages=False)
+def _quality_score(ctx: VariableContext) -> int:
+    return 95  # 品质分数
+
+
+@_provider("budget_status", needs_work_packages=False)
+def _budget_status(ctx: VariableContext) -> str:
+    return "予算内"  # 预算状态
@@ -0,0 +1,160 @@
+"""
+模板目录监听
+
+安装了 watchdog（pip install mcp-core[watch]）时使用文件系统通知
+（Linux 下为 inotify），只重新索引发生变化的文件；否则退化为后台线程
+按固定间隔扫描目录。两种方式都在请求路径之外更新模板索引和编译缓存。
+"""
+import os
+import threading
+from typing import Callable, Optional, Set
+
+from mcp_core.shared.logger import get_logger
+
+from .registry import TemplateRegistry, TEMPLATE_EXTENSIONS
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+    WATCHDOG_AVAILABLE = False
+
+
+# 需要重新扫描子目录的目录事件（整个目录移入、移出或删除时不会为其中的文件单独通知）
+_DIRECTORY_EVENTS = ("created", "deleted", "moved")
+
+
+class _TemplateEventHandler(FileSystemEventHandler):
+    """将文件系统事件转发给 TemplateWatcher"""
+
+    def __init__(self, watcher: "TemplateWatcher"):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory and event.event_type not in _DIRECTORY_EVENTS:
+            # 目录内文件变化会单独产生文件事件
+            return
+        handle = self._watcher.handle_directory if event.is_directory else self._watcher.handle_path
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path:
+                handle(os.fsdecode(path))
+
+
+class TemplateWatcher:
+    """监听模板目录，文件变化时增量更新模板索引"""
+
+    def __init__(self, registry: TemplateRegistry,
+                 on_change: Optional[Callable[[str], None]] = None,
+                 poll_interval: float = 2.0):
+        self.registry = registry
+        # 模板变化时的回调（参数为模板 ID），用于丢弃编译缓存
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.logger = get_logger("mcp.templates")
+
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        """是否正在监听"""
+        return self._observer is not None or self._thread is not None
+
+    @property
+    def mode(self) -> str:
+        """监听方式：notify / polling / stopped"""
+        if self._observer is not None:
+            return "notify"
+        if self._thread is not None:
+            return "polling"
+        return "stopped"
+
+    def start(self) -> None:
+        """开始监听"""
+        if self.is_running:
+            return
+
+        # 先建立完整索引，之后只处理变化
+        self.registry.refresh()
+        os.makedirs(self.registry.templates_dir, exist_ok=True)
+
+        if WATCHDOG_AVAILABLE:
+            try:
+                observer = Observer()
+                observer.schedule(_TemplateEventHandler(self), self.registry.templates_dir,
+                                  recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except Exception as e:
+                self.logger.warning(f"File system notifications unavailable, falling back to polling: {e}")
+
+        if self._observer is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._poll, name="template-watcher", daemon=True
+            )
+            self._thread.start()
+
+        self.registry.auto_refresh = False
+        self.logger.info(f"Watching templates in {self.registry.templates_dir} ({self.mode})")
+
+    def stop(self) -> None:
+        """停止监听，恢复按请求扫描"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.registry.auto_refresh = True
+
+    def handle_path(self, path: str) -> None:
+        """处理单个文件的变化（新增、修改、删除或重命名）"""
+        if not path.endswith(TEMPLATE_EXTENSIONS):
+            return
+        template_id = os.path.splitext(os.path.basename(path))[0]
+        try:
+            self.registry.index_file(path)
+        except Exception as e:
+            self.logger.warning(f"Failed to reindex template {path}: {e}")
+            return
+        self._notify({template_id})
+
+    def handle_directory(self, path: str) -> None:
+        """处理目录的新增、删除或重命名：重新扫描该子目录"""
+        if os.path.basename(os.path.normpath(path)).startswith("."):
+            # 隐藏目录不参与索引
+            return
+        try:
+            changed = self.registry.refresh_subtree(path)
+        except Exception as e:
+            self.logger.warning(f"Failed to rescan template directory {path}: {e}")
+            return
+        if changed:
+            self._notify(changed)
+
+    def _poll(self) -> None:
+        """轮询模式：定期扫描目录（只重新解析变化的文件）"""
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                changed = self.registry.refresh()
+            except Exception as e:
+                self.logger.warning(f"Failed to rescan templates: {e}")
+                continue
+            if changed:
+                self._notify(changed)
+
+    def _notify(self, template_ids: Set[str]) -> None:
+        """通知模板变化"""
+        for template_id in template_ids:
+            self.logger.debug(f"Template changed: {template_id}")
+            if self.on_change:
+                self.on_change(template_id)
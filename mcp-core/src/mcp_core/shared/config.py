@@ -6,6 +6,8 @@ from typing import Optional, List, Any, Dict
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings
 
+from .exceptions import ConfigurationError
+
 
 class Config(BaseSettings):
     """统一配置类"""
@@ -13,6 +15,7 @@ class Config(BaseSettings):
     # OpenProject 配置
     openproject_url: str = Field(..., env="OPENPROJECT_URL", description="OpenProject 实例 URL")
     openproject_api_key: str = Field(..., env="OPENPROJECT_API_KEY", description="OpenProject API 密钥")
+    openproject_page_size: int = Field(default=1000, env="OPENPROJECT_PAGE_SIZE", description="分页获取集合时每页的元素数")
     
     # MCP 协议配置
     mcp_version: str = Field(default="2024-11-05", env="MCP_VERSION", description="MCP 协议版本")
@@ -30,10 +33,36 @@ class Config(BaseSettings):
     # 缓存配置
     cache_ttl: int = Field(default=300, env="CACHE_TTL", description="缓存过期时间（秒）")
     cache_max_size: int = Field(default=1000, env="CACHE_MAX_SIZE", description="缓存最大条目数")
+    cache_max_bytes: int = Field(default=256 * 1024 * 1024, env="CACHE_MAX_BYTES", description="缓存内存预算（字节，0 表示不限制）")
+    cache_stale_ttl: int = Field(default=600, env="CACHE_STALE_TTL", description="过期后仍可返回旧值的最长时间（秒）")
+    cache_refresh_ahead_ratio: float = Field(default=0.8, env="CACHE_REFRESH_AHEAD_RATIO", description="热点键提前刷新的存活时间比例")
+    cache_hot_key_threshold: int = Field(default=5, env="CACHE_HOT_KEY_THRESHOLD", description="判定为热点键的访问次数")
+    cache_negative_ttl: int = Field(default=30, env="CACHE_NEGATIVE_TTL", description="未找到结果（404）的缓存时间（秒，0 表示不缓存）")
+    cache_warmup_enabled: bool = Field(default=False, env="CACHE_WARMUP_ENABLED", description="启动时是否预热缓存")
+    cache_warmup_projects: int = Field(default=10, env="CACHE_WARMUP_PROJECTS", description="预热工作包的最近更新项目数")
+    cache_warmup_timeout: float = Field(default=30.0, env="CACHE_WARMUP_TIMEOUT", description="预热时间预算（秒）")
+    cache_snapshot_path: Optional[str] = Field(default=None, env="CACHE_SNAPSHOT_PATH", description="缓存快照文件路径（为空则不持久化）")
     
     # 模板配置
     templates_dir: str = Field(default="templates", env="TEMPLATES_DIR", description="模板目录")
     default_template_language: str = Field(default="zh-CN", env="DEFAULT_TEMPLATE_LANGUAGE", description="默认模板语言")
+    template_enable_async: bool = Field(default=False, env="TEMPLATE_ENABLE_ASYNC", description="是否使用 Jinja2 异步渲染")
+    template_offload_threshold: int = Field(default=500, env="TEMPLATE_OFFLOAD_THRESHOLD", description="模板变量列表达到该长度时在线程池中渲染")
+    template_scan_interval: float = Field(default=5.0, env="TEMPLATE_SCAN_INTERVAL", description="模板目录重新扫描的最小间隔（秒）")
+    template_parse_cache_enabled: bool = Field(default=True, env="TEMPLATE_PARSE_CACHE_ENABLED", description="是否缓存模板 YAML 的解析结果")
+    template_parse_cache_dir: str = Field(default="", env="TEMPLATE_PARSE_CACHE_DIR", description="模板解析缓存目录（为空时使用 $XDG_CACHE_HOME 或 ~/.cache）")
+    template_watch_enabled: bool = Field(default=False, env="TEMPLATE_WATCH_ENABLED", description="是否监听模板目录变更（热重载）")
+    template_watch_poll_interval: float = Field(default=2.0, env="TEMPLATE_WATCH_POLL_INTERVAL", description="无法使用文件系统通知时的轮询间隔（秒）")
+    
+    # 分析配置
+    analytics_columnar_enabled: bool = Field(default=False, env="ANALYTICS_COLUMNAR_ENABLED", description="是否使用 NumPy 列式存储计算项目指标")
+    analytics_incremental_enabled: bool = Field(default=False, env="ANALYTICS_INCREMENTAL_ENABLED", description="是否按工作包变更增量维护项目指标")
+    analytics_incremental_max_projects: int = Field(default=100, env="ANALYTICS_INCREMENTAL_MAX_PROJECTS", description="保留增量指标的最多项目数（最久未访问的先淘汰）")
+    metrics_history_enabled: bool = Field(default=False, env="METRICS_HISTORY_ENABLED", description="是否每天记录项目指标历史")
+    metrics_history_dir: str = Field(default="data/metrics_history", env="METRICS_HISTORY_DIR", description="项目指标历史目录")
+    metrics_history_hour: int = Field(default=1, env="METRICS_HISTORY_HOUR", description="每天记录指标历史的时间（小时，0-23）")
+    status_categories: Dict[str, str] = Field(default={}, env="STATUS_CATEGORIES", description="状态名称 → 分类（completed/in_progress/new/scheduled/on_hold/rejected）的补充配置（JSON）")
+    status_sync_enabled: bool = Field(default=False, env="STATUS_SYNC_ENABLED", description="是否按 OpenProject /statuses 的关闭标志校正状态分类")
     
     # 性能配置
     max_concurrent_requests: int = Field(default=10, env="MAX_CONCURRENT_REQUESTS", description="最大并发请求数")
@@ -58,6 +87,12 @@ class Config(BaseSettings):
             raise ValueError('OpenProject API 密钥无效')
         return v.strip()
     
+    @validator('openproject_page_size')
+    def validate_openproject_page_size(cls, v):
+        if v < 1:
+            raise ValueError('分页大小必须大于 0')
+        return v
+    
     @validator('log_level')
     def validate_log_level(cls, v):
         valid_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
@@ -71,12 +106,59 @@ class Config(BaseSettings):
             raise ValueError('缓存过期时间不能为负数')
         return v
     
+    @validator('cache_max_bytes')
+    def validate_cache_max_bytes(cls, v):
+        if v < 0:
+            raise ValueError('缓存内存预算不能为负数')
+        return v
+    
+    @validator('cache_stale_ttl')
+    def validate_cache_stale_ttl(cls, v):
+        if v < 0:
+            raise ValueError('最大陈旧时间不能为负数')
+        return v
+    
+    @validator('cache_negative_ttl')
+    def validate_cache_negative_ttl(cls, v):
+        if v < 0:
+            raise ValueError('未找到结果的缓存时间不能为负数')
+        return v
+    
+    @validator('cache_refresh_ahead_ratio')
+    def validate_cache_refresh_ahead_ratio(cls, v):
+        if not 0 < v <= 1:
+            raise ValueError('提前刷新比例必须在 0-1 之间')
+        return v
+    
     @validator('max_concurrent_requests')
     def validate_max_concurrent_requests(cls, v):
         if v < 1:
             raise ValueError('最大并发请求数必须大于 0')
         return v
     
+    @validator('analytics_incremental_max_projects')
+    def validate_analytics_incremental_max_projects(cls, v):
+        if v < 1:
+            raise ValueError('增量指标项目数上限必须大于 0')
+        return v
+    
+    @validator('metrics_history_hour')
+    def validate_metrics_history_hour(cls, v):
+        if not 0 <= v <= 23:
+            raise ValueError('指标历史记录时间必须在 0-23 之间')
+        return v
+    
+    @validator('status_categories')
+    def validate_status_categories(cls, v):
+        # 延迟导入：状态分类模块依赖本模块
+        from mcp_core.domain.models.status import parse_category
+        for name, category in v.items():
+            try:
+                parse_category(category)
+            except ConfigurationError as e:
+                raise ValueError(f'状态 {name} 的分类无效: {e.message}')
+        return v
+    
     @validator('retry_attempts')
     def validate_retry_attempts(cls, v):
         if v < 0:
@@ -95,7 +177,8 @@ class Config(BaseSettings):
         """获取缓存配置"""
         return {
             'ttl': self.cache_ttl,
-            'max_size': self.cache_max_size
+            'max_size': self.cache_max_size,
+            'max_bytes': self.cache_max_bytes
         }
     
     def get_retry_config(self) -> Dict[str, Any]:
@@ -128,6 +128,16 @@ class TemplateError(MCPError):
         super().__init__(message, code=-32004, data=data)
 
 
+class TemplateConflictError(TemplateError):
+    """模板并发修改冲突（保存时模板已被他人修改）"""
+    
+    def __init__(self, message: str, template_id: Optional[str] = None,
+                 current_revision: Optional[str] = None):
+        self.current_revision = current_revision
+        super().__init__(message, template_id=template_id,
+                         data={"template_id": template_id, "current_revision": current_revision})
+
+
 class CacheError(MCPError):
     """缓存错误"""
     
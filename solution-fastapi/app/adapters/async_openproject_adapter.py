@@ -2,6 +2,7 @@
 异步 OpenProject 适配器 - 使用核心库实现
 """
 import asyncio
+import json
 import requests
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -9,6 +10,7 @@ from datetime import datetime
 from mcp_core.domain.interfaces import IOpenProjectClient
 from mcp_core.domain.models import Project, WorkPackage, User, Report
 from mcp_core.domain.services import ReportGeneratorService
+from mcp_core.infrastructure.analytics import WorkPackageStore
 from mcp_core.shared.exceptions import OpenProjectError, AuthenticationError, NotFoundError
 from mcp_core.shared.config import get_global_config
 
@@ -140,18 +142,19 @@ class AsyncOpenProjectClient(IOpenProjectClient):
         except NotFoundError:
             return None
     
-    async def get_work_packages(self, project_id: Optional[str] = None) -> List[WorkPackage]:
-        """获取工作包列表"""
+    async def get_work_packages(self, project_id: Optional[str] = None,
+                                updated_since: Optional[datetime] = None) -> List[WorkPackage]:
+        """获取工作包列表（指定 updated_since 时只返回之后更新的工作包）"""
         endpoint = "/work_packages"
         params = {}
         
-        if project_id:
-            params['filters'] = f'[{{"project":{{"operator":"=","values":["{project_id}"]}}}}]'
+        filters = self._work_package_filters(project_id, updated_since)
+        if filters:
+            params['filters'] = json.dumps(filters)
         
-        data = await self._make_request(endpoint, params=params)
         work_packages = []
         
-        for item in data.get('_embedded', {}).get('elements', []):
+        for item in await self._get_collection(endpoint, params):
             wp = WorkPackage(
                 id=str(item['id']),
                 subject=item['subject'],
@@ -171,6 +174,29 @@ class AsyncOpenProjectClient(IOpenProjectClient):
         
         return work_packages
     
+    async def get_work_package_store(self, project_id: str) -> WorkPackageStore:
+        """获取项目工作包的列式存储（直接由 HAL 响应构建，不创建 WorkPackage 对象）"""
+        params = {'filters': json.dumps(self._work_package_filters(project_id))}
+        return WorkPackageStore.from_hal_elements(
+            await self._get_collection("/work_packages", params), project_id
+        )
+    
+    async def get_work_package_ids(self, project_id: str) -> List[str]:
+        """获取项目全部工作包的 ID（只请求 ID 字段，用于发现已删除的工作包）"""
+        params = {
+            'filters': json.dumps(self._work_package_filters(project_id)),
+            'select': 'total,elements/id'
+        }
+        return [str(item['id']) for item in await self._get_collection("/work_packages", params)]
+    
+    async def count_work_packages(self, project_id: Optional[str] = None,
+                                  updated_since: Optional[datetime] = None) -> int:
+        """统计工作包数量（只请求总数，不加载工作包内容）"""
+        filters = self._work_package_filters(project_id, updated_since)
+        params = {"pageSize": 1, "filters": json.dumps(filters)}
+        data = await self._make_request("/work_packages", params=params)
+        return int(data.get('total', 0))
+    
     async def get_work_package(self, work_package_id: str) -> Optional[WorkPackage]:
         """获取单个工作包"""
         try:
@@ -222,6 +248,18 @@ class AsyncOpenProjectClient(IOpenProjectClient):
         
         return users
     
+    async def get_statuses(self) -> List[Dict[str, Any]]:
+        """获取工作包状态列表（名称及是否为关闭状态）"""
+        data = await self._make_request("/statuses")
+        return [
+            {
+                "id": str(item['id']),
+                "name": item['name'],
+                "is_closed": bool(item.get('isClosed'))
+            }
+            for item in data.get('_embedded', {}).get('elements', [])
+        ]
+    
     async def get_user(self, user_id: str) -> Optional[User]:
         """获取单个用户"""
         try:
@@ -272,6 +310,31 @@ class AsyncOpenProjectClient(IOpenProjectClient):
         """获取 API 密钥"""
         return self.api_key
     
+    async def _get_collection(self, endpoint: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """按 offset/pageSize 逐页获取集合的全部元素"""
+        page_size = get_global_config().openproject_page_size
+        offset = 1
+        elements = []
+        while True:
+            data = await self._make_request(endpoint, params={**params, 'pageSize': page_size, 'offset': offset})
+            page = data.get('_embedded', {}).get('elements', [])
+            elements.extend(page)
+            # 服务器可能限制每页大小，以总数判断是否还有下一页
+            if not page or len(elements) >= int(data.get('total', len(elements))):
+                return elements
+            offset += 1
+    
+    def _work_package_filters(self, project_id: Optional[str] = None,
+                              updated_since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """构建工作包查询的过滤条件"""
+        filters = []
+        if project_id:
+            filters.append({"project": {"operator": "=", "values": [project_id]}})
+        if updated_since:
+            filters.append({"updatedAt": {"operator": "<>d",
+                                          "values": [updated_since.isoformat() + "Z", ""]}})
+        return filters
+    
     def _parse_datetime(self, date_str: Optional[str]) -> Optional[datetime]:
         """解析日期时间字符串"""
         if not date_str:
@@ -1,10 +1,11 @@
 """
 精简的 FastAPI MCP 服务器 - 使用核心库
 """
+import json
 import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.adapters.async_openproject_adapter import AsyncOpenProjectClient
@@ -15,6 +16,8 @@ from mcp_core import (
     MCPHandler, get_logger, Config, set_global_config,
     MCPError
 )
+from mcp_core.infrastructure.analytics import MetricsHistoryJob
+from mcp_core.infrastructure.cache import CachedOpenProjectClient
 
 # 初始化核心库配置
 logger = get_logger("mcp.fastapi")
@@ -29,24 +32,47 @@ except Exception as e:
 # 全局服务实例
 openproject_client = None
 mcp_handler = None
+history_job = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    global openproject_client, mcp_handler
+    global openproject_client, mcp_handler, history_job
     
     # 启动时初始化
     try:
         logger.info("初始化 FastAPI MCP 服务...")
         
-        # 创建异步 OpenProject 客户端
-        openproject_client = AsyncOpenProjectClient()
+        # 创建异步 OpenProject 客户端（热点数据走缓存，过期后后台刷新）
+        openproject_client = CachedOpenProjectClient(AsyncOpenProjectClient())
         await openproject_client.initialize()
         
+        # 从上次关闭时的快照恢复缓存，只对变更的数据重新获取
+        if config.cache_snapshot_path:
+            await openproject_client.restore_snapshot()
+        
+        # 就绪前预热缓存，避免部署后首批请求同时打到冷的 OpenProject
+        if config.cache_warmup_enabled:
+            await openproject_client.warm_up()
+        
         # 创建 MCP 处理器
         mcp_handler = MCPHandler(openproject_client)
         
+        # 先按 OpenProject 校正状态分类，指标历史从第一天起使用同一口径
+        await mcp_handler.tool_manager.sync_statuses()
+        
+        # 每天记录项目指标历史，供燃尽图和速度统计使用
+        if config.metrics_history_enabled:
+            tool_manager = mcp_handler.tool_manager
+            history_job = MetricsHistoryJob(
+                openproject_client,
+                tool_manager.metrics_history,
+                metrics_store=tool_manager.metrics_store if config.analytics_incremental_enabled else None,
+                prepare=tool_manager.sync_statuses
+            )
+            history_job.start()
+        
         logger.info("FastAPI MCP 服务初始化成功")
         
         yield
@@ -54,7 +80,16 @@ async def lifespan(app: FastAPI):
     finally:
         # 关闭时清理
         logger.info("清理 FastAPI MCP 服务...")
+        if history_job:
+            await history_job.stop()
+        if mcp_handler:
+            mcp_handler.tool_manager.template_engine.stop_watching()
         if openproject_client:
+            if config.cache_snapshot_path:
+                try:
+                    openproject_client.save_snapshot()
+                except Exception as e:
+                    logger.error("保存缓存快照失败", e)
             await openproject_client.cleanup()
 
 
@@ -97,6 +132,7 @@ async def root():
         "status": "running",
         "endpoints": {
             "mcp": "/mcp",
+            "mcp_stream": "/mcp/stream",
             "health": "/health",
             "docs": "/docs",
             "openapi": "/openapi.json"
@@ -158,6 +194,29 @@ async def handle_mcp_request(request: Request):
         return JSONResponse(content=error_response)
 
 
+@app.post("/mcp/stream")
+async def handle_mcp_stream_request(request: Request):
+    """处理 MCP 请求（SSE 流式响应）
+
+    报告生成等支持流式输出的工具按分块推送 notifications/report/chunk 通知，
+    最后推送 JSON-RPC 响应；其他请求只推送一条响应。
+    """
+    if not mcp_handler:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+
+    request_data = await request.json()
+
+    async def event_stream():
+        async for message in mcp_handler.stream_request(request_data):
+            yield f"event: message\ndata: {json.dumps(message, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/projects")
 async def get_projects():
     """获取项目列表 - REST API 端点"""
@@ -299,6 +358,7 @@ if __name__ == "__main__":
     logger.info(f"  - API 文档: http://localhost:{port}/docs")
     logger.info(f"  - 健康检查: http://localhost:{port}/health")
     logger.info(f"  - MCP 端点: http://localhost:{port}/mcp")
+    logger.info(f"  - MCP 流式端点: http://localhost:{port}/mcp/stream")
     logger.info(f"  - Web 界面: http://localhost:{port}/web/template_editor.html")
     
     uvicorn.run(
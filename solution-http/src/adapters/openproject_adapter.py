@@ -1,13 +1,15 @@
 """
 OpenProject 适配器 - 使用核心库实现
 """
+import json
 import requests
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from datetime import datetime
 
 from mcp_core.domain.interfaces import IOpenProjectClient
 from mcp_core.domain.models import Project, WorkPackage, User, Report
 from mcp_core.domain.services import ReportGeneratorService
+from mcp_core.infrastructure.analytics import WorkPackageStore
 from mcp_core.shared.exceptions import OpenProjectError, AuthenticationError, NotFoundError
 from mcp_core.shared.config import get_global_config
 
@@ -127,18 +129,19 @@ class HTTPOpenProjectClient(IOpenProjectClient):
         except NotFoundError:
             return None
     
-    async def get_work_packages(self, project_id: Optional[str] = None) -> List[WorkPackage]:
-        """获取工作包列表"""
+    async def get_work_packages(self, project_id: Optional[str] = None,
+                                updated_since: Optional[datetime] = None) -> List[WorkPackage]:
+        """获取工作包列表（指定 updated_since 时只返回之后更新的工作包）"""
         endpoint = "/work_packages"
         params = {}
         
-        if project_id:
-            params['filters'] = f'[{{"project":{{"operator":"=","values":["{project_id}"]}}}}]'
+        filters = self._work_package_filters(project_id, updated_since)
+        if filters:
+            params['filters'] = json.dumps(filters)
         
-        data = self._make_request(endpoint, params=params)
         work_packages = []
         
-        for item in data.get('_embedded', {}).get('elements', []):
+        for item in self._iter_collection(endpoint, params):
             wp = WorkPackage(
                 id=str(item['id']),
                 subject=item['subject'],
@@ -158,6 +161,30 @@ class HTTPOpenProjectClient(IOpenProjectClient):
         
         return work_packages
     
+    async def get_work_package_store(self, project_id: str) -> WorkPackageStore:
+        """获取项目工作包的列式存储（直接由 HAL 响应构建，不创建 WorkPackage 对象）"""
+        params = {'filters': json.dumps(self._work_package_filters(project_id))}
+        # 逐页获取，每页的元素直接追加到列中
+        return WorkPackageStore.from_hal_elements(
+            self._iter_collection("/work_packages", params), project_id
+        )
+    
+    async def get_work_package_ids(self, project_id: str) -> List[str]:
+        """获取项目全部工作包的 ID（只请求 ID 字段，用于发现已删除的工作包）"""
+        params = {
+            'filters': json.dumps(self._work_package_filters(project_id)),
+            'select': 'total,elements/id'
+        }
+        return [str(item['id']) for item in self._iter_collection("/work_packages", params)]
+    
+    async def count_work_packages(self, project_id: Optional[str] = None,
+                                  updated_since: Optional[datetime] = None) -> int:
+        """统计工作包数量（只请求总数，不加载工作包内容）"""
+        filters = self._work_package_filters(project_id, updated_since)
+        params = {"pageSize": 1, "filters": json.dumps(filters)}
+        data = self._make_request("/work_packages", params=params)
+        return int(data.get('total', 0))
+    
     async def get_work_package(self, work_package_id: str) -> Optional[WorkPackage]:
         """获取单个工作包"""
         try:
@@ -211,6 +238,18 @@ class HTTPOpenProjectClient(IOpenProjectClient):
         
         return users
     
+    async def get_statuses(self) -> List[Dict[str, Any]]:
+        """获取工作包状态列表（名称及是否为关闭状态）"""
+        data = self._make_request("/statuses")
+        return [
+            {
+                "id": str(item['id']),
+                "name": item['name'],
+                "is_closed": bool(item.get('isClosed'))
+            }
+            for item in data.get('_embedded', {}).get('elements', [])
+        ]
+    
     async def get_user(self, user_id: str) -> Optional[User]:
         """获取单个用户"""
         try:
@@ -262,6 +301,32 @@ class HTTPOpenProjectClient(IOpenProjectClient):
         """获取 API 密钥"""
         return self.api_key
     
+    def _iter_collection(self, endpoint: str, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """按 offset/pageSize 逐页获取集合的全部元素"""
+        page_size = get_global_config().openproject_page_size
+        offset = 1
+        fetched = 0
+        while True:
+            data = self._make_request(endpoint, params={**params, 'pageSize': page_size, 'offset': offset})
+            elements = data.get('_embedded', {}).get('elements', [])
+            yield from elements
+            fetched += len(elements)
+            # 服务器可能限制每页大小，以总数判断是否还有下一页
+            if not elements or fetched >= int(data.get('total', fetched)):
+                return
+            offset += 1
+    
+    def _work_package_filters(self, project_id: Optional[str] = None,
+                              updated_since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """构建工作包查询的过滤条件"""
+        filters = []
+        if project_id:
+            filters.append({"project": {"operator": "=", "values": [project_id]}})
+        if updated_since:
+            filters.append({"updatedAt": {"operator": "<>d",
+                                          "values": [updated_since.isoformat() + "Z", ""]}})
+        return filters
+    
     def _parse_datetime(self, date_str: Optional[str]) -> Optional[datetime]:
         """解析日期时间字符串"""
         if not date_str: